@@ -1,68 +1,143 @@
-from DAO.db_config import pg_config
-import psycopg2 as pg
+import io
+import time
+
+import numpy as np
 import pandas as pd
 
+from DAO.data_DAO import DAO
+
+
+# Columns of every table loaded by the ETL, in the order of the DataFrames
+TABLE_COLUMNS = {
+    "class": ["cid", "cname", "ccode", "cdesc", "term", "years", "cred", "csyllabus"],
+    "meeting": ["mid", "ccode", "starttime", "endtime", "cdays"],
+    "requisite": ["classid", "reqid", "prereq"],
+    "room": ["rid", "building", "room_number", "capacity"],
+    "section": ["sid", "roomid", "cid", "mid", "semester", "years", "capacity"],
+    "syllabus": ["chunkid", "courseid", "embedding_text", "chunk"],
+}
+
+
+class InsertDAO(DAO):
+    def __init__(self):
+        # One connection for every table of the load
+        super().__init__()
+        self.report = []
+
+    def insert_dataframe(self, dataframe, table_name):
+        if table_name not in TABLE_COLUMNS:
+            print("Table name not recognized")
+            return 0
+
+        dataframe = prepare_dataframe(dataframe, table_name)
+        start = time.perf_counter()
+        try:
+            rows = self.copy_dataframe(dataframe, table_name)
+            method = "copy"
+        except Exception as e:
+            # Fall back to one INSERT per row, slower but more forgiving with types
+            self.conn.rollback()
+            print(f"COPY into {table_name} failed, inserting row by row: {e}")
+            try:
+                rows = self.insert_rows(dataframe, table_name)
+                method = "insert"
+            except Exception as e:
+                print(f"Error inserting data into {table_name} table: {e}")
+                self.conn.rollback()
+                rows = 0
+                method = "failed"
+
+        duration = time.perf_counter() - start
+        self.report.append((table_name, rows, duration, method))
+        if method != "failed":
+            print(f"{rows} records inserted successfully into {table_name} table")
+        return rows
+
+    def copy_dataframe(self, dataframe, table_name):
+        # Stream the DataFrame as CSV through COPY FROM STDIN, no temporary file.
+        # Missing values are written as \N so they stay apart from empty strings.
+        buffer = io.StringIO()
+        dataframe.to_csv(buffer, index=False, header=False, na_rep="\\N")
+        buffer.seek(0)
+
+        query = "COPY %s (%s) FROM STDIN WITH (FORMAT csv, NULL '\\N')" % (
+            table_name,
+            ", ".join(TABLE_COLUMNS[table_name]),
+        )
+        self.cursor.copy_expert(query, buffer)
+        self.conn.commit()
+        return len(dataframe)
+
+    def insert_rows(self, dataframe, table_name):
+        columns = TABLE_COLUMNS[table_name]
+        query = "INSERT INTO %s (%s) VALUES (%s)" % (
+            table_name,
+            ", ".join(columns),
+            ", ".join(["%s"] * len(columns)),
+        )
+        # Missing values as None so psycopg2 sends NULL
+        rows = dataframe.astype(object).where(dataframe.notna(), None).values.tolist()
+        self.cursor.executemany(query, rows)
+        self.conn.commit()
+        return len(dataframe)
+
+    def print_report(self):
+        total_rows = 0
+        total_time = 0
+        print(f"{'table':<12}{'rows':>10}{'seconds':>10}  method")
+        for table_name, rows, duration, method in self.report:
+            print(f"{table_name:<12}{rows:>10}{duration:>10.3f}  {method}")
+            total_rows += rows
+            total_time += duration
+        print(f"{'total':<12}{total_rows:>10}{total_time:>10.3f}")
+
+
+def prepare_dataframe(dataframe, table_name):
+    dataframe = dataframe[TABLE_COLUMNS[table_name]].copy()
+
+    if table_name == "requisite":
+        dataframe["prereq"] = dataframe["prereq"].map({0: False, 1: True})
+
+    if table_name == "meeting":
+        # The cleaning rules carry times as minutes of the day; store them as TIME
+        for column in ["starttime", "endtime"]:
+            if pd.api.types.is_integer_dtype(dataframe[column]):
+                hours, minutes = np.divmod(dataframe[column].to_numpy(dtype=np.int64), 60)
+                dataframe[column] = [
+                    "%02d:%02d:00" % (hour, minute) for hour, minute in zip(hours, minutes)
+                ]
+
+    for column in dataframe.columns:
+        values = dataframe[column]
+        if values.dtype == object and len(values) and isinstance(
+            values.iloc[0], (list, tuple, np.ndarray)
+        ):
+            # Embeddings in pgvector's text format
+            dataframe[column] = values.map(
+                lambda vector: "[" + ",".join(str(float(x)) for x in vector) + "]"
+            )
+        elif pd.api.types.is_float_dtype(values) and (values.dropna() % 1 == 0).all():
+            # Ids read as float because the raw column had blanks; COPY wants 2, not 2.0
+            dataframe[column] = values.astype("Int64")
+    return dataframe
+
+
 def insert_to_db(dataframe, table_name):
-    # Create the connection string
-    url = "dbname=%s password=%s user=%s host=%s port=%s" % \
-          (pg_config['dbname'], pg_config['password'], pg_config['user'], pg_config['host'], pg_config['port'])
-    
-    # Connect to the database and insert the data
+    # Single table load, kept for scripts that load one DataFrame
+    dao = InsertDAO()
     try:
-        conn = pg.connect(url)
-        cursor = conn.cursor()
-        
-        # Create the query based on the table name
-        if table_name == "class":
-            query = """
-            INSERT INTO class (cid, cname, ccode, cdesc, term, years, cred, csyllabus) 
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """
-        elif table_name == "meeting":
-            query = """
-            INSERT INTO meeting (mid, ccode, starttime, endtime, cdays)
-            VALUES (%s, %s, %s, %s, %s)
-            """
-        elif table_name == "requisite":
-            dataframe['prereq'] = dataframe['prereq'].map({0: False, 1: True})
-            query = """
-            INSERT INTO requisite (classid, reqid, prereq)
-            VALUES (%s, %s, %s)
-            """
-        elif table_name == "room":
-            query = """
-            INSERT INTO room (rid, building, room_number, capacity)
-            VALUES (%s, %s, %s, %s)
-            """
-        elif table_name == "section":
-            query = """
-            INSERT INTO section (sid, roomid, cid, mid, semester, years, capacity)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """
-        elif table_name == "syllabus":
-            query = """
-            INSERT INTO syllabus (chunkid, courseid, embedding_text, chunk)
-            VALUES (%s, %s, %s, %s)
-            """
-        else:
-            print("Table name not recognized")
-            return
-        
-        # Execute the query
-        cursor.executemany(query, dataframe.values) # type: ignore
-        
-        # Commit the transaction
-        conn.commit()
-        print(f"{cursor.rowcount} records inserted successfully into {table_name} table")
-
-    except Exception as e:
-        # Rollback the transaction in case of an error
-        print(f"Error inserting data into {table_name} table: {e}")
-        conn.rollback() # type: ignore
-    
+        return dao.insert_dataframe(dataframe, table_name)
+    finally:
+        dao.close()
+
+
+def load_tables(df_list):
+    # Load every (DataFrame, table) pair over one connection and print the report
+    dao = InsertDAO()
+    try:
+        for dataframe, table_name in df_list:
+            dao.insert_dataframe(dataframe, table_name)
+        dao.print_report()
+        return dao.report
     finally:
-        # Close the cursor and connection
-        if cursor: # type: ignore
-            cursor.close()
-        if conn: # type: ignore
-            conn.close()
+        dao.close()
@@ -0,0 +1,159 @@
+import hashlib
+import os
+import re
+
+from DAO.data_DAO import DAO
+
+
+# Folder with the versioned migrations, named NNNN_description.sql
+MIGRATIONS_FOLDER = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "migrations")
+)
+
+# Migrations starting with this line run outside a transaction, one statement
+# at a time (needed by CREATE INDEX CONCURRENTLY)
+NO_TRANSACTION_MARKER = "-- migrate: no-transaction"
+
+
+class MigrationDAO(DAO):
+    def __init__(self, folder=MIGRATIONS_FOLDER):
+        super().__init__()
+        self.folder = folder
+        self.ensure_migrations_table()
+
+    def ensure_migrations_table(self):
+        self.cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS "schema_migrations" (
+                "version" INTEGER PRIMARY KEY,
+                "name" VARCHAR NOT NULL,
+                "checksum" VARCHAR(64) NOT NULL,
+                "applied_at" TIMESTAMPTZ NOT NULL DEFAULT now()
+            );
+            """
+        )
+        self.conn.commit()
+
+    def available_migrations(self):
+        # Sorted list of (version, name, path) found in the migrations folder
+        migrations = []
+        for file_name in os.listdir(self.folder):
+            match = re.match(r"^(\d+)_(.+)\.sql$", file_name)
+            if match:
+                migrations.append(
+                    (int(match.group(1)), match.group(2), os.path.join(self.folder, file_name))
+                )
+        migrations.sort()
+
+        versions = [version for version, _, _ in migrations]
+        if len(versions) != len(set(versions)):
+            raise ValueError("Two migrations share the same version number")
+        return migrations
+
+    def applied_migrations(self):
+        self.cursor.execute(
+            'SELECT "version", "name", "checksum", "applied_at" FROM "schema_migrations" ORDER BY "version";'
+        )
+        result = {}
+        for version, name, checksum, applied_at in self.cursor.fetchall():
+            result[version] = (name, checksum, applied_at)
+        return result
+
+    def status(self):
+        # One row per migration: (version, name, state, applied_at)
+        applied = self.applied_migrations()
+        result = []
+        for version, name, path in self.available_migrations():
+            if version in applied:
+                state = "applied"
+                if applied[version][1] != checksum_file(path):
+                    state = "applied (modified since)"
+                result.append((version, name, state, applied[version][2]))
+            else:
+                result.append((version, name, "pending", None))
+
+        # Applied versions whose file is gone
+        known = {row[0] for row in result}
+        for version, (name, _, applied_at) in applied.items():
+            if version not in known:
+                result.append((version, name, "applied (file missing)", applied_at))
+        result.sort()
+        return result
+
+    def pending_migrations(self):
+        applied = self.applied_migrations()
+        newest_applied = max(applied) if applied else 0
+        pending = []
+        for migration in self.available_migrations():
+            if migration[0] not in applied:
+                if migration[0] < newest_applied:
+                    # Forward-only: never slip an old migration in between applied ones
+                    raise ValueError(
+                        "Migration %04d is older than the last applied migration %04d"
+                        % (migration[0], newest_applied)
+                    )
+                pending.append(migration)
+        return pending
+
+    def upgrade(self, target=None):
+        # Apply every pending migration up to target (inclusive), in order
+        applied = []
+        for version, name, path in self.pending_migrations():
+            if target is not None and version > target:
+                break
+
+            with open(path, "r") as file:
+                sql_query = file.read()
+
+            try:
+                if sql_query.lstrip().startswith(NO_TRANSACTION_MARKER):
+                    # Close the transaction opened by the bookkeeping queries first
+                    self.conn.commit()
+                    self.conn.autocommit = True
+                    for statement in split_statements(sql_query):
+                        self.cursor.execute(statement)
+                    self.conn.autocommit = False
+                    self.record_migration(version, name, path)
+                else:
+                    # Schema change and bookkeeping commit together
+                    self.cursor.execute(sql_query)
+                    self.record_migration(version, name, path)
+                self.conn.commit()
+                print(f"Applied migration {version:04d}_{name}")
+                applied.append(version)
+
+            except Exception as e:
+                print(f"Error applying migration {version:04d}_{name}: {e}")
+                if self.conn.autocommit:
+                    self.conn.autocommit = False
+                else:
+                    self.conn.rollback()
+                raise
+
+        if not applied:
+            print("Database schema is up to date.")
+        return applied
+
+    def record_migration(self, version, name, path):
+        self.cursor.execute(
+            'INSERT INTO "schema_migrations" ("version", "name", "checksum") VALUES (%s, %s, %s);',
+            (version, name, checksum_file(path)),
+        )
+
+
+def checksum_file(path):
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def split_statements(sql_query):
+    # Split on semicolons that end a line, ignoring comment-only chunks
+    statements = []
+    for statement in re.split(r";\s*(?:\n|$)", sql_query):
+        lines = [
+            line for line in statement.splitlines() if not line.strip().startswith("--")
+        ]
+        statement = "\n".join(lines).strip()
+        if statement:
+            statements.append(statement)
+    return statements
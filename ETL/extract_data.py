@@ -1,14 +1,19 @@
 import os
+import time
 import pandas as pd
 import sqlite3
 import json
 import xml.etree.ElementTree as ET
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 
 
 # Paths for raw data (input) and processed data (output)
 RAW_DATA_FOLDER = "./data"
 
+# Folder the syllabus PDFs are downloaded to
+SYLLABUS_FOLDER = "syllabuses"
+
 
 # Function to extract data from SQLite database
 def extract_db(file_path):
@@ -51,7 +56,6 @@ def extract_xml(file_path):
             rows.append(temp)
 
         data_frame = pd.DataFrame(rows, columns=col)
-        syllabus_downloader("syllabuses", data_frame)
         return data_frame
 
     except Exception as Exc:
@@ -59,117 +63,162 @@ def extract_xml(file_path):
 
 
 # Function to Dowlnoad Syllabuses
-def syllabus_downloader(folder_name, data_frame):
-
-    SYLLABUS_FOLDER = folder_name
-
-    os.makedirs(SYLLABUS_FOLDER, exist_ok=True)
-
+def download_syllabus(url, file_path):
     try:
-        urllist = data_frame["syllabus"].to_list()
-        deplist = data_frame["name"].to_list()
-        codelist = data_frame["code"].to_list()
-        desclist = data_frame["description"].tolist()
-        for i in range(len(urllist)):
-            if urllist[i] == "None":
-                continue
-            url = urllist[i]
-            desclist[i] = desclist[i].replace(" ", "-")
-            file_name = deplist[i] + "-" + codelist[i] + "-" + desclist[i] + ".pdf"
-            urllib.request.urlretrieve(url, os.path.join(SYLLABUS_FOLDER, file_name))
-
+        urllib.request.urlretrieve(url, file_path)
+        return True
     except Exception as Excd:
         print("Exception, cant dowload this file", Excd)
-
-
-def run_etl():
-    dataframes = []  # List to store all dataframes and their table names
-
-    # Iterate over all files in the raw_data folder
-    for file_name in os.listdir(RAW_DATA_FOLDER):
-        file_path = os.path.join(RAW_DATA_FOLDER, file_name)
-
-        if file_name.endswith(".csv"):
-            df = pd.read_csv(file_path)
-            if df is not None:
-                if file_name == "meeting.csv":
-                    df.columns = ["mid", "ccode", "starttime", "endtime", "cdays"]
-                    table_name = "meeting"
-                elif file_name == "sections.csv":
-                    table_name = "section"
-                    new_order = [
-                        "sid",
-                        "room_id",
-                        "class_id",
-                        "meeting_id",
-                        "semester",
-                        "year",
-                        "capacity",
-                    ]
-                    df = df[new_order]
-                    df.columns = [
-                        "sid",
-                        "roomid",
-                        "cid",
-                        "mid",
-                        "semester",
-                        "years",
-                        "capacity",
-                    ]
-
-                processed_data = df.dropna()
-                dataframes.append((processed_data, table_name))  # type: ignore
-
-        elif file_name.endswith(".db"):
-            df = extract_db(file_path)
-            if df is not None:
-                table_name = "requisite"
-                df.columns = ["classid", "reqid", "prereq"]
-                processed_data = df.dropna()
-                dataframes.append((processed_data, table_name))
-
-        elif file_name.endswith(".json"):
-            with open(file_path, "r") as f:
-                df = json.load(f)
-                if df is not None:
-                    processed_data = pd.DataFrame(
-                        [
-                            (item["id"], key, item["number"], item["capacity"])
-                            for key, values in df.items()
-                            for item in values
-                        ],
-                        columns=["rid", "building", "room_number", "capacity"],
-                    )
-
-                    table_name = "room"
-                    dataframes.append((processed_data, table_name))
-
-        elif file_name.endswith(".xml"):
-            df = extract_xml(file_path)
-            table_name = "class"
-            if df is not None:
+        return False
+
+
+def syllabus_downloader(folder_name, data_frame, max_workers=8):
+    os.makedirs(folder_name, exist_ok=True)
+
+    urllist = data_frame["syllabus"].to_list()
+    deplist = data_frame["name"].to_list()
+    codelist = data_frame["code"].to_list()
+    desclist = data_frame["description"].tolist()
+
+    downloads = []
+    for i in range(len(urllist)):
+        if urllist[i] == "None":
+            continue
+        description = desclist[i].replace(" ", "-")
+        file_name = deplist[i] + "-" + codelist[i] + "-" + description + ".pdf"
+        downloads.append((urllist[i], os.path.join(folder_name, file_name)))
+
+    # Downloads are network bound, a failed one does not stop the others
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda item: download_syllabus(*item), downloads))
+    return sum(results)
+
+
+def download_syllabuses(folder_name=SYLLABUS_FOLDER, max_workers=8):
+    # Optional stage: fetch the syllabus PDF of every course in courses.xml
+    start = time.perf_counter()
+    data_frame = extract_xml(os.path.join(RAW_DATA_FOLDER, "courses.xml"))
+    if data_frame is None:
+        return 0
+    downloaded = syllabus_downloader(folder_name, data_frame, max_workers)
+    print(f"Downloaded {downloaded} syllabuses in {time.perf_counter() - start:.3f}s")
+    return downloaded
+
+
+def extract_file(file_name):
+    # Parse one raw file into (df, table_name), None when the file is not a source
+    file_path = os.path.join(RAW_DATA_FOLDER, file_name)
+
+    if file_name.endswith(".csv"):
+        df = pd.read_csv(file_path)
+        if df is not None:
+            if file_name == "meeting.csv":
+                df.columns = ["mid", "ccode", "starttime", "endtime", "cdays"]
+                table_name = "meeting"
+            elif file_name == "sections.csv":
+                table_name = "section"
                 new_order = [
-                    "classid",
-                    "name",
-                    "code",
-                    "description",
-                    "term",
-                    "years",
-                    "cred",
-                    "syllabus",
+                    "sid",
+                    "room_id",
+                    "class_id",
+                    "meeting_id",
+                    "semester",
+                    "year",
+                    "capacity",
                 ]
                 df = df[new_order]
                 df.columns = [
+                    "sid",
+                    "roomid",
                     "cid",
-                    "cname",
-                    "ccode",
-                    "cdesc",
-                    "term",
+                    "mid",
+                    "semester",
                     "years",
-                    "cred",
-                    "csyllabus",
+                    "capacity",
                 ]
+            else:
+                return None
+
+            processed_data = df.dropna()
+            return processed_data, table_name
+
+    elif file_name.endswith(".db"):
+        df = extract_db(file_path)
+        if df is not None:
+            table_name = "requisite"
+            df.columns = ["classid", "reqid", "prereq"]
+            processed_data = df.dropna()
+            return processed_data, table_name
+
+    elif file_name.endswith(".json"):
+        with open(file_path, "r") as f:
+            df = json.load(f)
+            if df is not None:
+                processed_data = pd.DataFrame(
+                    [
+                        (item["id"], key, item["number"], item["capacity"])
+                        for key, values in df.items()
+                        for item in values
+                    ],
+                    columns=["rid", "building", "room_number", "capacity"],
+                )
+
+                table_name = "room"
+                return processed_data, table_name
+
+    elif file_name.endswith(".xml"):
+        df = extract_xml(file_path)
+        table_name = "class"
+        if df is not None:
+            new_order = [
+                "classid",
+                "name",
+                "code",
+                "description",
+                "term",
+                "years",
+                "cred",
+                "syllabus",
+            ]
+            df = df[new_order]
+            df.columns = [
+                "cid",
+                "cname",
+                "ccode",
+                "cdesc",
+                "term",
+                "years",
+                "cred",
+                "csyllabus",
+            ]
+
+        return df, table_name
+
+    return None
+
+
+def timed_extract(file_name):
+    start = time.perf_counter()
+    result = extract_file(file_name)
+    return result, time.perf_counter() - start
+
+
+def run_etl(max_workers=None):
+    dataframes = []  # List to store all dataframes and their table names
+
+    # Sorted so the result does not depend on the directory listing order
+    file_names = sorted(os.listdir(RAW_DATA_FOLDER))
+
+    # Every source is parsed on its own worker; map keeps the input order
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(timed_extract, file_names))
 
-            dataframes.append((df, table_name))
+    for file_name, (result, duration) in zip(file_names, results):
+        if result is None:
+            continue
+        df, table_name = result
+        rows = len(df) if df is not None else 0
+        print(f"Extracted {file_name} ({table_name}): {rows} rows in {duration:.3f}s")
+        dataframes.append((df, table_name))
 
     return dataframes
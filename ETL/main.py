@@ -1,9 +1,40 @@
+import argparse
+import threading
+
 from transform_data import clean_data
-from DAO.insert_DAO import insert_to_db
+import extract_data
+from extract_data import download_syllabuses
+from DAO.insert_DAO import load_tables
 from DAO.data_DAO import DAO
+from DAO.migration_DAO import MigrationDAO
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Reload the database from ./data or --data")
+    parser.add_argument(
+        "--download-syllabuses",
+        action="store_true",
+        help="also download the syllabus PDFs, alongside the tabular load",
+    )
+    parser.add_argument(
+        "--download-workers", type=int, default=8, help="concurrent syllabus downloads"
+    )
+    parser.add_argument(
+        "--data",
+        default=extract_data.RAW_DATA_FOLDER,
+        help="folder with the source files (e.g. one made by benchmarks/synthetic_data.py)",
+    )
+    args = parser.parse_args()
+    extract_data.RAW_DATA_FOLDER = args.data
+
+    # Optional stage: the downloads run in the background and never hold up the load
+    downloader = None
+    if args.download_syllabuses:
+        downloader = threading.Thread(
+            target=download_syllabuses, kwargs={"max_workers": args.download_workers}
+        )
+        downloader.start()
+
     # Initialize the schema
     dao = DAO()
     dao.initialize_schema()
@@ -12,15 +43,22 @@ def main():
     # Clean the data
     df_list = clean_data()
 
-    #  Insert the data into the database
-    for df, table_name in df_list:
-        insert_to_db(df, table_name)
+    # Bulk load the data into the database (COPY, one connection)
+    load_tables(df_list)
 
     # Reopen the connection to execute the SQL files
     dao = DAO()
     dao.execute_sql_file("sequences.sql")
     dao.close()
 
+    # Build the indexes and other schema objects on top of the loaded data
+    dao = MigrationDAO()
+    dao.upgrade()
+    dao.close()
+
+    if downloader is not None:
+        downloader.join()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,33 @@
+import argparse
+
+from DAO.migration_DAO import MigrationDAO
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Apply the versioned, forward-only schema migrations in migrations/"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    upgrade_parser = subparsers.add_parser("upgrade", help="apply pending migrations")
+    upgrade_parser.add_argument(
+        "--target", type=int, help="stop after this migration version"
+    )
+    subparsers.add_parser("status", help="list applied and pending migrations")
+
+    args = parser.parse_args()
+
+    dao = MigrationDAO()
+    try:
+        if args.command == "upgrade":
+            dao.upgrade(args.target)
+        else:
+            for version, name, state, applied_at in dao.status():
+                applied = applied_at.strftime("%Y-%m-%d %H:%M:%S") if applied_at else ""
+                print(f"{version:04d}  {name:<40} {state:<24} {applied}")
+    finally:
+        dao.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,20 @@
 from extract_data import run_etl
+import numpy as np
 import pandas as pd
 import sys
 import os
 
 # Add the parent directory to the sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The rule timing instrumentation is the API's (app/handler/rule_timing.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
 
+from handler.rule_timing import RuleRun, add_run_listener, rule_run, timed_rule  # noqa: E402
+
+# The ETL also prints every validation run as a table
+add_run_listener(RuleRun.print_report)
+
+@timed_rule
 def update_names():
     # get all dataframes as a dictionary of (df, table_name)
     dataframes = run_etl()
@@ -27,6 +36,29 @@ def convert_to_hhmm(total_minutes):
     minutes = total_minutes % 60
     return f'{hours}:{minutes:02d}' 
 
+# Meeting times travel through the rules as minutes of the day in int16 columns
+MINUTE_DTYPE = np.int16
+
+
+def time_to_minutes(times):
+    # Works for 'HH:MM:SS' strings and datetime.time values. Only the distinct
+    # meeting times are parsed, then spread back over the rows.
+    if pd.api.types.is_integer_dtype(times):
+        return times.to_numpy(dtype=MINUTE_DTYPE)
+    codes, uniques = pd.factorize(times)
+    minutes = pd.to_timedelta(pd.Series(uniques).astype(str)).dt.total_seconds() // 60
+    return minutes.to_numpy(dtype=MINUTE_DTYPE)[codes]
+
+
+@timed_rule
+def meeting_times_to_minutes(df_meeting):
+    # No-op when the columns already hold minutes
+    return df_meeting.assign(
+        starttime=time_to_minutes(df_meeting["starttime"]),
+        endtime=time_to_minutes(df_meeting["endtime"]),
+    )
+
+@timed_rule
 def rem_null_values_from_db(df_dict):
     # Remove rows with null values across all dataframes
     df_dict["df_class"].dropna(inplace=True)
@@ -37,6 +69,7 @@ def rem_null_values_from_db(df_dict):
 
     return df_dict
 
+@timed_rule
 def rem_classes_with_invalid_ID(df_section, df_class):
     # 1. Ensure that classes have ID starting from 2
     df_class["cid"] = pd.to_numeric(df_class["cid"], errors="coerce")
@@ -46,6 +79,7 @@ def rem_classes_with_invalid_ID(df_section, df_class):
 
     return df_section, df_class
 
+@timed_rule
 def rem_section_with_overcapacity(df_section, df_room):
     # 7. Sections cannot be in overcapacity, classrooms have limits.
     df_section_room = df_section.merge(df_room, left_on="roomid", right_on="rid")
@@ -56,6 +90,7 @@ def rem_section_with_overcapacity(df_section, df_room):
 
     return df_section, df_room
 
+@timed_rule
 def rem_courses_with_invalid_timeframe(df_section, df_class):
     # 8. Courses must be taught in the correct year and correct semester.
     df_section_class = df_section.merge(df_class, on="cid")
@@ -101,10 +136,11 @@ def rem_courses_with_invalid_timeframe(df_section, df_class):
     return df_section, df_class
 
 
+@timed_rule
 def adjust_meetings_and_overlaps(df_meeting):
     # 4. Adjust 'MJ' meetings and remove overlaps
-    # Convert 'starttime' and 'endtime' columns to minutes for easier manipulation
-    df_meeting[['starttime', 'endtime']] = df_meeting[['starttime', 'endtime']].map(convert_to_minutes)
+    # Times are compared as minutes of the day (already the case inside clean_data)
+    df_meeting = meeting_times_to_minutes(df_meeting)
 
     # Filter out meetings on 'MJ' days between 10:15 and 12:30
     df_meeting = df_meeting[
@@ -147,43 +183,23 @@ def adjust_meetings_and_overlaps(df_meeting):
     # Remove all meetings that start after 19:45
     df_meeting = df_meeting[df_meeting["starttime"] <= convert_to_minutes("19:45:00")]
 
-    # Convert 'starttime' and 'endtime' columns back to 'HH:MM' format
-    df_meeting[['starttime', 'endtime']] = df_meeting[['starttime', 'endtime']].map(convert_to_hhmm)
-
-    # Convert 'starttime' and 'endtime' back to datetime.time format for display purposes
-    df_meeting["starttime"] = pd.to_datetime(df_meeting["starttime"], format="%H:%M").dt.time
-    df_meeting["endtime"] = pd.to_datetime(df_meeting["endtime"], format="%H:%M").dt.time
-
     return df_meeting
 
+@timed_rule
 def rem_invalid_meeting_duration_time(df_meeting):
     # 5. All ‘LWV’ sections have the correct hours
     # 6. ‘LWV’ meetings have a duration of 50 minutes; ‘MJ’ meetings have a duration of 75 minutes.
-    df_meeting.loc[df_meeting["cdays"] == "LWV", "duration"] = 50
-    df_meeting.loc[df_meeting["cdays"] == "MJ", "duration"] = 75
+    df_meeting = meeting_times_to_minutes(df_meeting)
+    duration = df_meeting["endtime"] - df_meeting["starttime"]
     df_meeting = df_meeting[
-        (
-            (df_meeting["cdays"] == "LWV")
-            & (
-                pd.to_datetime(df_meeting["endtime"], format="%H:%M:%S")
-                - pd.to_datetime(df_meeting["starttime"], format="%H:%M:%S")
-                == pd.Timedelta(minutes=50)
-            )
-        )
-        | (
-            (df_meeting["cdays"] == "MJ")
-            & (
-                pd.to_datetime(df_meeting["endtime"], format="%H:%M:%S")
-                - pd.to_datetime(df_meeting["starttime"], format="%H:%M:%S")
-                == pd.Timedelta(minutes=75)
-            )
-        )
+        ((df_meeting["cdays"] == "LWV") & (duration == 50))
+        | ((df_meeting["cdays"] == "MJ") & (duration == 75))
     ]
-    df_meeting.drop(columns=["duration"], inplace=True)
 
     return df_meeting
 
 
+@timed_rule
 def check_for_overlapping_section(df_section, df_meeting):
     # 3. A class cannot have the same section, they must be taught at different hours.
     # Delete sections with duplicate 'sid'
@@ -192,43 +208,70 @@ def check_for_overlapping_section(df_section, df_meeting):
     # Merge 'section' with 'meeting' to check for overlapping sections in the same room, time, and semester
     df_section_meeting = df_section.merge(df_meeting, on="mid")
 
-    # Convert 'starttime' and 'endtime' to time objects
-    df_section_meeting["starttime"] = df_section_meeting["starttime"]
-    df_section_meeting["endtime"] = df_section_meeting["endtime"]
-
-    # Sort the dataframe by room, semester, starttime, and sid
-    df_section_meeting = df_section_meeting.sort_values(
-        ["roomid", "semester", "starttime", "sid"]
-    )
-
-    # Detect overlapping sections (same room, same semester, same time)
-    overlaps = []
-    for (roomid, semester, starttime, cdays), group in df_section_meeting.groupby(
-        ["roomid", "semester", "starttime", "cdays"]
-    ):  
-        
-        for i in range(1, len(group)):
-            previous = group.iloc[i - 1]
-            current = group.iloc[i]
-
-            # Check if sections overlap in the same room, same time, and same semester
-            if (
-                current["starttime"] == previous["starttime"]
-                and current["roomid"] == previous["roomid"]
-                and current["semester"] == previous["semester"]
-                and current["years"] == previous["years"]
-                and current["cdays"] == previous["cdays"]
-            ):
-                # Add the section with the higher sid to the list of overlaps to delete
-                if current["sid"] > previous["sid"]:
-                    overlaps.append(current["sid"])
-                else:
-                    overlaps.append(previous["sid"])
-
+    overlaps = find_overlapping_sections(df_section_meeting)
     df_section = df_section[~df_section["sid"].isin(overlaps)]
 
     return df_section, df_meeting
 
+
+def find_overlapping_sections(df_section_meeting):
+    # Sids to drop so that no two kept sections overlap in the same room,
+    # semester, year and days. Sections are taken in sid order and kept when
+    # they overlap none of the sections already kept, so a conflict always
+    # keeps the lower sid and a dropped section cannot knock out another.
+    keys = ["roomid", "semester", "years", "cdays"]
+    df = df_section_meeting[keys + ["sid", "starttime", "endtime"]].copy()
+    df["start"] = time_to_minutes(df["starttime"])
+    df["end"] = time_to_minutes(df["endtime"])
+    df = df.sort_values(keys + ["start", "sid"])
+
+    group = df.groupby(keys, sort=False).ngroup().to_numpy()
+    start = df["start"].to_numpy()
+    end = df["end"].to_numpy()
+    sid = df["sid"].to_numpy()
+    # Latest end time among the rows up to each position, per group
+    reach = df.groupby(group)["end"].cummax().to_numpy()
+
+    # Every overlapping pair: compare each row with the rows k positions
+    # before it (k = 1, 2, ...) until no earlier row can still reach it
+    lower, higher = [], []
+    current = np.arange(len(df))
+    lag = 1
+    while current.size:
+        previous = current - lag
+        same_group = previous >= 0
+        same_group[same_group] = group[previous[same_group]] == group[current[same_group]]
+        current = current[same_group]
+        previous = previous[same_group]
+
+        # Rows that start after every earlier row ended are done
+        reachable = start[current] < reach[previous]
+        current = current[reachable]
+        previous = previous[reachable]
+
+        # previous starts no later than current, so they overlap when current
+        # starts before previous ends
+        overlap = start[current] < end[previous]
+        first = previous[overlap]
+        second = current[overlap]
+        swap = sid[first] > sid[second]
+        lower.append(np.where(swap, second, first))
+        higher.append(np.where(swap, first, second))
+        lag += 1
+    lower = np.concatenate(lower) if lower else np.zeros(0, dtype=np.int64)
+    higher = np.concatenate(higher) if higher else np.zeros(0, dtype=np.int64)
+
+    # Settle the sections in rounds: one is dropped when a lower sid it
+    # overlaps is kept, and kept once every lower sid it overlaps is dropped
+    UNDECIDED, KEPT, DROPPED = 0, 1, 2
+    state = np.zeros(len(df), dtype=np.int8)
+    while (state == UNDECIDED).any():
+        state[higher[(state[lower] == KEPT) & (state[higher] == UNDECIDED)]] = DROPPED
+        blocked = np.bincount(higher[state[lower] != DROPPED], minlength=len(df))
+        state[(state == UNDECIDED) & (blocked == 0)] = KEPT
+
+    return sid[state == DROPPED].tolist()
+
 def print_len_dataframes(df_section, df_class, df_meeting, df_room, df_requisite):
     print(f"Length of df_section: {len(df_section)}")
     print(f"Length of df_class: {len(df_class)}")
@@ -239,6 +282,7 @@ def print_len_dataframes(df_section, df_class, df_meeting, df_room, df_requisite
 
 
 # Transform the data
+@rule_run
 def clean_data():
     df_dict = update_names()
 
@@ -252,6 +296,9 @@ def clean_data():
     df_room = df_dict["df_room"]
     df_requisite = df_dict["df_requisite"]
 
+    # Parse the meeting times once; every rule below works on int16 minutes
+    df_meeting = meeting_times_to_minutes(df_meeting)
+
     # Ensure that classes have ID starting from 2
     df_section, df_class = rem_classes_with_invalid_ID(df_section, df_class)
 
@@ -1,15 +1,51 @@
-from flask import Flask, request
+from flask import Flask, g, has_app_context, jsonify, request
 from flask_cors import CORS
 
+from dao.catalog import getCatalogStats
+from config.app_config import timing_config
+from dao.pool import getPoolStats, releaseConnection
+
 from handler.section import SectionHandler
 from handler.meeting import MeetingHandler
 from handler.requisite import RequisiteHandler
 from handler.course import ClassHandler
 from handler.room import RoomHandler
 from handler.registration import RegistrationHandler
+from handler.rule_timing import add_run_listener, configure, getRuleStats, serverTiming
+from handler.statistics import statisticsResponse
 
 app = Flask(__name__)
-CORS(app)
+# Let browser clients read the pagination and statistics headers
+CORS(
+    app,
+    expose_headers=["X-Next-Cursor", "X-Statistics-Stale", "X-Statistics-Refreshed-At"],
+)
+
+
+configure(enabled=timing_config["enabled"], memory=timing_config["memory"])
+
+
+# Validation runs of the current request, for the Server-Timing header
+def keepRuleRun(run):
+    if has_app_context():
+        g.setdefault("rule_runs", []).append(run)
+
+
+add_run_listener(keepRuleRun)
+
+
+# Per-rule timings of the validation runs made by a write, when enabled
+@app.after_request
+def addServerTiming(response):
+    if timing_config["header"] and g.get("rule_runs"):
+        response.headers["Server-Timing"] = serverTiming(g.rule_runs)
+    return response
+
+
+# Return the request's database connection to the pool, even when the route failed
+@app.teardown_appcontext
+def returnConnection(exception):
+    releaseConnection()
 
 
 # ROOT ROUTE
@@ -18,15 +54,27 @@ def hello_world():
     return "This is the RestAPI of Segmentation Fault team."
 
 
+# Runtime metrics of this worker
+@app.route("/segmentation_fault/metrics", methods=["GET"])
+def metrics():
+    return jsonify(pool=getPoolStats(), catalog=getCatalogStats(), rules=getRuleStats())
+
+
 # SECTION ROUTES
 @app.route("/segmentation_fault/section", methods=["GET", "POST"])
 def section():
     if request.method == "GET":
-        return SectionHandler().getAllSection()
+        return SectionHandler().getAllSection(request.args)
     else:
         return SectionHandler().insertSection(request.json)
 
 
+# Insert a list of sections, with a per-row report
+@app.route("/segmentation_fault/section/bulk", methods=["POST"])
+def sectionBulk():
+    return SectionHandler().insertSectionBulk(request.json)
+
+
 @app.route("/segmentation_fault/section/<int:sid>", methods=["GET", "PUT", "DELETE"])
 def sectionByID(sid):
     if request.method == "DELETE":
@@ -41,11 +89,22 @@ def sectionByID(sid):
 @app.route("/segmentation_fault/meeting", methods=["GET", "POST"])
 def meeting():
     if request.method == "GET":
-        return MeetingHandler().getAllMeeting()
+        return MeetingHandler().getAllMeeting(request.args)
     else:
         return MeetingHandler().insertMeeting(request.json)
 
 
+@app.route("/segmentation_fault/meeting/bulk", methods=["POST"])
+def meetingBulk():
+    return MeetingHandler().insertMeetingBulk(request.json)
+
+
+# Meetings that conflict with ?start=&end=&cdays=
+@app.route("/segmentation_fault/meeting/conflicts", methods=["GET"])
+def meetingConflicts():
+    return MeetingHandler().getMeetingConflicts(request.args)
+
+
 @app.route("/segmentation_fault/meeting/<int:mid>", methods=["GET", "PUT", "DELETE"])
 def meetingByMID(mid):
     if request.method == "GET":
@@ -60,11 +119,16 @@ def meetingByMID(mid):
 @app.route("/segmentation_fault/room", methods=["GET", "POST"])
 def room():
     if request.method == "GET":
-        return RoomHandler().getAllRoom()
+        return RoomHandler().getAllRoom(request.args)
     else:
         return RoomHandler().insertRoom(request.json)
 
 
+@app.route("/segmentation_fault/room/bulk", methods=["POST"])
+def roomBulk():
+    return RoomHandler().insertRoomBulk(request.json)
+
+
 @app.route("/segmentation_fault/room/<int:rid>", methods=["GET", "PUT", "DELETE"])
 def roomByRID(rid):
     if request.method == "GET":
@@ -79,7 +143,7 @@ def roomByRID(rid):
 @app.route("/segmentation_fault/class", methods=["GET", "POST"])
 def courses():
     if request.method == "GET":
-        return ClassHandler().getAllClass()
+        return ClassHandler().getAllClass(request.args)
     elif request.method == "POST":
         return ClassHandler().insertClass(request.json)
 
@@ -94,15 +158,42 @@ def courseByID(cid):
         return ClassHandler().deleteClassById(cid)
 
 
+# Requisite chains of a class, from the in-memory requisite graph
+@app.route("/segmentation_fault/class/<int:cid>/prerequisites", methods=["GET"])
+def classPrerequisites(cid):
+    return RequisiteHandler().getPrerequisiteChain(cid)
+
+
+@app.route("/segmentation_fault/class/<int:cid>/dependents", methods=["GET"])
+def classDependents(cid):
+    return RequisiteHandler().getDependents(cid)
+
+
+@app.route("/segmentation_fault/class/<int:cid>/prerequisites/longest", methods=["GET"])
+def classLongestPrerequisiteChain(cid):
+    return RequisiteHandler().getLongestPath(cid)
+
+
 # REQUISITE ROUTES
 @app.route("/segmentation_fault/requisite", methods=["GET", "POST"])
 def requisite():
     if request.method == "GET":
-        return RequisiteHandler().getAllRequisite()
+        return RequisiteHandler().getAllRequisite(request.args)
     else:
         return RequisiteHandler().insertRequisite(request.json)
 
 
+@app.route("/segmentation_fault/requisite/bulk", methods=["POST"])
+def requisiteBulk():
+    return RequisiteHandler().insertRequisiteBulk(request.json)
+
+
+# Longest requisite chain in the catalog
+@app.route("/segmentation_fault/requisite/longest", methods=["GET"])
+def requisiteLongestChain():
+    return RequisiteHandler().getLongestPath()
+
+
 @app.route(
     "/segmentation_fault/requisite/<int:classid>/<int:reqid>",
     methods=["GET", "PUT", "DELETE"],
@@ -122,50 +213,56 @@ def requisiteByClassIdReqId(classid, reqid):
 # Top 3 rooms per building with the most capacity
 @app.route("/segmentation_fault/room/<string:building>/capacity", methods=["POST"])
 def getMaxCapacity(building):
-    return RoomHandler().getMaxCapacity(building)
+    return statisticsResponse(lambda: RoomHandler().getMaxCapacity(building), live=True)
 
 
 # Top 3 rooms with the most student-to-capacity ratio
 @app.route("/segmentation_fault/room/<string:building>/ratio", methods=["POST"])
 def getRatioByBuilding(building):
-    return RoomHandler().getRatioByBuilding(building)
+    return statisticsResponse(lambda: RoomHandler().getRatioByBuilding(building))
 
 
 # Top 3 classes that were taught the most per room
 @app.route("/segmentation_fault/room/<id>/classes", methods=["POST"])
 def mostPerRoom(id):
-    return ClassHandler().getMostPerRoom(id)
+    return statisticsResponse(lambda: ClassHandler().getMostPerRoom(id))
 
 
 # Top 3 most taught classes per semester per year
 @app.route("/segmentation_fault/classes/<year>/<semester>", methods=["POST"])
 def mostPerSemester(year, semester):
-    return ClassHandler().getMostPerSemester(year, semester)
+    return statisticsResponse(lambda: ClassHandler().getMostPerSemester(year, semester))
 
 
 # GLOBAL STATICS (4/4)
 # Top 5 meetings with the most sections
 @app.route("/segmentation_fault/most/meeting", methods=["POST"])
 def mostMeeting():
-    return MeetingHandler().getMostMeeting()
+    return statisticsResponse(MeetingHandler().getMostMeeting)
 
 
 # Top 3 classes that appears the most as prerequisite to other classes
 @app.route("/segmentation_fault/most/prerequisite", methods=["POST"])
 def mostPrerequisite():
-    return ClassHandler().getMostPrerequisite()
+    return statisticsResponse(ClassHandler().getMostPrerequisite)
 
 
 # Top 3 classes that were offered the least
 @app.route("/segmentation_fault/least/classes", methods=["POST"])
 def leastClass():
-    return ClassHandler().getLeastClass()
+    return statisticsResponse(ClassHandler().getLeastClass)
 
 
 # Total number of sections per year
 @app.route("/segmentation_fault/section/year", methods=["POST"])
 def sectionYear():
-    return SectionHandler().getSectionPerYear()
+    return statisticsResponse(SectionHandler().getSectionPerYear)
+
+
+# Top k section groups over any dimensions, from the in-memory section cube
+@app.route("/segmentation_fault/section/analytics", methods=["GET"])
+def sectionAnalytics():
+    return SectionHandler().getSectionAnalytics(request.args)
 
 
 # USER ROUTES
@@ -0,0 +1,83 @@
+import os
+
+# How section and requisite writes are validated:
+#   "incremental" checks only the candidate row with targeted lookups
+#   "full" reloads every table and runs handler.data_validation.clean_data
+validation_config = {
+    "mode": os.environ.get("VALIDATION_MODE", "incremental"),
+}
+
+# In-memory snapshot of the read-mostly catalog tables (class, room, meeting, requisite)
+catalog_config = {
+    "enabled": os.environ.get("CATALOG_CACHE", "1") != "0",
+    # Writes made by another worker process are only seen through this bound (seconds)
+    "max_age": float(os.environ.get("CATALOG_MAX_AGE", 5)),
+}
+
+# Streaming mode for the collection GETs (section, class, meeting, room)
+stream_config = {
+    # Stream even when the request does not ask for it with ?stream=true
+    "default": os.environ.get("STREAM_RESPONSES", "0") == "1",
+    # Rows fetched per round trip by the server-side cursor
+    "fetch_size": int(os.environ.get("STREAM_FETCH_SIZE", 2000)),
+}
+
+# Keyset pagination on the collection GETs (?limit=&after=)
+page_config = {
+    # Largest page a client can ask for
+    "max_limit": int(os.environ.get("PAGE_MAX_LIMIT", 1000)),
+}
+
+# Precomputed statistics (materialized views from migrations/0003_statistics_views.sql)
+statistics_config = {
+    # "write": refresh in the background shortly after a write made through the DAOs
+    # "read": refresh when a statistics route finds the views stale
+    "refresh": os.environ.get("STATISTICS_REFRESH", "write"),
+    # Writes arriving within this window share one refresh (seconds)
+    "debounce": float(os.environ.get("STATISTICS_DEBOUNCE", 2)),
+}
+
+# Bulk write endpoints (POST /segmentation_fault/<table>/bulk)
+bulk_config = {
+    # Largest batch accepted in one request
+    "max_rows": int(os.environ.get("BULK_MAX_ROWS", 5000)),
+}
+
+# Per-rule timing of the validation pipeline (handler/rule_timing.py)
+timing_config = {
+    # Record and log every validation run
+    "enabled": os.environ.get("RULE_TIMING", "1") != "0",
+    # Also trace memory per rule (tracemalloc, slows the rules down noticeably)
+    "memory": os.environ.get("RULE_TIMING_MEMORY", "0") == "1",
+    # Add a Server-Timing header to the write responses that ran the rules
+    "header": os.environ.get("RULE_TIMING_HEADER", "0") == "1",
+}
+
+# Sentence embedding model of the chatbot (vectorDB/chatBot/embedding.py)
+embedding_config = {
+    "model": os.environ.get("EMBEDDING_MODEL", "all-MiniLM-L6-v2"),
+    # Unix socket of a shared embedding worker (embedding_server.py); empty to
+    # load the model in every process that embeds
+    "socket": os.environ.get("EMBEDDING_SOCKET", ""),
+    # Shared secret of the worker and its clients: connections that do not
+    # know it are refused before anything they send is unpickled
+    "authkey": os.environ.get("EMBEDDING_AUTHKEY", ""),
+    # Seconds a client answers with its own model before trying the worker again
+    "retry": float(os.environ.get("EMBEDDING_RETRY", "30")),
+    # Load the model when the chatbot page starts instead of on the first question
+    "warmup": os.environ.get("EMBEDDING_WARMUP", "1") != "0",
+}
+
+# Where the chatbot looks up the syllabus chunks closest to a question
+retrieval_config = {
+    # "pgvector": ORDER BY embedding_text <=> in the database
+    # "local": dao/syllabus_index.py, a memory-mapped copy of the embeddings
+    "backend": os.environ.get("RETRIEVAL_BACKEND", "pgvector"),
+    # Folder of the local index, rebuilt from the syllabus table when missing
+    "index_dir": os.environ.get(
+        "RETRIEVAL_INDEX_DIR",
+        os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "syllabus_index")),
+    ),
+    # Also build an HNSW graph (needs hnswlib, skipped when missing)
+    "hnsw": os.environ.get("RETRIEVAL_HNSW", "1") != "0",
+}
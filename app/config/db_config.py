@@ -1,7 +1,23 @@
+import os
+
+# The libpq variables (PGHOST, PGDATABASE, ...) point the app at another
+# database, e.g. a local one for the benchmarks
 pg_config = {
-    "user": "ubj1eoeaku13t6",
-    "password": "pdef0051a9c37a2f131b786f09aaeb192dffcbe140fe7d048dcc6c62342c3dbcc",
-    "dbname": "d4i4fjj12gdddt",
-    "host": "c3cj4hehegopde.cluster-czrs8kj4isg7.us-east-1.rds.amazonaws.com",
-    "port": "5432",
+    "user": os.environ.get("PGUSER", "ubj1eoeaku13t6"),
+    "password": os.environ.get("PGPASSWORD", "pdef0051a9c37a2f131b786f09aaeb192dffcbe140fe7d048dcc6c62342c3dbcc"),
+    "dbname": os.environ.get("PGDATABASE", "d4i4fjj12gdddt"),
+    "host": os.environ.get("PGHOST", "c3cj4hehegopde.cluster-czrs8kj4isg7.us-east-1.rds.amazonaws.com"),
+    "port": os.environ.get("PGPORT", "5432"),
+}
+
+# Connection pool shared by every DAO (one pool per gunicorn worker)
+pool_config = {
+    # Connections opened when the pool is created
+    "minconn": int(os.environ.get("DB_POOL_MIN", 1)),
+    # Hard limit of connections open at the same time
+    "maxconn": int(os.environ.get("DB_POOL_MAX", 10)),
+    # Seconds to wait for a free connection before giving up
+    "timeout": float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+    # Idle seconds after which a connection is pinged before being reused
+    "ping_after": float(os.environ.get("DB_POOL_PING_AFTER", 30)),
 }
@@ -0,0 +1,114 @@
+import threading
+import time
+
+from config.app_config import catalog_config
+
+
+_lock = threading.Lock()
+
+# Monotonic catalog version, bumped by every write made through the DAOs
+_version = 0
+# Version of the last write that touched each table
+_table_versions = {}
+# table -> (version when loaded, load time, rows)
+_snapshots = {}
+# (table, name) -> (snapshot rows it was built from, value)
+_derived = {}
+_stats = {"hits": 0, "misses": 0}
+# Called with the written tables after every bump
+_listeners = []
+
+
+def addCatalogListener(listener):
+    _listeners.append(listener)
+
+
+def bumpCatalogVersion(*tables):
+    global _version
+    with _lock:
+        _version += 1
+        for table in tables:
+            _table_versions[table] = _version
+        version = _version
+
+    for listener in _listeners:
+        listener(tables)
+    return version
+
+
+def getCatalogVersion(table=None):
+    with _lock:
+        if table is None:
+            return _version
+        return _table_versions.get(table, 0)
+
+
+def _tableVersion(table):
+    # A tuple of tables (rows of a join) is as recent as its latest written table
+    if isinstance(table, tuple):
+        return max(_table_versions.get(name, 0) for name in table)
+    return _table_versions.get(table, 0)
+
+
+def _snapshotRows(table, loader):
+    # The table's current snapshot as an immutable tuple, reloaded lazily after a write
+    with _lock:
+        snapshot = _snapshots.get(table)
+        if (
+            snapshot is not None
+            and snapshot[0] >= _tableVersion(table)
+            and time.monotonic() - snapshot[1] < catalog_config["max_age"]
+        ):
+            _stats["hits"] += 1
+            return snapshot[2]
+        _stats["misses"] += 1
+        # Read the version before loading so a write during the load invalidates it
+        version = _version
+
+    rows = tuple(loader())
+    with _lock:
+        current = _snapshots.get(table)
+        if current is None or current[0] <= version:
+            _snapshots[table] = (version, time.monotonic(), rows)
+    return rows
+
+
+def getSnapshot(table, loader):
+    # Rows of the table served from memory
+    if not catalog_config["enabled"]:
+        return loader()
+    return list(_snapshotRows(table, loader))
+
+
+def getDerived(table, name, loader, build):
+    # A structure built from the table's snapshot (an index, for example),
+    # rebuilt only when the snapshot itself is reloaded. table can be a tuple
+    # of tables when loader joins them.
+    if not catalog_config["enabled"]:
+        return build(loader())
+
+    rows = _snapshotRows(table, loader)
+    with _lock:
+        derived = _derived.get((table, name))
+        if derived is not None and derived[0] is rows:
+            return derived[1]
+
+    value = build(rows)
+    with _lock:
+        _derived[(table, name)] = (rows, value)
+    return value
+
+
+def getCatalogStats():
+    with _lock:
+        stats = dict(_stats)
+        stats["version"] = _version
+        stats["tables"] = {
+            "+".join(table) if isinstance(table, tuple) else table: {
+                "version": snapshot[0],
+                "rows": len(snapshot[2]),
+                "age": round(time.monotonic() - snapshot[1], 3),
+            }
+            for table, snapshot in _snapshots.items()
+        }
+        return stats
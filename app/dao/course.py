@@ -1,22 +1,27 @@
-from config.db_config import pg_config
+from dao.catalog import bumpCatalogVersion, getSnapshot
+from dao.pagination import buildPageQuery
+from dao.pool import getConnection
+from dao.requisite_graph import updateRequisiteGraph
 import pandas as pd
 import psycopg2 as pg
+import psycopg2.errors
+
+# Columns a client can filter the class collection on, with their types
+CLASS_FILTERS = {}
+
+# Key the class pages are ordered and resumed by
+CLASS_PAGE_KEY = ("cid",)
 
 
 class ClassDAO:
     def __init__(self):
-        # Create the connection string
-        url = "dbname=%s password=%s user=%s host=%s port=%s" % (
-            pg_config["dbname"],
-            pg_config["password"],
-            pg_config["user"],
-            pg_config["host"],
-            pg_config["port"],
-        )
-
-        self.conn = pg.connect(url)
+        # Borrow the request's connection from the shared pool
+        self.conn = getConnection()
 
     def getAllClass(self):
+        return getSnapshot("class", self.loadAllClass)
+
+    def loadAllClass(self):
         cursor = self.conn.cursor()
         query = (
             "SELECT cid, cname, ccode, cdesc, term, years, cred, csyllabus FROM class;"
@@ -27,6 +32,41 @@ class ClassDAO:
             result.append(row)
         return result
 
+    def streamAllClass(self, fetch_size, filters=None, after=None):
+        # Server-side cursor: Postgres sends fetch_size rows per round trip
+        cursor = self.conn.cursor(name="stream_class")
+        cursor.itersize = fetch_size
+        query, params = buildPageQuery(
+            "SELECT cid, cname, ccode, cdesc, term, years, cred, csyllabus FROM class",
+            CLASS_PAGE_KEY,
+            filters or {},
+            CLASS_FILTERS,
+            after,
+        )
+        cursor.execute(query, params)
+        try:
+            for row in cursor:
+                yield row
+        finally:
+            cursor.close()
+
+    def getClassPage(self, filters, after=None, limit=None):
+        # Keyset page: rows after the given key that match every filter
+        cursor = self.conn.cursor()
+        query, params = buildPageQuery(
+            "SELECT cid, cname, ccode, cdesc, term, years, cred, csyllabus FROM class",
+            CLASS_PAGE_KEY,
+            filters,
+            CLASS_FILTERS,
+            after,
+            limit,
+        )
+        cursor.execute(query, params)
+        result = []
+        for row in cursor:
+            result.append(row)
+        return result
+
     def getClassById(self, cid):
         cursor = self.conn.cursor()
         query = "SELECT cid, cname, ccode, cdesc, term, years, cred, csyllabus FROM class WHERE cid = %s;"
@@ -41,65 +81,49 @@ class ClassDAO:
         result = cursor.fetchone()
         return result
 
-    def exactDuplicate(self, Val, method):
+    def findDuplicates(self, tempV, cid=None):
+        # Probe every duplicate kind in a single round trip. When a cid is given
+        # (update), rows other than that class are reported first.
         cursor = self.conn.cursor()
-        find_duplicate_query = "SELECT * FROM class WHERE cname = %s AND ccode = %s AND cdesc = %s AND term = %s AND years = %s AND cred = %s AND csyllabus = %s;"
-        cursor.execute(
-            find_duplicate_query,
-            (
-                Val["cname"],
-                Val["ccode"],
-                Val["cdesc"],
-                Val["term"],
-                Val["years"],
-                Val["cred"],
-                Val["csyllabus"],
-            ),
-        )
-        if method == "insert":
-            return cursor.rowcount == 1
-        
-        elif method == "update":
-             result = cursor.fetchone()
-             if result is not None:
-                return result[0]
-             return None
-    
-    
-    def cname_and_ccodeDuplicate(self, tempV):
-        cursor = self.conn.cursor()
-        find_duplicate_query = "SELECT cid FROM class WHERE cname = %s AND ccode = %s;"
-        cursor.execute(find_duplicate_query, (tempV["cname"], tempV["ccode"]))
-        result = cursor.fetchone()
-        if result is not None:
-            return result[0]
-        return None
-    
-    
-    def cdescDuplicate(self, tempV):
-        cursor = self.conn.cursor()
-        find_duplicate_query = "SELECT cid FROM class WHERE cdesc = %s;"
-        cursor.execute(find_duplicate_query, (tempV["cdesc"],))
-        result = cursor.fetchone()
-        if result is not None:
-            return result[0]
-        return None
-    
-    def csyllabusDuplicate(self, tempV):
-        cursor = self.conn.cursor()
-        find_duplicate_query = "SELECT cid FROM class WHERE csyllabus = %s;"
-        cursor.execute(find_duplicate_query, (tempV["csyllabus"],))
+        find_duplicates_query = """
+            SELECT
+                (SELECT cid FROM class
+                 WHERE cname = %(cname)s AND ccode = %(ccode)s AND cdesc = %(cdesc)s AND term = %(term)s
+                 AND years = %(years)s AND cred = %(cred)s AND csyllabus = %(csyllabus)s
+                 ORDER BY cid = %(cid)s, cid LIMIT 1),
+                (SELECT cid FROM class WHERE cname = %(cname)s AND ccode = %(ccode)s
+                 ORDER BY cid = %(cid)s, cid LIMIT 1),
+                (SELECT cid FROM class WHERE cdesc = %(cdesc)s
+                 ORDER BY cid = %(cid)s, cid LIMIT 1),
+                (SELECT cid FROM class WHERE csyllabus = %(csyllabus)s
+                 ORDER BY cid = %(cid)s, cid LIMIT 1);
+        """
+        params = dict(tempV)
+        params["cid"] = cid
+        cursor.execute(find_duplicates_query, params)
         result = cursor.fetchone()
-        if result is not None:
-            return result[0]
-        return None
-    
+        return {
+            "exact": result[0],  # type: ignore
+            "cname_and_ccode": result[1],  # type: ignore
+            "cdesc": result[2],  # type: ignore
+            "csyllabus": result[3],  # type: ignore
+        }
+
     def classExists(self, cid):
         cursor = self.conn.cursor()
         query = "SELECT * FROM class WHERE cid = %s;"
         cursor.execute(query, [cid])
         return cursor.rowcount == 1
     
+    def getClassesByIds(self, cids):
+        cursor = self.conn.cursor()
+        query = "SELECT cid, cname, ccode, cdesc, term, years, cred, csyllabus FROM class WHERE cid = ANY(%s);"
+        cursor.execute(query, (list(cids),))
+        result = []
+        for row in cursor:
+            result.append(row)
+        return result
+
     def verifySectionsAs(self, cid):
         cursor = self.conn.cursor()
         query = "SELECT * FROM section WHERE cid = %s;"
@@ -114,16 +138,27 @@ class ClassDAO:
     def insertClass(self, cname, ccode, cdesc, term, years, cred, csyllabus):
         cursor = self.conn.cursor()
         query = "INSERT INTO class(cname, ccode, cdesc, term, years, cred, csyllabus) VALUES (%s, %s, %s, %s, %s, %s, %s) returning cid;"
-        cursor.execute(query, [cname, ccode, cdesc, term, years, cred, csyllabus])
+        try:
+            cursor.execute(query, [cname, ccode, cdesc, term, years, cred, csyllabus])
+        except pg.errors.UniqueViolation:
+            # Another request inserted the same cname and ccode after our duplicate probe
+            self.conn.rollback()
+            return None
         cid = cursor.fetchone()[0]  # type: ignore
         self.conn.commit()
+        bumpCatalogVersion("class")
         return cid
 
     def updateClassById(self, cid, cname, ccode, cdesc, term, years, cred, csyllabus):
         cursor = self.conn.cursor()
         query = "UPDATE class SET cname = %s, ccode = %s, cdesc = %s, term = %s, years = %s, cred = %s, csyllabus = %s WHERE cid = %s;"
-        cursor.execute(query, [cname, ccode, cdesc, term, years, cred, csyllabus, cid])
+        try:
+            cursor.execute(query, [cname, ccode, cdesc, term, years, cred, csyllabus, cid])
+        except pg.errors.UniqueViolation:
+            self.conn.rollback()
+            return None
         self.conn.commit()
+        bumpCatalogVersion("class")
         # return boolean if the update was successful
         rowcount = cursor.rowcount
         return rowcount == 1
@@ -161,18 +196,17 @@ class ClassDAO:
         query = "DELETE FROM class WHERE cid = %s;"
         cursor.execute(query, [cid])
         self.conn.commit()
+        updateRequisiteGraph(lambda graph: graph.removeClass(cid), "class", "section", "syllabus")
         rowcount = cursor.rowcount
         return rowcount == 1
 
     def getMostPrerequisite(self):
         cursor = self.conn.cursor()
         query = """
-            SELECT c.cid, c.cname, c.ccode, c.cdesc, c.term, c.years, c.cred, c.csyllabus, COUNT(r.classid) AS prerequisite_classes 
-            FROM requisite AS r 
-            INNER JOIN class AS c ON r.reqid = c.cid 
-            WHERE r.prereq = TRUE
-            GROUP BY c.cid, c.cname, c.ccode, c.cdesc, c.term, c.years, c.cred, c.csyllabus 
-            ORDER BY prerequisite_classes DESC 
+            SELECT c.cid, c.cname, c.ccode, c.cdesc, c.term, c.years, c.cred, c.csyllabus, p.prerequisite_classes
+            FROM stats_prerequisite_count AS p
+            INNER JOIN class AS c ON p.cid = c.cid
+            ORDER BY p.prerequisite_classes DESC
             LIMIT 3;
         """
         cursor.execute(query)
@@ -184,10 +218,9 @@ class ClassDAO:
     def getMostPerRoom(self, id):
         cursor = self.conn.cursor()
         query = "WITH temp AS ( \
-                    SELECT cid, COUNT(cid) as class_count \
-                    FROM section \
+                    SELECT cid, class_count \
+                    FROM stats_class_per_room \
                     WHERE roomid = %s \
-                    GROUP BY cid \
                     ORDER BY class_count DESC \
                     LIMIT 3 \
                 ) \
@@ -204,10 +237,10 @@ class ClassDAO:
     def getLeastClass(self):
         cursor = self.conn.cursor()
         query = """
-                SELECT class.cid, class.cname, class.ccode, class.cdesc, class.term, class.years, class.cred, class.csyllabus, class_count FROM class NATURAL JOIN 
-                ( SELECT cid, COUNT(*) as class_count FROM section INNER JOIN class using (cid) GROUP BY cid ) as temp
-                GROUP BY cid, class_count
-                ORDER BY class_count
+                SELECT class.cid, class.cname, class.ccode, class.cdesc, class.term, class.years, class.cred, class.csyllabus, temp.class_count
+                FROM stats_class_sections AS temp
+                INNER JOIN class USING (cid)
+                ORDER BY temp.class_count
                 LIMIT 3;
             """
         cursor.execute(query)
@@ -219,12 +252,10 @@ class ClassDAO:
     def getMostPerSemester(self, year, semester):
         cursor = self.conn.cursor()
         query = "WITH temp AS ( \
-                        SELECT cid, COUNT(cid) AS count \
-                        FROM section AS s \
-                        INNER JOIN class USING (cid) \
-                        WHERE s.years = %s AND s.semester = %s \
-                        GROUP BY cid \
-                        ORDER BY count DESC \
+                        SELECT cid, class_count AS count \
+                        FROM stats_class_per_term \
+                        WHERE years = %s AND semester = %s \
+                        ORDER BY class_count DESC \
                         LIMIT 3 \
                     ) \
                     SELECT class.*, temp.count \
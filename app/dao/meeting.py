@@ -1,7 +1,20 @@
-from config.db_config import pg_config
+from psycopg2 import Error
+from psycopg2.errors import ExclusionViolation
+from psycopg2.extras import execute_values
+
+from config.app_config import catalog_config
+from dao.catalog import bumpCatalogVersion, getDerived, getSnapshot
+from dao.meeting_index import MeetingIndex
+from dao.pagination import buildPageQuery
+from dao.pool import getConnection
 from datetime import datetime
 
-import psycopg2 as pg
+# Columns a client can filter the meeting collection on, with their types
+MEETING_FILTERS = {"cdays": str}
+
+# Key the meeting pages are ordered and resumed by
+MEETING_PAGE_KEY = ("mid",)
+
 
 def convert_to_minutes(time_str):
     hours, minutes, _ = map(int, time_str.split(':'))
@@ -9,19 +22,18 @@ def convert_to_minutes(time_str):
 
 class MeetingDAO:
     def __init__(self):
-        # Create the connection string
-        url = "dbname=%s password=%s user=%s host=%s port=%s" % (
-            pg_config["dbname"],
-            pg_config["password"],
-            pg_config["user"],
-            pg_config["host"],
-            pg_config["port"],
-        )
+        # Borrow the request's connection from the shared pool
+        self.conn = getConnection()
 
-        self.conn = pg.connect(url)
+    def getMeetingIndex(self):
+        # Interval index over the meeting snapshot, rebuilt after meeting writes
+        return getDerived("meeting", "index", self.loadAllMeeting, MeetingIndex)
 
     def checkMeetingDuplicate(self, ccode, starttime, endtime, cdays):
-        # print(ccode, starttime, endtime, cdays)
+        if catalog_config["enabled"]:
+            mid = self.getMeetingIndex().findDuplicate(ccode, starttime, endtime, cdays)
+            return (mid,) if mid is not None else None
+
         cursor = self.conn.cursor()
         conflict_check_query = "SELECT mid FROM meeting WHERE ccode = %s AND starttime = %s::time AND endtime = %s::time AND cdays = %s;"
         cursor.execute(conflict_check_query, (ccode, starttime, endtime, cdays))
@@ -29,10 +41,13 @@ class MeetingDAO:
         return mid
     
     def checkMeetingConflict(self, starttime, endtime, cdays):
+        if catalog_config["enabled"]:
+            return self.getMeetingIndex().findConflicts(starttime, endtime, cdays)
+
         cursor = self.conn.cursor()
         conflict_query = """
-            SELECT * 
-            FROM meeting 
+            SELECT mid, ccode, starttime, endtime, cdays
+            FROM meeting
             WHERE cdays = %s AND 
             ((starttime < %s AND endtime >= %s) 
             OR (starttime <= %s AND endtime > %s));
@@ -45,6 +60,9 @@ class MeetingDAO:
 
 
     def getAllMeeting(self):
+        return getSnapshot("meeting", self.loadAllMeeting)
+
+    def loadAllMeeting(self):
         cursor = self.conn.cursor()
         query = "SELECT mid, ccode, starttime, endtime, cdays FROM meeting;"
         cursor.execute(query)
@@ -53,6 +71,41 @@ class MeetingDAO:
             result.append(row)
         return result
 
+    def streamAllMeeting(self, fetch_size, filters=None, after=None):
+        # Server-side cursor: Postgres sends fetch_size rows per round trip
+        cursor = self.conn.cursor(name="stream_meeting")
+        cursor.itersize = fetch_size
+        query, params = buildPageQuery(
+            "SELECT mid, ccode, starttime, endtime, cdays FROM meeting",
+            MEETING_PAGE_KEY,
+            filters or {},
+            MEETING_FILTERS,
+            after,
+        )
+        cursor.execute(query, params)
+        try:
+            for row in cursor:
+                yield row
+        finally:
+            cursor.close()
+
+    def getMeetingPage(self, filters, after=None, limit=None):
+        # Keyset page: rows after the given key that match every filter
+        cursor = self.conn.cursor()
+        query, params = buildPageQuery(
+            "SELECT mid, ccode, starttime, endtime, cdays FROM meeting",
+            MEETING_PAGE_KEY,
+            filters,
+            MEETING_FILTERS,
+            after,
+            limit,
+        )
+        cursor.execute(query, params)
+        result = []
+        for row in cursor:
+            result.append(row)
+        return result
+
     def getMeetingByMid(self, mid):
         cursor = self.conn.cursor()
         query = (
@@ -62,6 +115,15 @@ class MeetingDAO:
         result = cursor.fetchone()
         return result
 
+    def getMeetingsByMids(self, mids):
+        cursor = self.conn.cursor()
+        query = "SELECT mid, ccode, starttime, endtime, cdays FROM meeting WHERE mid = ANY(%s);"
+        cursor.execute(query, (list(mids),))
+        result = []
+        for row in cursor:
+            result.append(row)
+        return result
+
     def insertMeeting(self, ccode, starttime, endtime, cdays, delta_time_to_left=None, delta_time_to_right=None):
         cursor = self.conn.cursor()
 
@@ -71,15 +133,35 @@ class MeetingDAO:
             delta_time_to_right = "00:00"
         
         query = "INSERT INTO meeting(ccode, starttime, endtime, cdays) VALUES (%s, %s, %s, %s) RETURNING mid;"
-        cursor.execute(query, (ccode, starttime, endtime, cdays))
+        try:
+            cursor.execute(query, (ccode, starttime, endtime, cdays))
 
-        mid = cursor.fetchone()
-        if mid and (delta_time_to_left != "00:00" or delta_time_to_right != "00:00" and cdays == "MJ"):
-            self.updateAllMeetingTime(ccode, starttime, endtime, cdays, delta_time_to_left, delta_time_to_right, mid)
+            mid = cursor.fetchone()
+            if mid and (delta_time_to_left != "00:00" or delta_time_to_right != "00:00" and cdays == "MJ"):
+                self.updateAllMeetingTime(ccode, starttime, endtime, cdays, delta_time_to_left, delta_time_to_right, mid)
 
-        self.conn.commit()
+            self.conn.commit()
+        except ExclusionViolation:
+            # Shifting the MJ meetings would double-book a room (section_room_time_excl)
+            self.conn.rollback()
+            raise
+        bumpCatalogVersion("meeting")
         return mid
     
+    def insertMeetings(self, meetings):
+        # meetings: (ccode, starttime, endtime, cdays) tuples, one transaction
+        cursor = self.conn.cursor()
+        query = "INSERT INTO meeting(ccode, starttime, endtime, cdays) VALUES %s RETURNING mid, ccode, starttime, endtime, cdays;"
+        try:
+            result = execute_values(cursor, query, meetings, fetch=True)
+        except Error:
+            # Nothing from the batch is kept
+            self.conn.rollback()
+            raise
+        self.conn.commit()
+        bumpCatalogVersion("meeting")
+        return result
+
     def updateMeetingByMid(self, mid, ccode, starttime, endtime, cdays, delta_time_to_left=None, delta_time_to_right=None):
         cursor = self.conn.cursor()
 
@@ -89,13 +171,19 @@ class MeetingDAO:
             delta_time_to_right = "00:00"
 
         query = "UPDATE meeting SET ccode = %s, starttime = %s, endtime = %s, cdays = %s WHERE mid = %s RETURNING mid;"
-        cursor.execute(query, (ccode, starttime, endtime, cdays, mid))
+        try:
+            cursor.execute(query, (ccode, starttime, endtime, cdays, mid))
 
-        mid = cursor.fetchone()
-        if mid and (delta_time_to_left != "00:00" or delta_time_to_right != "00:00" and cdays == "MJ"):
-            self.updateAllMeetingTime(ccode, starttime, endtime, cdays, delta_time_to_left, delta_time_to_right, mid)
+            mid = cursor.fetchone()
+            if mid and (delta_time_to_left != "00:00" or delta_time_to_right != "00:00" and cdays == "MJ"):
+                self.updateAllMeetingTime(ccode, starttime, endtime, cdays, delta_time_to_left, delta_time_to_right, mid)
 
-        self.conn.commit()
+            self.conn.commit()
+        except ExclusionViolation:
+            # The new time double-books a room of its sections (section_room_time_excl)
+            self.conn.rollback()
+            raise
+        bumpCatalogVersion("meeting")
         return mid
     
     def updateAllMeetingTime(self, ccode, starttime, endtime, cdays, delta_time_to_left, delta_time_to_right, ignored_mid=-1):
@@ -123,6 +211,7 @@ class MeetingDAO:
         cursor.execute(adjust_meeting_query, (delta_time_to_left.time(), delta_time_to_left.time(), starttime, endtime))
 
         self.conn.commit()
+        bumpCatalogVersion("meeting")
 
     def deleteMeetingByMid(self, mid):
         cursor = self.conn.cursor()
@@ -130,17 +219,17 @@ class MeetingDAO:
         cursor.execute(query, (mid,))
         rowcount = cursor.rowcount
         self.conn.commit()
+        bumpCatalogVersion("meeting", "section")
         print(f"Deleted {rowcount} record(s) with mid={mid}")  # Add logging
         return rowcount > 0
 
     def getMostMeeting(self):
         cursor = self.conn.cursor()
         query = """
-            SELECT m.mid, m.ccode, m.starttime, m.endtime, m.cdays, COUNT(s.sid) AS section_count 
-            FROM meeting m 
-            JOIN section s ON m.mid = s.mid 
-            GROUP BY m.mid, m.ccode, m.starttime, m.endtime, m.cdays 
-            ORDER BY section_count DESC 
+            SELECT m.mid, m.ccode, m.starttime, m.endtime, m.cdays, c.section_count
+            FROM stats_meeting_sections AS c
+            JOIN meeting m ON m.mid = c.mid
+            ORDER BY c.section_count DESC
             LIMIT 5;
         """
         cursor.execute(query)
@@ -161,6 +250,7 @@ class MeetingDAO:
         cursor.execute(query)
         result = findMeets_ToDelete_Cursor.fetchone()
         self.conn.commit()
+        bumpCatalogVersion("meeting", "section")
         if result is not None:
             mid = result[0]
             return mid
@@ -0,0 +1,63 @@
+from bisect import bisect_left, bisect_right
+from datetime import time
+
+
+def toMinutes(value):
+    # datetime.time, "HH:MM[:SS]" or "YYYY-MM-DD HH:MM:SS" (str of a datetime)
+    if isinstance(value, time):
+        return value.hour * 60 + value.minute
+    hours, minutes = str(value).split()[-1].split(":")[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+class MeetingIndex:
+    # Meeting time ranges per cdays, sorted by start time. Next to the starts
+    # it keeps the running max of the end times, which is non-decreasing, so
+    # both ends of the candidate range are found by binary search.
+    def __init__(self, rows):
+        self.days = {}
+        self.duplicates = {}
+
+        for row in sorted(rows, key=lambda row: (row[4], toMinutes(row[2]), row[0])):
+            mid, ccode, starttime, endtime, cdays = row[:5]
+            start = toMinutes(starttime)
+            end = toMinutes(endtime)
+
+            entry = self.days.setdefault(
+                cdays, {"starts": [], "ends": [], "reach": [], "rows": []}
+            )
+            entry["starts"].append(start)
+            entry["ends"].append(end)
+            entry["reach"].append(max(end, entry["reach"][-1]) if entry["reach"] else end)
+            entry["rows"].append(row)
+
+            # Keep the lowest mid for each (ccode, start, end, cdays)
+            self.duplicates.setdefault((str(ccode), start, end, cdays), mid)
+
+    def findDuplicate(self, ccode, starttime, endtime, cdays):
+        return self.duplicates.get(
+            (str(ccode), toMinutes(starttime), toMinutes(endtime), cdays)
+        )
+
+    def findConflicts(self, starttime, endtime, cdays):
+        # Same predicate as MeetingDAO.checkMeetingConflict's SQL:
+        #   (starttime < start AND endtime >= start) OR (starttime <= end AND endtime > end)
+        # Both branches need starttime <= end and endtime >= start.
+        entry = self.days.get(cdays)
+        if entry is None:
+            return []
+
+        start = toMinutes(starttime)
+        end = toMinutes(endtime)
+        low = bisect_left(entry["reach"], start)
+        high = bisect_right(entry["starts"], end)
+
+        result = []
+        for i in range(low, high):
+            row_start = entry["starts"][i]
+            row_end = entry["ends"][i]
+            if (row_start < start and row_end >= start) or (
+                row_start <= end and row_end > end
+            ):
+                result.append(entry["rows"][i])
+        return result
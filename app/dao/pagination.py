@@ -0,0 +1,26 @@
+def buildPageQuery(select, keys, filters, allowed, after=None, limit=None):
+    # select is the "SELECT ... FROM table" part, keys the columns the pages are
+    # ordered by. Column names only come from the DAO, values are always bound.
+    conditions = []
+    params = []
+    for column, value in filters.items():
+        if column not in allowed:
+            raise ValueError("Cannot filter on %s" % column)
+        conditions.append("%s = %%s" % column)
+        params.append(value)
+
+    if after is not None:
+        # Row comparison lets Postgres seek straight to the next key in the index
+        conditions.append(
+            "(%s) > (%s)" % (", ".join(keys), ", ".join(["%s"] * len(keys)))
+        )
+        params.extend(after)
+
+    query = select
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY " + ", ".join(keys)
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+    return query + ";", params
@@ -0,0 +1,211 @@
+import threading
+import time
+from collections import deque
+
+from config.db_config import pg_config, pool_config
+import psycopg2 as pg
+import psycopg2.extensions
+import psycopg2.pool
+
+
+class ConnectionPool:
+    def __init__(self, minconn, maxconn, timeout, ping_after, url):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("Invalid pool size (min=%s, max=%s)" % (minconn, maxconn))
+
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self.url = url
+
+        # Idle connections as (connection, time it was returned)
+        self._idle = deque()
+        self._in_use = set()
+        # Slots reserved for connections being opened outside the lock
+        self._opening = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            "created": 0,
+            "borrowed": 0,
+            "returned": 0,
+            "discarded": 0,
+            "waits": 0,
+            "timeouts": 0,
+        }
+
+        for _ in range(minconn):
+            self._idle.append((pg.connect(url), time.monotonic()))
+            self._stats["created"] += 1
+
+    def _discard(self, conn):
+        self._stats["discarded"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _isAlive(self, conn, idle_since):
+        if conn.closed:
+            return False
+
+        # Only pay for a round trip when the connection sat idle for a while
+        if time.monotonic() - idle_since < self.ping_after:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1;")
+            cursor.close()
+            conn.rollback()
+            return True
+        except (pg.OperationalError, pg.InterfaceError):
+            return False
+
+    def getConnection(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn = None
+            with self._cond:
+                if self._idle:
+                    # Reserve the most recently returned connection
+                    conn, idle_since = self._idle.pop()
+                    self._in_use.add(conn)
+                elif len(self._in_use) + self._opening < self.maxconn:
+                    # Reserve a slot for a new connection
+                    self._opening += 1
+                else:
+                    # Wait until another request returns a connection
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise psycopg2.pool.PoolError(
+                            "No database connection available after %s seconds"
+                            % self.timeout
+                        )
+                    self._stats["waits"] += 1
+                    self._cond.wait(remaining)
+                    continue
+
+            # Network work (ping or handshake) happens outside the lock
+            if conn is not None:
+                alive = self._isAlive(conn, idle_since)
+                with self._cond:
+                    if alive:
+                        self._stats["borrowed"] += 1
+                        return conn
+                    # Broken while idle, drop it and try again
+                    self._in_use.discard(conn)
+                    self._discard(conn)
+                    self._cond.notify()
+                continue
+
+            try:
+                conn = pg.connect(self.url)
+            finally:
+                with self._cond:
+                    self._opening -= 1
+                    if conn is not None:
+                        self._in_use.add(conn)
+                        self._stats["created"] += 1
+                        self._stats["borrowed"] += 1
+                    else:
+                        self._cond.notify()
+            return conn
+
+    def putConnection(self, conn):
+        with self._cond:
+            if conn not in self._in_use:
+                return
+            self._in_use.discard(conn)
+            self._stats["returned"] += 1
+
+            if not conn.closed:
+                # Never hand out a connection with an open or failed transaction
+                status = conn.info.transaction_status
+                if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                    self._discard(conn)
+                elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    try:
+                        conn.rollback()
+                        self._idle.append((conn, time.monotonic()))
+                    except (pg.OperationalError, pg.InterfaceError):
+                        self._discard(conn)
+                else:
+                    self._idle.append((conn, time.monotonic()))
+            else:
+                self._discard(conn)
+
+            self._cond.notify()
+
+    def closeAll(self):
+        with self._cond:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                conn.close()
+            for conn in self._in_use:
+                conn.close()
+            self._in_use.clear()
+
+    def getStats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats["minconn"] = self.minconn
+            stats["maxconn"] = self.maxconn
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = len(self._in_use)
+            return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Connection borrowed by the current thread (one per request)
+_local = threading.local()
+
+
+def getPool():
+    global _pool
+    # Created lazily so every gunicorn worker builds its own pool after the fork
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                url = "dbname=%s password=%s user=%s host=%s port=%s" % (
+                    pg_config["dbname"],
+                    pg_config["password"],
+                    pg_config["user"],
+                    pg_config["host"],
+                    pg_config["port"],
+                )
+                _pool = ConnectionPool(
+                    pool_config["minconn"],
+                    pool_config["maxconn"],
+                    pool_config["timeout"],
+                    pool_config["ping_after"],
+                    url,
+                )
+    return _pool
+
+
+def getConnection():
+    # Every DAO built while serving the same request shares one connection
+    conn = getattr(_local, "conn", None)
+    if conn is None or conn.closed:
+        if conn is not None:
+            getPool().putConnection(conn)
+        conn = getPool().getConnection()
+        _local.conn = conn
+    return conn
+
+
+def releaseConnection():
+    # Give the request's connection back to the pool
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        _local.conn = None
+        getPool().putConnection(conn)
+
+
+def getPoolStats():
+    if _pool is None:
+        return {"minconn": pool_config["minconn"], "maxconn": pool_config["maxconn"], "created": 0}
+    return _pool.getStats()
@@ -1,18 +1,10 @@
-from config.db_config import pg_config
+from dao.pool import getConnection
 import psycopg2 as pg
 
 class RegistrationDAO():
   def __init__(self):
-        # Create the connection string
-        url = "dbname=%s password=%s user=%s host=%s port=%s" % (
-            pg_config["dbname"],
-            pg_config["password"],
-            pg_config["user"],
-            pg_config["host"],
-            pg_config["port"],
-        )
-
-        self.conn = pg.connect(url)
+      # Borrow the request's connection from the shared pool
+      self.conn = getConnection()
       
   def logInUser(self, username, password):
         cursor = self.conn.cursor()
@@ -1,21 +1,27 @@
-from config.db_config import pg_config
-import psycopg2 as pg
+from psycopg2 import Error
+from psycopg2.extras import execute_values
+
+from dao.catalog import getSnapshot
+from dao.pagination import buildPageQuery
+from dao.pool import getConnection
+from dao.requisite_graph import getRequisiteGraph, updateRequisiteGraph
+
+# Columns a client can filter the requisite collection on, with their types
+REQUISITE_FILTERS = {"classid": int, "reqid": int}
+
+# Key the requisite pages are ordered and resumed by
+REQUISITE_PAGE_KEY = ("classid", "reqid")
 
 
 class RequisiteDAO:
     def __init__(self):
-        # Create the connection string
-        url = "dbname=%s password=%s user=%s host=%s port=%s" % (
-            pg_config["dbname"],
-            pg_config["password"],
-            pg_config["user"],
-            pg_config["host"],
-            pg_config["port"],
-        )
-
-        self.conn = pg.connect(url)
+        # Borrow the request's connection from the shared pool
+        self.conn = getConnection()
 
     def getAllRequisite(self):
+        return getSnapshot("requisite", self.loadAllRequisite)
+
+    def loadAllRequisite(self):
         cursor = self.conn.cursor()
         query = "SELECT classid, reqid, prereq FROM requisite;"
         cursor.execute(query)
@@ -24,6 +30,26 @@ class RequisiteDAO:
             result.append(row)
         return result
 
+    def getRequisiteGraph(self):
+        return getRequisiteGraph(self.loadAllRequisite)
+
+    def getRequisitePage(self, filters, after=None, limit=None):
+        # Keyset page: rows after the given key that match every filter
+        cursor = self.conn.cursor()
+        query, params = buildPageQuery(
+            "SELECT classid, reqid, prereq FROM requisite",
+            REQUISITE_PAGE_KEY,
+            filters,
+            REQUISITE_FILTERS,
+            after,
+            limit,
+        )
+        cursor.execute(query, params)
+        result = []
+        for row in cursor:
+            result.append(row)
+        return result
+
     def getRequisiteByClassIdReqId(self, classid, reqid):
         cursor = self.conn.cursor()
         query = "SELECT classid, reqid, prereq FROM requisite WHERE classid = %s AND reqid = %s;"
@@ -31,20 +57,47 @@ class RequisiteDAO:
         result = cursor.fetchone()
         return result
 
+    def getExistingRequisites(self, pairs):
+        # Existing (classid, reqid) among the given pairs
+        cursor = self.conn.cursor()
+        query = """
+            SELECT requisite.classid, requisite.reqid FROM requisite
+            INNER JOIN unnest(%s::integer[], %s::integer[]) AS pairs(classid, reqid)
+            ON requisite.classid = pairs.classid AND requisite.reqid = pairs.reqid;
+        """
+        cursor.execute(query, ([pair[0] for pair in pairs], [pair[1] for pair in pairs]))
+        return {(row[0], row[1]) for row in cursor}
+
     def insertRequisite(self, classid, reqid, prereq):
         cursor = self.conn.cursor()
         query = "INSERT INTO requisite(classid, reqid, prereq) VALUES (%s, %s, %s) RETURNING classid, reqid;"
         cursor.execute(query, (classid, reqid, prereq))
         ids = cursor.fetchone()
         self.conn.commit()
+        updateRequisiteGraph(lambda graph: graph.addEdge(classid, reqid, prereq))
         return ids
 
+    def insertRequisites(self, requisites):
+        # requisites: (classid, reqid, prereq) tuples, one transaction
+        cursor = self.conn.cursor()
+        query = "INSERT INTO requisite(classid, reqid, prereq) VALUES %s RETURNING classid, reqid, prereq;"
+        try:
+            result = execute_values(cursor, query, requisites, fetch=True)
+        except Error:
+            # Nothing from the batch is kept
+            self.conn.rollback()
+            raise
+        self.conn.commit()
+        updateRequisiteGraph(lambda graph: [graph.addEdge(*row) for row in result])
+        return result
+
     def deleteRequisiteByClassIdReqId(self, classid, reqid):
         cursor = self.conn.cursor()
         query = "DELETE FROM requisite WHERE classid = %s AND reqid = %s;"
         cursor.execute(query, (classid, reqid))
         rowcount = cursor.rowcount
         self.conn.commit()
+        updateRequisiteGraph(lambda graph: graph.removeEdge(classid, reqid))
         return rowcount > 0
 
     def updateRequisiteByClassIdReqId(self, classid, reqid, requisite):
@@ -53,4 +106,6 @@ class RequisiteDAO:
         cursor.execute(query, (requisite, classid, reqid))
         result = cursor.fetchone()
         self.conn.commit()
+        # addEdge on an existing edge only updates its prereq flag
+        updateRequisiteGraph(lambda graph: result and graph.addEdge(*result))
         return result
@@ -0,0 +1,232 @@
+import threading
+import time
+
+from config.app_config import catalog_config
+from dao.catalog import bumpCatalogVersion, getCatalogVersion
+
+
+class RequisiteGraph:
+    # The requisite table as a DAG of classid -> reqid edges ("classid requires
+    # reqid"), with its transitive closure in both directions and the level of
+    # every class (length of the longest requisite chain below it). Lookups are
+    # set and dict reads; writes update only the classes that depend on the edge.
+    def __init__(self, rows):
+        self.direct = {}
+        self.direct_dependents = {}
+        self.requires = {}
+        self.required_by = {}
+        self.level = {}
+        self.longest_next = {}
+        # Classes on a cycle in the stored data, they get no level
+        self.cyclic = set()
+
+        for classid, reqid, prereq in rows:
+            self._addDirect(classid, reqid, prereq)
+
+        # Kahn's algorithm from the classes without requisites upwards
+        pending = {node: len(self.direct[node]) for node in self.direct}
+        ready = sorted(node for node, count in pending.items() if count == 0)
+        order = []
+        while ready:
+            node = ready.pop()
+            order.append(node)
+            for dependent in self.direct_dependents[node]:
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    ready.append(dependent)
+
+        for node in order:
+            self._computeNode(node)
+
+        if len(order) < len(self.direct):
+            self.cyclic = set(self.direct) - set(order)
+            for node in self.cyclic:
+                self.requires[node] = self._reachable(node)
+                self.level[node] = None
+                self.longest_next[node] = None
+
+        for node, requisites in self.requires.items():
+            for reqid in requisites:
+                self.required_by[reqid].add(node)
+
+    def _addDirect(self, classid, reqid, prereq):
+        for node in (classid, reqid):
+            if node not in self.direct:
+                self.direct[node] = {}
+                self.direct_dependents[node] = set()
+                self.requires[node] = set()
+                self.required_by[node] = set()
+                self.level[node] = 0
+                self.longest_next[node] = None
+        self.direct[classid][reqid] = prereq
+        self.direct_dependents[reqid].add(classid)
+
+    def _reachable(self, node):
+        seen = set()
+        stack = list(self.direct[node])
+        while stack:
+            current = stack.pop()
+            if current not in seen:
+                seen.add(current)
+                stack.extend(self.direct[current])
+        return seen
+
+    def _computeNode(self, node):
+        # Assumes every direct requisite of node is already computed
+        requires = set()
+        level = 0
+        longest_next = None
+        for reqid in sorted(self.direct[node]):
+            requires.add(reqid)
+            requires |= self.requires[reqid]
+            if self.level[reqid] is not None and self.level[reqid] + 1 > level:
+                level = self.level[reqid] + 1
+                longest_next = reqid
+        if self.direct[node] and longest_next is None:
+            # Only requisites of unknown level (on a cycle)
+            level = None
+        self.requires[node] = requires
+        self.level[node] = level
+        self.longest_next[node] = longest_next
+
+    def _inTopologicalOrder(self, nodes):
+        # If x requires y, requires[x] strictly contains requires[y]
+        return sorted(nodes, key=lambda node: (len(self.requires[node]), node))
+
+    def wouldCreateCycle(self, classid, reqid, extra_edges=()):
+        # True when reqid already requires classid, directly or not; extra_edges
+        # are (classid, reqid) pairs not in the graph yet (the rest of a batch)
+        if classid == reqid:
+            return True
+        reached = {reqid} | self.requires.get(reqid, set())
+        changed = True
+        while changed and classid not in reached:
+            changed = False
+            for edge_classid, edge_reqid in extra_edges:
+                if edge_classid in reached and edge_reqid not in reached:
+                    reached.add(edge_reqid)
+                    reached |= self.requires.get(edge_reqid, set())
+                    changed = True
+        return classid in reached
+
+    def addEdge(self, classid, reqid, prereq):
+        if classid in self.direct and reqid in self.direct[classid]:
+            self.direct[classid][reqid] = prereq
+            return
+        if self.wouldCreateCycle(classid, reqid):
+            raise ValueError("Requisite %s -> %s creates a cycle" % (classid, reqid))
+
+        self._addDirect(classid, reqid, prereq)
+        added = {reqid} | self.requires[reqid]
+        affected = {classid} | self.required_by[classid]
+        for node in affected:
+            self.requires[node] |= added
+        for node in added:
+            self.required_by[node] |= affected
+        for node in self._inTopologicalOrder(affected):
+            self._computeNode(node)
+
+    def removeEdge(self, classid, reqid):
+        if classid not in self.direct or reqid not in self.direct[classid]:
+            return
+        if self.cyclic:
+            raise ValueError("The requisite graph has cycles, rebuild it")
+
+        # Old closures give the order: an edge removal cannot add dependencies
+        affected = self._inTopologicalOrder({classid} | self.required_by[classid])
+        del self.direct[classid][reqid]
+        self.direct_dependents[reqid].discard(classid)
+        for node in affected:
+            old = self.requires[node]
+            self._computeNode(node)
+            for lost in old - self.requires[node]:
+                self.required_by[lost].discard(node)
+
+    def removeClass(self, cid):
+        # A deleted class takes its requisites with it (ON DELETE CASCADE)
+        if cid not in self.direct:
+            return
+        for reqid in list(self.direct[cid]):
+            self.removeEdge(cid, reqid)
+        for classid in list(self.direct_dependents[cid]):
+            self.removeEdge(classid, cid)
+        for table in (
+            self.direct,
+            self.direct_dependents,
+            self.requires,
+            self.required_by,
+            self.level,
+            self.longest_next,
+        ):
+            table.pop(cid, None)
+
+    def prerequisitesOf(self, cid):
+        # Every class cid requires, the ones with the lowest level first
+        return sorted(
+            self.requires.get(cid, ()),
+            key=lambda node: (self.level[node] is None, self.level[node] or 0, node),
+        )
+
+    def dependentsOf(self, cid):
+        return sorted(
+            self.required_by.get(cid, ()),
+            key=lambda node: (self.level[node] is None, self.level[node] or 0, node),
+        )
+
+    def longestPath(self, cid=None):
+        # Longest requisite chain starting at cid, or the longest in the catalog
+        if cid is None:
+            ranked = [node for node in self.level if self.level[node] is not None]
+            if not ranked:
+                return []
+            cid = min(ranked, key=lambda node: (-self.level[node], node))
+        if cid not in self.level or self.level[cid] is None:
+            return [cid]
+
+        path = [cid]
+        while self.longest_next[path[-1]] is not None:
+            path.append(self.longest_next[path[-1]])
+        return path
+
+
+# (requisite version it reflects, build time, graph)
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def getRequisiteGraph(loader):
+    # Built once per worker and kept current by updateRequisiteGraph. Like the
+    # catalog snapshots, it is rebuilt after max_age to see other workers' writes.
+    global _graph
+    if not catalog_config["enabled"]:
+        return RequisiteGraph(loader())
+
+    with _graph_lock:
+        if (
+            _graph is not None
+            and _graph[0] == getCatalogVersion("requisite")
+            and time.monotonic() - _graph[1] < catalog_config["max_age"]
+        ):
+            return _graph[2]
+        version = getCatalogVersion("requisite")
+        graph = RequisiteGraph(loader())
+        _graph = (version, time.monotonic(), graph)
+        return graph
+
+
+def updateRequisiteGraph(change, *tables):
+    # Replaces bumpCatalogVersion("requisite", *tables) after a committed write:
+    # applies change(graph) to the graph in place instead of rebuilding it
+    global _graph
+    with _graph_lock:
+        current = _graph is not None and _graph[0] == getCatalogVersion("requisite")
+        version = bumpCatalogVersion("requisite", *tables)
+        if not current:
+            return version
+        try:
+            change(_graph[2])
+            _graph = (version, _graph[1], _graph[2])
+        except ValueError:
+            # The stored data disagrees with the graph; rebuild on the next read
+            _graph = None
+    return version
@@ -1,21 +1,26 @@
-from config.db_config import pg_config
-import psycopg2 as pg
+from psycopg2 import Error
+from psycopg2.extras import execute_values
+
+from dao.catalog import bumpCatalogVersion, getSnapshot
+from dao.pagination import buildPageQuery
+from dao.pool import getConnection
+
+# Columns a client can filter the room collection on, with their types
+ROOM_FILTERS = {"building": str}
+
+# Key the room pages are ordered and resumed by
+ROOM_PAGE_KEY = ("rid",)
 
 
 class RoomDAO:
     def __init__(self):
-        # Create the connection string
-        url = "dbname=%s password=%s user=%s host=%s port=%s" % (
-            pg_config["dbname"],
-            pg_config["password"],
-            pg_config["user"],
-            pg_config["host"],
-            pg_config["port"],
-        )
-
-        self.conn = pg.connect(url)
+        # Borrow the request's connection from the shared pool
+        self.conn = getConnection()
 
     def getAllRoom(self):
+        return getSnapshot("room", self.loadAllRoom)
+
+    def loadAllRoom(self):
         result = []
         cursor = self.conn.cursor()
         query = "SELECT * FROM room;"
@@ -24,12 +29,70 @@ class RoomDAO:
             result.append(row)
         return result
 
+    def streamAllRoom(self, fetch_size, filters=None, after=None):
+        # Server-side cursor: Postgres sends fetch_size rows per round trip
+        cursor = self.conn.cursor(name="stream_room")
+        cursor.itersize = fetch_size
+        query, params = buildPageQuery(
+            "SELECT * FROM room",
+            ROOM_PAGE_KEY,
+            filters or {},
+            ROOM_FILTERS,
+            after,
+        )
+        cursor.execute(query, params)
+        try:
+            for row in cursor:
+                yield row
+        finally:
+            cursor.close()
+
+    def getRoomPage(self, filters, after=None, limit=None):
+        # Keyset page: rows after the given key that match every filter
+        cursor = self.conn.cursor()
+        query, params = buildPageQuery(
+            "SELECT * FROM room",
+            ROOM_PAGE_KEY,
+            filters,
+            ROOM_FILTERS,
+            after,
+            limit,
+        )
+        cursor.execute(query, params)
+        result = []
+        for row in cursor:
+            result.append(row)
+        return result
+
     def getRoomByRid(self, rid):
         cursor = self.conn.cursor()
         query = "SELECT * FROM room WHERE rid=%s"
         cursor.execute(query, (rid,))
         return cursor.fetchone()
 
+    def getRoomsByRids(self, rids):
+        cursor = self.conn.cursor()
+        query = "SELECT * FROM room WHERE rid = ANY(%s);"
+        cursor.execute(query, (list(rids),))
+        result = []
+        for row in cursor:
+            result.append(row)
+        return result
+
+    def getRoomsByBuildingNumber(self, pairs):
+        # Existing rooms among the (building, room_number) pairs
+        cursor = self.conn.cursor()
+        query = """
+            SELECT room.* FROM room
+            INNER JOIN unnest(%s::varchar[], %s::varchar[]) AS pairs(building, room_number)
+            ON room.building = pairs.building AND room.room_number = pairs.room_number;
+        """
+        cursor.execute(query, ([pair[0] for pair in pairs], [pair[1] for pair in pairs]))
+        result = []
+        for row in cursor:
+            result.append(row)
+        return result
+
     def insertRoom(self, building, room_number, capacity):
         cursor = self.conn.cursor()
 
@@ -44,17 +107,33 @@ class RoomDAO:
         cursor.execute(query, (building, room_number, capacity))
         result = cursor.fetchone()
         self.conn.commit()
+        bumpCatalogVersion("room")
         if result:
             return result[0]
         else:
             return None
 
+    def insertRooms(self, rooms):
+        # rooms: (building, room_number, capacity) tuples, one transaction
+        cursor = self.conn.cursor()
+        query = "INSERT INTO room (building, room_number, capacity) VALUES %s RETURNING rid, building, room_number, capacity;"
+        try:
+            result = execute_values(cursor, query, rooms, fetch=True)
+        except Error:
+            # Nothing from the batch is kept
+            self.conn.rollback()
+            raise
+        self.conn.commit()
+        bumpCatalogVersion("room")
+        return result
+
     def deleteRoomByRid(self, rid):
         cursor = self.conn.cursor()
         query = "DELETE FROM room WHERE rid=%s"
         cursor.execute(query, (rid,))
         rowcount = cursor.rowcount
         self.conn.commit()
+        bumpCatalogVersion("room", "section")
         return rowcount == 1
 
     def updateRoomByRid(self, rid, building, room_number, capacity):
@@ -71,6 +150,7 @@ class RoomDAO:
         cursor.execute(query, (building, room_number, capacity, rid))
         rowcount = cursor.rowcount
         self.conn.commit()
+        bumpCatalogVersion("room")
         return rowcount == 1
 
     def getMaxCapacity(self, building):
@@ -100,11 +180,11 @@ class RoomDAO:
         result = []
         cursor = self.conn.cursor()
         query = """
-            SELECT room.*, (CAST(section.capacity AS FLOAT) / CAST(room.capacity AS FLOAT)) AS Ratio
-            FROM section
-            JOIN room ON section.roomid = room.rid
-            WHERE room.building = %s
-            ORDER BY (CAST(section.capacity AS FLOAT) / CAST(room.capacity AS FLOAT)) DESC
+            SELECT room.*, stats.ratio
+            FROM stats_section_ratio AS stats
+            JOIN room ON stats.rid = room.rid
+            WHERE stats.building = %s
+            ORDER BY stats.ratio DESC
             LIMIT 3;
         """
         cursor.execute(query, (building.capitalize(),))
@@ -1,19 +1,23 @@
-from config.db_config import pg_config
-import psycopg2 as pg
+from psycopg2 import Error
+from psycopg2.errors import ExclusionViolation
+from psycopg2.extras import execute_values
+
+from dao.catalog import bumpCatalogVersion, getDerived
+from dao.pagination import buildPageQuery
+from dao.pool import getConnection
+from dao.section_cube import SectionCube
+
+# Columns a client can filter the section collection on, with their types
+SECTION_FILTERS = {"years": str, "semester": str, "roomid": int, "cid": int}
+
+# Key the section pages are ordered and resumed by
+SECTION_PAGE_KEY = ("sid",)
 
 
 class SectionDAO:
     def __init__(self):
-        # Create the connection string
-        url = "dbname=%s password=%s user=%s host=%s port=%s" % (
-            pg_config["dbname"],
-            pg_config["password"],
-            pg_config["user"],
-            pg_config["host"],
-            pg_config["port"],
-        )
-
-        self.conn = pg.connect(url)
+        # Borrow the request's connection from the shared pool
+        self.conn = getConnection()
 
     def getAllSection(self):
         cursor = self.conn.cursor()
@@ -24,6 +28,41 @@ class SectionDAO:
             result.append(row)
         return result
 
+    def streamAllSection(self, fetch_size, filters=None, after=None):
+        # Server-side cursor: Postgres sends fetch_size rows per round trip
+        cursor = self.conn.cursor(name="stream_section")
+        cursor.itersize = fetch_size
+        query, params = buildPageQuery(
+            "SELECT sid, roomid, cid, mid, semester, years, capacity FROM section",
+            SECTION_PAGE_KEY,
+            filters or {},
+            SECTION_FILTERS,
+            after,
+        )
+        cursor.execute(query, params)
+        try:
+            for row in cursor:
+                yield row
+        finally:
+            cursor.close()
+
+    def getSectionPage(self, filters, after=None, limit=None):
+        # Keyset page: rows after the given key that match every filter
+        cursor = self.conn.cursor()
+        query, params = buildPageQuery(
+            "SELECT sid, roomid, cid, mid, semester, years, capacity FROM section",
+            SECTION_PAGE_KEY,
+            filters,
+            SECTION_FILTERS,
+            after,
+            limit,
+        )
+        cursor.execute(query, params)
+        result = []
+        for row in cursor:
+            result.append(row)
+        return result
+
     def getSectionBySid(self, sid):
         cursor = self.conn.cursor()
         query = "SELECT sid, roomid, cid, mid, semester, years, capacity FROM section WHERE sid = %s;"
@@ -31,33 +70,101 @@ class SectionDAO:
         result = cursor.fetchone()
         return result
 
+    def sectionDuplicate(self, roomid, cid, mid, semester, years, sid=-1):
+        cursor = self.conn.cursor()
+        query = "SELECT sid FROM section WHERE roomid = %s AND cid = %s AND mid = %s AND semester = %s AND years = %s AND sid <> %s LIMIT 1;"
+        cursor.execute(query, (roomid, cid, mid, semester, years, sid))
+        result = cursor.fetchone()
+        if result is not None:
+            return result[0]
+        return None
+
+    def getRoomSchedules(self, roomids):
+        # Sections of the given rooms with their meeting times, for batch validation
+        cursor = self.conn.cursor()
+        query = """
+            SELECT s.sid, s.roomid, s.cid, s.mid, s.semester, s.years, m.cdays, m.starttime, m.endtime
+            FROM section AS s
+            INNER JOIN meeting AS m ON s.mid = m.mid
+            WHERE s.roomid = ANY(%s);
+        """
+        cursor.execute(query, (list(roomids),))
+        result = []
+        for row in cursor:
+            result.append(row)
+        return result
+
     def insertSection(self, roomid, cid, mid, semester, years, capacity):
         cursor = self.conn.cursor()
         query = "INSERT INTO section(roomid, cid, mid, semester, years, capacity) VALUES (%s, %s, %s, %s, %s, %s) RETURNING sid;"
-        cursor.execute(query, (roomid, cid, mid, semester, years, capacity))
-        sid = cursor.fetchone()
-        self.conn.commit()
+        try:
+            cursor.execute(query, (roomid, cid, mid, semester, years, capacity))
+            sid = cursor.fetchone()
+            # section_room_time_excl is checked here, at commit
+            self.conn.commit()
+        except ExclusionViolation:
+            self.conn.rollback()
+            raise
+        bumpCatalogVersion("section")
         return sid
 
+    def insertSections(self, sections):
+        # sections: (roomid, cid, mid, semester, years, capacity) tuples, one transaction
+        cursor = self.conn.cursor()
+        query = "INSERT INTO section(roomid, cid, mid, semester, years, capacity) VALUES %s RETURNING sid, roomid, cid, mid, semester, years, capacity;"
+        try:
+            result = execute_values(cursor, query, sections, fetch=True)
+            # section_room_time_excl is checked here, at commit
+            self.conn.commit()
+        except Error:
+            # Nothing from the batch is kept
+            self.conn.rollback()
+            raise
+        bumpCatalogVersion("section")
+        return result
+
     def deleteSectionBySid(self, sid):
         cursor = self.conn.cursor()
         query = "DELETE FROM section WHERE sid = %s;"
         cursor.execute(query, (sid,))
         rowcount = cursor.rowcount
         self.conn.commit()
+        bumpCatalogVersion("section")
         return rowcount > 0
 
     def updateSectionBySid(self, sid, roomid, cid, mid, semester, years, capacity):
         cursor = self.conn.cursor()
         query = "UPDATE section SET roomid = %s, cid = %s, mid = %s, semester = %s, years = %s, capacity = %s WHERE sid = %s RETURNING sid;"
-        cursor.execute(query, (roomid, cid, mid, semester, years, capacity, sid))
-        sid = cursor.fetchone()
-        self.conn.commit()
+        try:
+            cursor.execute(query, (roomid, cid, mid, semester, years, capacity, sid))
+            sid = cursor.fetchone()
+            self.conn.commit()
+        except ExclusionViolation:
+            self.conn.rollback()
+            raise
+        bumpCatalogVersion("section")
         return sid
 
+    def getSectionCube(self):
+        # Rebuilt after a write to section or room
+        return getDerived(("section", "room"), "cube", self.loadSectionFacts, SectionCube)
+
+    def loadSectionFacts(self):
+        cursor = self.conn.cursor()
+        query = """
+            SELECT s.sid, s.roomid, r.building, r.capacity, s.cid, s.mid, s.semester, s.years, s.capacity
+            FROM section AS s
+            INNER JOIN room AS r ON s.roomid = r.rid;
+        """
+        cursor.execute(query)
+        result = []
+        for row in cursor:
+            result.append(row)
+        return result
+
     def getSectionPerYear(self):
         cursor = self.conn.cursor()
-        query = "SELECT years, count(sid) FROM section GROUP BY years ORDER BY years;"
+        query = "SELECT years, sections FROM stats_sections_per_year ORDER BY years;"
         cursor.execute(query)
         result = cursor.fetchall()
         return result
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+
+# Dimensions a section can be grouped by: name -> (position in the fact row, type)
+CUBE_DIMENSIONS = {
+    "room": (1, int),
+    "building": (2, str),
+    "class": (4, int),
+    "meeting": (5, int),
+    "semester": (6, str),
+    "year": (7, str),
+}
+
+CUBE_METRICS = ("count", "capacity", "ratio")
+
+
+class SectionCube:
+    # Section facts as NumPy columns: every dimension is stored as integer
+    # codes into its sorted distinct values, so a group-by is a bincount over
+    # the combined codes instead of a query.
+    def __init__(self, rows):
+        # rows: (sid, roomid, building, room capacity, cid, mid, semester, years, capacity)
+        self.size = len(rows)
+        columns = list(zip(*rows)) if rows else [()] * 9
+
+        self.codes = {}
+        self.labels = {}
+        for name, (position, _) in CUBE_DIMENSIONS.items():
+            # Missing values get code -1 and are left out of the groups
+            codes, labels = pd.factorize(pd.Series(columns[position], dtype=object), sort=True)
+            self.codes[name] = codes.astype(np.int64)
+            self.labels[name] = list(labels)
+
+        capacity = np.array(columns[8], dtype=np.float64)
+        room_capacity = np.array(columns[3], dtype=np.float64)
+        self.capacity = np.nan_to_num(capacity)
+        # Student-to-capacity ratio of each section, as stats_section_ratio
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.ratio = np.where(room_capacity > 0, capacity / room_capacity, np.nan)
+
+    def _mask(self, filters):
+        mask = np.ones(self.size, dtype=bool)
+        for name, value in filters.items():
+            try:
+                code = self.labels[name].index(value)
+            except ValueError:
+                return np.zeros(self.size, dtype=bool)
+            mask &= self.codes[name] == code
+        return mask
+
+    def topK(self, group, metric, k, ascending=False, filters=None):
+        # The k groups with the highest (or lowest) metric, ties by group values
+        mask = self._mask(filters or {})
+        for name in group:
+            mask &= self.codes[name] >= 0
+        keys = [self.codes[name][mask] for name in group]
+
+        if group:
+            sizes = [len(self.labels[name]) for name in group]
+            flat = np.ravel_multi_index(keys, sizes)
+            groups, inverse = np.unique(flat, return_inverse=True)
+        else:
+            groups = np.zeros(1 if mask.any() else 0, dtype=np.int64)
+            inverse = np.zeros(int(mask.sum()), dtype=np.int64)
+
+        count = np.bincount(inverse, minlength=len(groups))
+        capacity = np.bincount(inverse, weights=self.capacity[mask], minlength=len(groups))
+        ratio = self.ratio[mask]
+        known = ~np.isnan(ratio)
+        ratio_sum = np.bincount(inverse[known], weights=ratio[known], minlength=len(groups))
+        ratio_count = np.bincount(inverse[known], minlength=len(groups))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio_mean = np.where(ratio_count > 0, ratio_sum / ratio_count, np.nan)
+
+        values = {"count": count, "capacity": capacity, "ratio": ratio_mean}[metric]
+        # Groups come sorted by their values; a stable sort keeps that order on ties.
+        # Groups without a ratio go last either way.
+        ordering = np.nan_to_num(values if ascending else -values, nan=np.inf)
+        top = np.argsort(ordering, kind="stable")[:k]
+
+        if group:
+            group_codes = np.unravel_index(groups[top], sizes)
+        result = []
+        for position, index in enumerate(top):
+            row = {}
+            for dimension, name in enumerate(group):
+                row[name] = self.labels[name][group_codes[dimension][position]]
+            row["count"] = int(count[index])
+            row["capacity"] = int(capacity[index])
+            row["ratio"] = None if np.isnan(ratio_mean[index]) else float(ratio_mean[index])
+            result.append(row)
+        return result
@@ -0,0 +1,112 @@
+import threading
+
+from config.app_config import statistics_config
+from dao.catalog import addCatalogListener
+from dao.pool import getConnection, releaseConnection
+
+
+# Materialized views behind the statistics routes (migrations/0003_statistics_views.sql),
+# stale while "statistics_changes" has entries (migrations/0008_statistics_change_log.sql)
+STATISTICS_VIEWS = (
+    "stats_class_per_room",
+    "stats_class_per_term",
+    "stats_class_sections",
+    "stats_prerequisite_count",
+    "stats_meeting_sections",
+    "stats_section_ratio",
+    "stats_sections_per_year",
+)
+
+# Writes to these tables can change the views
+STATISTICS_TABLES = ("section", "room", "requisite")
+
+# Advisory lock held while refreshing, so only one worker refreshes at a time
+STATISTICS_LOCK_KEY = 5080
+
+
+class StatisticsDAO:
+    def __init__(self):
+        # Borrow the request's connection from the shared pool
+        self.conn = getConnection()
+
+    def getState(self):
+        cursor = self.conn.cursor()
+        query = """
+        SELECT EXISTS (SELECT 1 FROM "statistics_changes"), "refreshed_at"
+        FROM "statistics_state" WHERE "id" = 1;
+        """
+        cursor.execute(query)
+        return cursor.fetchone()
+
+    def refreshStatistics(self):
+        # Returns False when another worker is already refreshing
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("SELECT pg_try_advisory_xact_lock(%s);", (STATISTICS_LOCK_KEY,))
+            if not cursor.fetchone()[0]:
+                self.conn.rollback()
+                return False
+
+            # Take the logged writes first: writes committed during the refresh,
+            # or still uncommitted, leave their entries and the views stale
+            cursor.execute('DELETE FROM "statistics_changes";')
+            if cursor.rowcount == 0:
+                self.conn.rollback()
+                return True
+
+            # CONCURRENTLY keeps the views readable while they are rebuilt
+            for view in STATISTICS_VIEWS:
+                cursor.execute('REFRESH MATERIALIZED VIEW CONCURRENTLY "%s";' % view)
+
+            cursor.execute('UPDATE "statistics_state" SET "refreshed_at" = now() WHERE "id" = 1;')
+            self.conn.commit()
+            return True
+        except Exception:
+            self.conn.rollback()
+            raise
+
+
+_timer = None
+_timer_lock = threading.Lock()
+
+
+def getStatisticsState():
+    # (stale, refreshed_at) of the precomputed statistics
+    return StatisticsDAO().getState()
+
+
+def refreshStatistics():
+    return StatisticsDAO().refreshStatistics()
+
+
+def _refreshInBackground():
+    global _timer
+    with _timer_lock:
+        # Writes made from now on schedule another refresh
+        _timer = None
+    try:
+        refreshStatistics()
+    except Exception as e:
+        print(f"Error refreshing the statistics: {e}")
+    finally:
+        releaseConnection()
+
+
+def scheduleStatisticsRefresh():
+    # Debounced: writes within the window share a single refresh
+    global _timer
+    with _timer_lock:
+        if _timer is None:
+            _timer = threading.Timer(statistics_config["debounce"], _refreshInBackground)
+            _timer.daemon = True
+            _timer.start()
+
+
+def _onCatalogWrite(tables):
+    if statistics_config["refresh"] == "write" and any(
+        table in STATISTICS_TABLES for table in tables
+    ):
+        scheduleStatisticsRefresh()
+
+
+addCatalogListener(_onCatalogWrite)
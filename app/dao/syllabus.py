@@ -1,19 +1,13 @@
-from config.db_config import pg_config
-import psycopg2 as pg
+from psycopg2 import Error
+from psycopg2.extras import execute_values
+
+from dao.pool import getConnection
 
 
 class SyllabusDAO:
     def __init__(self):
-        # Create the connection string
-        url = "dbname=%s password=%s user=%s host=%s port=%s" % (
-            pg_config["dbname"],
-            pg_config["password"],
-            pg_config["user"],
-            pg_config["host"],
-            pg_config["port"],
-        )
-
-        self.conn = pg.connect(url)
+        # Borrow the request's connection from the shared pool
+        self.conn = getConnection()
 
     def insertSyllabus(self, courseid, embedding_text, chunk):
         cursor = self.conn.cursor()
@@ -23,6 +17,102 @@ class SyllabusDAO:
         self.conn.commit()
         return courseid
 
+    def getEmbeddingDimension(self):
+        # Dimensions of the embedding_text column (the typmod of a vector)
+        cursor = self.conn.cursor()
+        query = """
+        SELECT "atttypmod" FROM "pg_attribute"
+        WHERE "attrelid" = 'syllabus'::regclass AND "attname" = 'embedding_text';
+        """
+        cursor.execute(query)
+        row = cursor.fetchone()
+        return row[0] if row and row[0] > 0 else None
+
+    def setEmbeddingDimension(self, dimension):
+        # Retype embedding_text for another model. The stored vectors cannot
+        # be converted, so every chunk and the manifest are cleared with it
+        # and the next ingestion embeds everything again.
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute('DELETE FROM "syllabus";')
+            cursor.execute('DELETE FROM "syllabus_source";')
+            query = 'ALTER TABLE "syllabus" ALTER COLUMN "embedding_text" TYPE vector(%s) USING NULL;'
+            cursor.execute(query, (int(dimension),))
+        except Error:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
+
+    def getSource(self, source):
+        # Manifest row of a syllabus file: (source, courseid, pdf_hash, text_hash)
+        cursor = self.conn.cursor()
+        query = 'SELECT "source", "courseid", "pdf_hash", "text_hash" FROM "syllabus_source" WHERE "source" = %s;'
+        cursor.execute(query, [source])
+        return cursor.fetchone()
+
+    def getSources(self):
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT "source" FROM "syllabus_source";')
+        return [row[0] for row in cursor.fetchall()]
+
+    def getChunkHashes(self, source, courseid):
+        # (chunkid, chunk_hash) of the chunks stored for a file, plus the
+        # course's chunks loaded before the manifest (no source, no hash)
+        cursor = self.conn.cursor()
+        query = """
+        SELECT "chunkid", "chunk_hash" FROM "syllabus"
+        WHERE "source" = %s OR ("courseid" = %s AND "source" IS NULL);
+        """
+        cursor.execute(query, (source, courseid))
+        return cursor.fetchall()
+
+    def replaceSourceChunks(self, source, courseid, pdf_hash, text_hash, removed, added):
+        # One transaction: record the file's hashes, delete the chunkids in
+        # removed and insert added, (embedding_text, chunk, chunk_hash) tuples
+        # with the embeddings as dao.vector.Vector
+        cursor = self.conn.cursor()
+        try:
+            query = """
+            INSERT INTO "syllabus_source" ("source", "courseid", "pdf_hash", "text_hash")
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT ("source") DO UPDATE SET
+                "courseid" = EXCLUDED."courseid",
+                -- A --skip-extract run has no PDF hash; keep the stored one
+                "pdf_hash" = COALESCE(EXCLUDED."pdf_hash", "syllabus_source"."pdf_hash"),
+                "text_hash" = EXCLUDED."text_hash",
+                "ingested_at" = now();
+            """
+            cursor.execute(query, (source, courseid, pdf_hash, text_hash))
+            if removed:
+                cursor.execute('DELETE FROM "syllabus" WHERE "chunkid" = ANY(%s);', (list(removed),))
+            if added:
+                query = 'INSERT INTO "syllabus" ("courseid", "embedding_text", "chunk", "chunk_hash", "source") VALUES %s;'
+                execute_values(
+                    cursor,
+                    query,
+                    [(courseid, embedding, chunk, chunk_hash, source) for embedding, chunk, chunk_hash in added],
+                    page_size=len(added),
+                )
+        except Error:
+            # The file keeps its previous chunks and hashes
+            self.conn.rollback()
+            raise
+        self.conn.commit()
+        return len(added)
+
+    def updateSourceHashes(self, source, pdf_hash, text_hash):
+        # The PDF changed but its extracted text did not
+        cursor = self.conn.cursor()
+        query = 'UPDATE "syllabus_source" SET "pdf_hash" = %s, "text_hash" = %s, "ingested_at" = now() WHERE "source" = %s;'
+        cursor.execute(query, (pdf_hash, text_hash, source))
+        self.conn.commit()
+
+    def deleteSource(self, source):
+        # The file's chunks go with it (ON DELETE CASCADE)
+        cursor = self.conn.cursor()
+        cursor.execute('DELETE FROM "syllabus_source" WHERE "source" = %s;', [source])
+        self.conn.commit()
+
     def getAllSyllabus(self):
         cursor = self.conn.cursor()
         query = "SELECT chunkid, courseid, embedding_text as distance, chunk FROM syllabus order by distance limit 30;"
@@ -48,6 +138,13 @@ class SyllabusDAO:
         result = cursor.fetchone()
         return result
 
+    def getEmbeddings(self):
+        # Every chunk with its embedding as a list of floats, for dao/syllabus_index.py
+        cursor = self.conn.cursor()
+        query = 'SELECT "chunkid", "courseid", "chunk", "embedding_text"::real[] FROM "syllabus" ORDER BY "chunkid";'
+        cursor.execute(query)
+        return cursor.fetchall()
+
     def getAllFragments(self, embedding_text, courseid):
         with self.conn.cursor() as cursor:
             query = """
@@ -0,0 +1,218 @@
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from config.app_config import retrieval_config
+
+logger = logging.getLogger("syllabus_index")
+
+# HNSW graph parameters: links per node, and candidates kept while building
+# and while searching (must stay above the largest k asked for)
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+MANIFEST = "manifest.json"
+# Held while a build writes its files and cleans up the previous ones
+LOCK = "build.lock"
+
+
+class SyllabusIndex:
+    # The syllabus embeddings as a matrix of unit float32 rows, so the cosine
+    # distance of pgvector's <=> is 1 - (matrix @ question). The matrix is a
+    # memory-mapped .npy file: every process maps the same pages. The optional
+    # HNSW graph answers unfiltered questions without touching every row.
+    def __init__(self, folder, manifest):
+        self.folder = folder
+        self.manifest = manifest
+        self.matrix = np.load(os.path.join(folder, manifest["embeddings"]), mmap_mode="r")
+        self.chunkids = np.load(os.path.join(folder, manifest["chunkids"]))
+        self.courseids = np.load(os.path.join(folder, manifest["courseids"]))
+        with open(os.path.join(folder, manifest["chunks"])) as file:
+            self.chunks = json.load(file)
+
+        self.hnsw = None
+        if manifest.get("hnsw"):
+            try:
+                import hnswlib
+            except ImportError:
+                logger.warning("hnswlib is not installed, searching the syllabus index exactly")
+            else:
+                self.hnsw = hnswlib.Index(space="ip", dim=manifest["dimension"])
+                self.hnsw.load_index(
+                    os.path.join(folder, manifest["hnsw"]), max_elements=len(self.chunkids)
+                )
+                self.hnsw.set_ef(HNSW_EF_SEARCH)
+
+    def __len__(self):
+        return len(self.chunkids)
+
+    def search(self, vector, k, courseids=None):
+        # The k closest chunks as (chunkid, courseid, chunk, distance) rows,
+        # like SyllabusDAO.getAllFragments*, optionally within some courses
+        if len(self) == 0 or k <= 0:
+            return []
+        query = np.asarray(vector, dtype=np.float32).ravel()
+        if query.shape[0] != self.matrix.shape[1]:
+            raise ValueError(
+                "Question vector has %d dimensions, the index %d"
+                % (query.shape[0], self.matrix.shape[1])
+            )
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        if courseids is None and self.hnsw is not None:
+            labels, distances = self.hnsw.knn_query(query, k=min(k, len(self)))
+            # hnswlib's "ip" distance is already 1 - inner product
+            rows, distances = labels[0], distances[0]
+        else:
+            rows = np.arange(len(self))
+            if courseids is not None:
+                rows = np.flatnonzero(np.isin(self.courseids, courseids))
+            distances = 1 - self.matrix[rows] @ query
+            if len(rows) > k:
+                top = np.argpartition(distances, k - 1)[:k]
+                rows, distances = rows[top], distances[top]
+            order = np.argsort(distances, kind="stable")
+            rows, distances = rows[order], distances[order]
+
+        return [
+            (int(self.chunkids[row]), int(self.courseids[row]), self.chunks[row], float(distance))
+            for row, distance in zip(rows, distances)
+        ]
+
+
+def buildSyllabusIndex(rows, folder, hnsw=False):
+    # rows: (chunkid, courseid, chunk, embedding) from SyllabusDAO.getEmbeddings.
+    # The files of a build get their own names and the manifest is replaced
+    # last, so processes reading the previous build are not disturbed.
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, LOCK), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        return _build(rows, folder, hnsw)
+
+
+def _build(rows, folder, hnsw):
+    start = time.perf_counter()
+    started_at = time.time()
+    build = uuid.uuid4().hex[:12]
+
+    if rows:
+        matrix = np.array([row[3] for row in rows], dtype=np.float32)
+    else:
+        matrix = np.zeros((0, 0), dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+    manifest = {
+        "build": build,
+        "built_at": started_at,
+        "count": len(rows),
+        "dimension": int(matrix.shape[1]),
+        "embeddings": "embeddings-%s.npy" % build,
+        "chunkids": "chunkids-%s.npy" % build,
+        "courseids": "courseids-%s.npy" % build,
+        "chunks": "chunks-%s.json" % build,
+        "hnsw": None,
+    }
+    np.save(os.path.join(folder, manifest["embeddings"]), matrix)
+    np.save(os.path.join(folder, manifest["chunkids"]), np.array([row[0] for row in rows], dtype=np.int64))
+    np.save(os.path.join(folder, manifest["courseids"]), np.array([row[1] for row in rows], dtype=np.int64))
+    with open(os.path.join(folder, manifest["chunks"]), "w") as file:
+        json.dump([row[2] for row in rows], file)
+
+    if hnsw and rows:
+        try:
+            import hnswlib
+        except ImportError:
+            logger.warning("hnswlib is not installed, building the syllabus index without HNSW")
+        else:
+            graph = hnswlib.Index(space="ip", dim=manifest["dimension"])
+            graph.init_index(max_elements=len(rows), M=HNSW_M, ef_construction=HNSW_EF_CONSTRUCTION)
+            graph.add_items(matrix, np.arange(len(rows)))
+            manifest["hnsw"] = "hnsw-%s.bin" % build
+            graph.save_index(os.path.join(folder, manifest["hnsw"]))
+
+    # The build being replaced stays on disk for the processes that just read
+    # its manifest; the ones before it go
+    keep = {value for value in manifest.values() if isinstance(value, str)}
+    try:
+        with open(os.path.join(folder, MANIFEST)) as file:
+            keep.update(value for value in json.load(file).values() if isinstance(value, str))
+    except (FileNotFoundError, ValueError):
+        pass
+
+    temporary = os.path.join(folder, "manifest-%s.json.tmp" % build)
+    with open(temporary, "w") as file:
+        json.dump(manifest, file)
+    os.replace(temporary, os.path.join(folder, MANIFEST))
+
+    # Processes that still map the removed files keep them open
+    for file_name in os.listdir(folder):
+        path = os.path.join(folder, file_name)
+        if (
+            file_name not in keep
+            and file_name not in (MANIFEST, LOCK)
+            and "-" in file_name
+            and os.path.getmtime(path) < started_at
+        ):
+            os.remove(path)
+
+    logger.info(
+        "Built the syllabus index (%d chunks%s) in %.3fs",
+        len(rows),
+        ", HNSW" if manifest["hnsw"] else "",
+        time.perf_counter() - start,
+    )
+    return manifest
+
+
+# (manifest build id, index) of this process
+_index = None
+_index_lock = threading.Lock()
+
+
+def getSyllabusIndex(loader, folder=None):
+    # The index in folder, built with loader() when there is none yet. A
+    # rebuild by another process is picked up on the next call.
+    global _index
+    folder = folder or retrieval_config["index_dir"]
+    path = os.path.join(folder, MANIFEST)
+    with _index_lock:
+        if not os.path.exists(path):
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, LOCK), "w") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                # Another process may have built it while this one waited
+                if not os.path.exists(path):
+                    _build(loader(), folder, retrieval_config["hnsw"])
+        for attempt in range(2):
+            with open(path) as file:
+                manifest = json.load(file)
+            if _index is not None and _index[0] == manifest["build"]:
+                break
+            try:
+                _index = (manifest["build"], SyllabusIndex(folder, manifest))
+                break
+            except FileNotFoundError:
+                # A rebuild replaced the manifest while this one was being opened
+                if attempt:
+                    raise
+        return _index[1]
+
+
+def rebuildSyllabusIndex(loader, folder=None):
+    # After the syllabus table changed (a syllabus ingestion). The rows are
+    # read under the lock so a slower, older read cannot be published last.
+    folder = folder or retrieval_config["index_dir"]
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, LOCK), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        return _build(loader(), folder, retrieval_config["hnsw"])
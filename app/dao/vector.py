@@ -0,0 +1,23 @@
+import numpy as np
+from psycopg2.extensions import AsIs, register_adapter
+
+
+class Vector:
+    # A pgvector parameter. Wrap an embedding in Vector(...) and pass it to
+    # cursor.execute / execute_values like any other value; it reaches the
+    # server as a typed vector literal at the float32 precision pgvector stores.
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=np.float32).ravel()
+
+    def __len__(self):
+        return len(self.values)
+
+
+def adaptVector(vector):
+    # psycopg2 only sends text parameters, so this is the shortest exact text:
+    # 9 significant digits round-trip a float32
+    text = ",".join(["%.9g" % value for value in vector.values.tolist()])
+    return AsIs("'[%s]'::vector" % text)
+
+
+register_adapter(Vector, adaptVector)
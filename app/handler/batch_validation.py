@@ -0,0 +1,321 @@
+from datetime import datetime, timedelta
+
+from dao.course import ClassDAO
+from dao.meeting import MeetingDAO
+from dao.requisite import RequisiteDAO
+from dao.room import RoomDAO
+from dao.section import SectionDAO
+from handler.incremental_validation import (
+    check_class_id,
+    check_class_timeframe,
+    check_meeting_time,
+    check_requisite_cycle,
+    check_room_capacity,
+    to_minutes,
+)
+
+
+# Rules for the bulk write endpoints. A batch is checked in one pass: the rows
+# it references are fetched with one query per table, and every row is also
+# checked against the rows accepted before it in the same batch.
+# Each validate_*_batch returns one reason per row, None when it is accepted.
+
+
+def check_section_fields(section):
+    if not isinstance(section, dict):
+        return "Row is not an object"
+    for field in ["roomid", "cid", "mid", "semester", "years", "capacity"]:
+        if field not in section:
+            return "Missing required fields"
+    for field in ["roomid", "cid", "mid", "capacity"]:
+        if not isinstance(section[field], int) or isinstance(section[field], bool):
+            return "Invalid datatype %s" % field
+    for field in ["semester", "years"]:
+        if not isinstance(section[field], str):
+            return "Invalid datatype %s" % field
+    if section["capacity"] <= 0:
+        return "Capacity less than 1"
+    if any(len(section[field].strip()) == 0 for field in ["semester", "years"]):
+        return "A entry is empty"
+    if len(section["years"].strip()) > 4:
+        return "Invalid years"
+    return None
+
+
+def check_meeting_fields(meeting):
+    # Also behind MeetingHandler.validateMeetingInput for single inserts and updates
+    if not isinstance(meeting, dict):
+        return "Row is not an object"
+    ccode = meeting.get("ccode")
+    starttime = meeting.get("starttime")
+    endtime = meeting.get("endtime")
+    cdays = meeting.get("cdays")
+    if not ccode or not starttime or not endtime or not cdays:
+        return "Missing required fields"
+
+    if any(
+        not isinstance(value, str) for value in [ccode, starttime, endtime, cdays]
+    ) or any(len(value.strip()) == 0 for value in [ccode, starttime, endtime, cdays]):
+        return "A entry is empty or invalid type"
+
+    cdays = cdays.upper()
+    if cdays not in ["LWV", "MJ"]:
+        return "Invalid cdays"
+
+    try:
+        starttime_dt = datetime.strptime(starttime, "%H:%M:%S")
+    except ValueError:
+        return "Invalid datetime format for starttime"
+    try:
+        endtime_dt = datetime.strptime(endtime, "%H:%M:%S")
+    except ValueError:
+        return "Invalid datetime format for endtime"
+
+    if starttime_dt.second != 0 or endtime_dt.second != 0:
+        return "Seconds should be 0"
+    if starttime_dt >= endtime_dt:
+        return "Invalid time range, starttime is the same or more than endtime"
+    if cdays == "MJ" and (
+        starttime_dt < datetime.strptime("7:30", "%H:%M")
+        or endtime_dt > datetime.strptime("19:45", "%H:%M")
+    ):
+        return "Invalid time range"
+    if cdays == "MJ" and (
+        starttime_dt >= datetime.strptime("10:15", "%H:%M")
+        and endtime_dt <= datetime.strptime("12:30", "%H:%M")
+    ):
+        return "Invalid time range for MJ meetings, 'Hora Universal'"
+    if cdays == "LWV" and endtime_dt - starttime_dt != timedelta(minutes=50):
+        return "Invalid time range for LMV meetings"
+    if cdays == "MJ" and endtime_dt - starttime_dt != timedelta(hours=1, minutes=15):
+        return "Invalid time range for MJ meetings"
+    return None
+
+
+def check_room_fields(room):
+    if not isinstance(room, dict):
+        return "Row is not an object"
+    if "building" not in room or "room_number" not in room or "capacity" not in room:
+        return "Missing required fields"
+    capacity = room["capacity"]
+    if not isinstance(capacity, int) or isinstance(capacity, bool) or capacity <= 0:
+        return "Invalid capacity type"
+    if not isinstance(room["room_number"], str):
+        return "Invalid room_number type"
+    if not isinstance(room["building"], str):
+        return "Invalid building type"
+    if any(len(room[field].strip()) == 0 for field in ["building", "room_number"]):
+        return "A entry is empty or invalid type"
+    return None
+
+
+def check_requisite_fields(requisite):
+    if not isinstance(requisite, dict):
+        return "Row is not an object"
+    if "classid" not in requisite or "reqid" not in requisite or "prereq" not in requisite:
+        return "Missing required fields"
+    for field in ["classid", "reqid"]:
+        if not isinstance(requisite[field], int) or isinstance(requisite[field], bool):
+            return "Invalid datatype for %s" % field
+    if not isinstance(requisite["prereq"], bool):
+        return "Invalid datatype for prereq"
+    return None
+
+
+def check_fields(rows, check):
+    return [check(row) for row in rows]
+
+
+def is_hora_universal_shift(start, end, cdays):
+    # MJ meetings touching 10:15-12:30 are moved by MeetingHandler.insertMeeting,
+    # which has to be done one meeting at a time
+    if cdays != "MJ":
+        return False
+    return (to_minutes("10:15") <= start < to_minutes("12:30")) or (
+        to_minutes("10:15") < end < to_minutes("12:30")
+    )
+
+
+def meetings_conflict(start, end, other_start, other_end):
+    # Same predicate as MeetingDAO.checkMeetingConflict
+    return (other_start < start and other_end >= start) or (
+        other_start <= end and other_end > end
+    )
+
+
+def validate_section_batch(sections):
+    reasons = check_fields(sections, check_section_fields)
+    candidates = [section for section, reason in zip(sections, reasons) if reason is None]
+    if not candidates:
+        return reasons
+
+    rooms = {
+        row[0]: row
+        for row in RoomDAO().getRoomsByRids({section["roomid"] for section in candidates})
+    }
+    courses = {
+        row[0]: row
+        for row in ClassDAO().getClassesByIds({section["cid"] for section in candidates})
+    }
+    meetings = {
+        row[0]: row
+        for row in MeetingDAO().getMeetingsByMids({section["mid"] for section in candidates})
+    }
+
+    # Sections already in the rooms of the batch, for the duplicate and overlap rules
+    existing = {}
+    schedule = {}
+    for row in SectionDAO().getRoomSchedules(rooms):
+        sid, roomid, cid, mid, semester, years, cdays, starttime, endtime = row
+        existing.setdefault((roomid, cid, mid, semester, years), sid)
+        schedule.setdefault((roomid, semester, years, cdays), []).append(
+            (to_minutes(starttime), to_minutes(endtime), "section %s" % sid)
+        )
+
+    for index, section in enumerate(sections):
+        if reasons[index] is not None:
+            continue
+
+        key = (
+            section["roomid"],
+            section["cid"],
+            section["mid"],
+            section["semester"],
+            section["years"],
+        )
+        if key in existing:
+            reasons[index] = "Duplicate Entry"
+            continue
+
+        meeting = meetings.get(section["mid"])
+        error = (
+            check_class_id(section["cid"])
+            or check_room_capacity(section["capacity"], rooms.get(section["roomid"]))
+            or check_class_timeframe(
+                section["semester"], section["years"], courses.get(section["cid"])
+            )
+            or check_meeting_time(meeting)
+        )
+        if error:
+            reasons[index] = error
+            continue
+
+        # 3. A room holds one section at a time
+        start = to_minutes(meeting[2])
+        end = to_minutes(meeting[3])
+        slot = schedule.setdefault(
+            (section["roomid"], section["semester"], section["years"], meeting[4]), []
+        )
+        conflict = None
+        for other_start, other_end, other in slot:
+            if other_start < end and other_end > start:
+                conflict = other
+                break
+        if conflict is not None:
+            reasons[index] = "Room already used at this time by %s" % conflict
+            continue
+
+        existing[key] = None
+        slot.append((start, end, "row %s of the batch" % index))
+    return reasons
+
+
+def validate_meeting_batch(meetings):
+    reasons = check_fields(meetings, check_meeting_fields)
+    dao = MeetingDAO()
+
+    accepted = {}
+    for index, meeting in enumerate(meetings):
+        if reasons[index] is not None:
+            continue
+
+        ccode = meeting["ccode"]
+        cdays = meeting["cdays"].upper()
+        start = to_minutes(meeting["starttime"])
+        end = to_minutes(meeting["endtime"])
+
+        if is_hora_universal_shift(start, end, cdays):
+            reasons[index] = "Meeting overlaps the 'Hora Universal', insert it on its own"
+            continue
+
+        duplicate = dao.checkMeetingDuplicate(
+            ccode, meeting["starttime"], meeting["endtime"], cdays
+        )
+        if duplicate:
+            reasons[index] = "Duplicate Meeting, meeting id: %s" % duplicate[0]
+            continue
+
+        conflicts = dao.checkMeetingConflict(meeting["starttime"], meeting["endtime"], cdays)
+        if conflicts:
+            reasons[index] = "Meeting conflict with meeting id: %s" % conflicts[0][0]
+            continue
+
+        # Meetings accepted earlier in the batch
+        conflict = None
+        for other_index, (other_start, other_end) in accepted.get(cdays, {}).items():
+            if meetings_conflict(start, end, other_start, other_end):
+                conflict = other_index
+                break
+        if conflict is not None:
+            reasons[index] = "Meeting conflict with row %s of the batch" % conflict
+            continue
+
+        accepted.setdefault(cdays, {})[index] = (start, end)
+    return reasons
+
+
+def validate_room_batch(rooms):
+    reasons = check_fields(rooms, check_room_fields)
+    pairs = {
+        (room["building"], room["room_number"])
+        for room, reason in zip(rooms, reasons)
+        if reason is None
+    }
+    if not pairs:
+        return reasons
+
+    taken = {(row[1], row[2]) for row in RoomDAO().getRoomsByBuildingNumber(list(pairs))}
+    for index, room in enumerate(rooms):
+        if reasons[index] is not None:
+            continue
+        pair = (room["building"], room["room_number"])
+        if pair in taken:
+            reasons[index] = "Duplicate Room"
+            continue
+        taken.add(pair)
+    return reasons
+
+
+def validate_requisite_batch(requisites):
+    reasons = check_fields(requisites, check_requisite_fields)
+    pairs = {
+        (requisite["classid"], requisite["reqid"])
+        for requisite, reason in zip(requisites, reasons)
+        if reason is None
+    }
+    if not pairs:
+        return reasons
+
+    cids = {cid for pair in pairs for cid in pair}
+    classes = {row[0] for row in ClassDAO().getClassesByIds(cids)}
+    dao = RequisiteDAO()
+    taken = dao.getExistingRequisites(list(pairs))
+    graph = dao.getRequisiteGraph()
+    # Edges accepted earlier in the batch, for the cycle rule
+    added = []
+    for index, requisite in enumerate(requisites):
+        if reasons[index] is not None:
+            continue
+        pair = (requisite["classid"], requisite["reqid"])
+        if pair[0] not in classes:
+            reasons[index] = "Class ID not found"
+        elif pair[1] not in classes:
+            reasons[index] = "Req ID not found"
+        elif pair in taken:
+            reasons[index] = "Duplicate Entry"
+        else:
+            reasons[index] = check_requisite_cycle(requisite, graph, added)
+            if reasons[index] is None:
+                taken.add(pair)
+                added.append(pair)
+    return reasons
@@ -0,0 +1,45 @@
+from flask import jsonify
+from psycopg2 import Error
+
+from config.app_config import bulk_config
+
+
+def bulkInsert(rows_json, validate, insert, mapToDict):
+    # Validates the whole batch in one pass, inserts the accepted rows in one
+    # transaction and reports what happened to every row, by its index
+    if not isinstance(rows_json, list) or len(rows_json) == 0:
+        return jsonify(InsertStatus="Expected a non-empty list of rows"), 400
+    if len(rows_json) > bulk_config["max_rows"]:
+        return (
+            jsonify(InsertStatus="Too many rows, the limit is %s" % bulk_config["max_rows"]),
+            400,
+        )
+
+    reasons = validate(rows_json)
+    accepted = [index for index, reason in enumerate(reasons) if reason is None]
+
+    inserted = []
+    if accepted:
+        try:
+            inserted = insert([rows_json[index] for index in accepted])
+        except Error as e:
+            return jsonify(InsertStatus="Error inserting the batch, nothing was inserted", Reason=str(e)), 400
+
+    results = []
+    rows = dict(zip(accepted, inserted))
+    for index, reason in enumerate(reasons):
+        if reason is None:
+            results.append({"index": index, "status": "inserted", "row": mapToDict(rows[index])})
+        else:
+            results.append({"index": index, "status": "rejected", "reason": reason})
+
+    status = 201 if inserted else 400
+    return (
+        jsonify(
+            InsertStatus="OK" if inserted else "Nothing inserted",
+            inserted=len(inserted),
+            rejected=len(rows_json) - len(inserted),
+            results=results,
+        ),
+        status,
+    )
@@ -1,8 +1,11 @@
 import re
 from flask import jsonify
-from dao.course import ClassDAO
+from dao.course import CLASS_FILTERS, CLASS_PAGE_KEY, ClassDAO
 import pandas as pd
+from config.app_config import stream_config
 from handler.data_validation import rem_courses_with_invalid_timeframe
+from handler.pagination import isWholeTable, pageResponse, parsePageArgs
+from handler.streaming import streamJSONArray, wantsStream
 
 
 class ClassHandler:
@@ -44,11 +47,29 @@ class ClassHandler:
         result["prerequisite_classes"] = tuple[8]
         return result
 
-    def getAllClass(self):
-        result = []
+    def getAllClass(self, args=None):
+        try:
+            page = parsePageArgs(args, CLASS_FILTERS, len(CLASS_PAGE_KEY))
+        except ValueError as e:
+            return jsonify(GetStatus=str(e)), 400
+
         dao = ClassDAO()
-        temp = dao.getAllClass()
+        if page["limit"] is not None:
+            # One extra row tells whether there is a next page
+            rows = dao.getClassPage(page["filters"], page["after"], page["limit"] + 1)
+            return pageResponse(rows, page["limit"], lambda row: row[:1], self.mapToDict)
+
+        if wantsStream(args):
+            rows = dao.streamAllClass(
+                stream_config["fetch_size"], page["filters"], page["after"]
+            )
+            return streamJSONArray(rows, self.mapToDict)
 
+        result = []
+        if isWholeTable(page):
+            temp = dao.getAllClass()
+        else:
+            temp = dao.getClassPage(page["filters"], page["after"])
         for row in temp:
             result.append(self.mapToDict(row))
         return jsonify(result)
@@ -327,12 +348,14 @@ class ClassHandler:
                     return jsonify(InsertStatus="Incorrect years value, the options are: 'Even Years', 'Odd Years', 'According to Demand', 'Every Year'"), 416
         
         # Inspect Duplicates before inserting or Updating (Dont use Primary Key, that is always diferent (serial))
-        if method == "insert":
-            cdescDuplicateCid = dao.cdescDuplicate(temp)
-            csyllabusDuplicateCid = dao.csyllabusDuplicate(temp)
-            cname_and_ccodeDuplicateCid = dao.cname_and_ccodeDuplicate(temp)
+        duplicates = dao.findDuplicates(temp, cid)
+        exactDuplicateCid = duplicates["exact"]
+        cname_and_ccodeDuplicateCid = duplicates["cname_and_ccode"]
+        cdescDuplicateCid = duplicates["cdesc"]
+        csyllabusDuplicateCid = duplicates["csyllabus"]
 
-            if dao.exactDuplicate(temp, method):
+        if method == "insert":
+            if exactDuplicateCid is not None:
                 return jsonify(InsertStatus="Exact Duplicate Entry"), 400
             
             if cname_and_ccodeDuplicateCid is not None:
@@ -345,15 +368,10 @@ class ClassHandler:
                 return jsonify(InsertStatus="Duplicate entry: The class with 'cid' %s has the same 'Csyllabus' %s. Delete or Update the existing class first." % (csyllabusDuplicateCid, temp["csyllabus"])), 400
         
         elif method == "update":
-            cdescDuplicateCid = dao.cdescDuplicate(temp)
-            csyllabusDuplicateCid = dao.csyllabusDuplicate(temp)
-            updateExactCid = dao.exactDuplicate(temp, method)
-            cname_and_ccodeDuplicateCid = dao.cname_and_ccodeDuplicate(temp)
-
-            if updateExactCid is not None:
-                if updateExactCid != cid:
-                    return jsonify(UpdateStatus="Duplicate Entry: The class with 'cid' %s has the same exact data" % updateExactCid), 400
-                elif updateExactCid == cid:
+            if exactDuplicateCid is not None:
+                if exactDuplicateCid != cid:
+                    return jsonify(UpdateStatus="Duplicate Entry: The class with 'cid' %s has the same exact data" % exactDuplicateCid), 400
+                elif exactDuplicateCid == cid:
                     return jsonify(UpdateStatus="Duplicate Entry: This class have the desired data, no changes made"), 400
                 
             if cname_and_ccodeDuplicateCid is not None:
@@ -383,6 +401,8 @@ class ClassHandler:
         csyllabus = class_json["csyllabus"]
      
         cid = dao.insertClass(cname, ccode, cdesc, term, years, cred, csyllabus)
+        if cid is None:
+            return jsonify(InsertStatus="Duplicate entry: A class with the same 'Cname' %s and 'Ccode' %s already exists." % (cname, ccode)), 400
         result = (cid, cname, ccode, cdesc, term, years, cred, csyllabus)
         return jsonify(self.mapToDict(result)), 201
 
@@ -436,6 +456,8 @@ class ClassHandler:
         temp = dao.updateClassById(
             cid, cname, ccode, cdesc, term, years, cred, csyllabus
         )
+        if temp is None:
+            return jsonify(UpdateStatus="Duplicate entry: A class with the same 'Cname' %s and 'Ccode' %s already exists." % (cname, ccode)), 400
         if temp:
             tup = (cid, cname, ccode, cdesc, term, years, cred, csyllabus)
             return jsonify(self.mapToDict(tup)), 200
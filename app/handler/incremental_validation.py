@@ -0,0 +1,153 @@
+from datetime import time
+
+from dao.course import ClassDAO
+from dao.meeting import MeetingDAO
+from dao.requisite import RequisiteDAO
+from dao.room import RoomDAO
+from handler.rule_timing import rule_run, timed_rule
+
+
+# Same rules as handler.data_validation.clean_data, evaluated for a single
+# candidate row with primary key lookups instead of reloading every table.
+# Each rule returns the reason the row is rejected, or None when it passes.
+
+DUMMY_CLASS_NAME = "Authorization from the Director of the Department"
+
+
+def to_minutes(value):
+    # Meeting times come from the database as datetime.time
+    if isinstance(value, time):
+        return value.hour * 60 + value.minute
+    hours, minutes = str(value).split(":")[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+@timed_rule
+def check_class_id(cid):
+    # 1. Classes have IDs starting from 2
+    if cid < 2:
+        return "Class ID must be 2 or greater"
+    return None
+
+
+@timed_rule
+def check_room_capacity(capacity, room):
+    # 7. Sections cannot be in overcapacity, classrooms have limits.
+    if room is None:
+        return "Room not found"
+    if capacity > room[3]:
+        return "Section capacity exceeds the room capacity"
+    return None
+
+
+def is_valid_timeframe(term, class_years, semester, years):
+    # 8. Courses must be taught in the correct year and correct semester.
+    first_semester = (
+        term in ["First Semester", "First Semester, Second Semester"]
+        and semester == "Fall"
+    )
+    second_semester = (
+        term in ["Second Semester", "First Semester, Second Semester"]
+        and semester == "Spring"
+    )
+    according_demand = term == "According to Demand" and semester in [
+        "Fall",
+        "Spring",
+        "V1",
+        "V2",
+    ]
+
+    try:
+        year = int(years)
+    except (TypeError, ValueError):
+        year = None
+
+    even_year = class_years == "Even Years" and year is not None and year % 2 == 0
+    odd_year = class_years == "Odd Years" and year is not None and year % 2 != 0
+    every_year = class_years == "Every Year"
+    according_demand_year = class_years == "According to Demand"
+
+    return (first_semester or second_semester or according_demand) and (
+        even_year or odd_year or every_year or according_demand_year
+    )
+
+
+@timed_rule
+def check_class_timeframe(semester, years, course):
+    if course is None:
+        return "Class not found"
+    if course[1] == DUMMY_CLASS_NAME:
+        return "Sections cannot be created for this class"
+    if not is_valid_timeframe(course[4], course[5], semester, years):
+        return "The class is not taught in this semester or year"
+    return None
+
+
+@timed_rule
+def check_meeting_time(meeting):
+    # 4. 'MJ' meetings cannot be inside the 'Hora Universal' and nothing starts after 19:45
+    # 5. & 6. 'LWV' meetings last 50 minutes; 'MJ' meetings last 75 minutes.
+    if meeting is None:
+        return "Meeting not found"
+
+    starttime = to_minutes(meeting[2])
+    endtime = to_minutes(meeting[3])
+    cdays = meeting[4]
+
+    if cdays not in ["LWV", "MJ"]:
+        return "Invalid meeting days"
+    if cdays == "MJ" and starttime > to_minutes("10:15") and endtime < to_minutes("12:30"):
+        return "Meeting is inside the 'Hora Universal'"
+    if starttime > to_minutes("19:45"):
+        return "Meeting starts after 19:45"
+    if cdays == "LWV" and endtime - starttime != 50:
+        return "Invalid duration for LWV meeting"
+    if cdays == "MJ" and endtime - starttime != 75:
+        return "Invalid duration for MJ meeting"
+    return None
+
+
+@rule_run
+def validate_section(section, sid=-1):
+    # Evaluate the rules in the same order clean_data applies them
+    error = check_class_id(section["cid"])
+    if error:
+        return error
+
+    room = RoomDAO().getRoomByRid(section["roomid"])
+    error = check_room_capacity(section["capacity"], room)
+    if error:
+        return error
+
+    course = ClassDAO().getClassById(section["cid"])
+    error = check_class_timeframe(section["semester"], section["years"], course)
+    if error:
+        return error
+
+    # 3. Room double-booking is refused by the section_room_time_excl constraint
+    meeting = MeetingDAO().getMeetingByMid(section["mid"])
+    return check_meeting_time(meeting)
+
+
+@timed_rule
+def check_requisite_cycle(requisite, graph, extra_edges=()):
+    # Requisites form a DAG: a class cannot end up requiring itself
+    if graph.wouldCreateCycle(requisite["classid"], requisite["reqid"], extra_edges):
+        return "The requisite creates a cycle"
+    return None
+
+
+@rule_run
+def validate_requisite(requisite):
+    dao = ClassDAO()
+    if not dao.classExists(requisite["classid"]):
+        return "Class ID not found"
+    if not dao.classExists(requisite["reqid"]):
+        return "Req ID not found"
+
+    dao = RequisiteDAO()
+    if dao.getRequisiteByClassIdReqId(
+        requisite["classid"], requisite["reqid"]
+    ) is not None:
+        return "Duplicate Entry"
+    return check_requisite_cycle(requisite, dao.getRequisiteGraph())
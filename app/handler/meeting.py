@@ -1,7 +1,16 @@
 import re
 from flask import jsonify
+from psycopg2.errors import ExclusionViolation
 from datetime import datetime, timedelta
-from dao.meeting import MeetingDAO
+from config.app_config import stream_config
+from dao.meeting import MEETING_FILTERS, MEETING_PAGE_KEY, MeetingDAO
+from handler.batch_validation import check_meeting_fields, validate_meeting_batch
+from handler.bulk import bulkInsert
+from handler.pagination import isWholeTable, pageResponse, parsePageArgs
+from handler.streaming import streamJSONArray, wantsStream
+
+# Reason given when moving meetings would double-book a room (section_room_time_excl)
+ROOM_TIME_CONFLICT = "The new meeting times put two sections in the same room at the same time"
 
 
 class MeetingHandler:
@@ -34,76 +43,66 @@ class MeetingHandler:
         return result
 
     def validateMeetingInput(self, ccode, starttime, endtime, cdays):
-        if not ccode or not starttime or not endtime or not cdays:
-            return jsonify(InsertStatus="Missing required fields"), 404
-
-        if any(
-            not isinstance(value, str) for value in [ccode, starttime, endtime, cdays]
-        ) or any(
-            len(value.strip()) == 0 for value in [ccode, starttime, endtime, cdays]
-        ):
-            return jsonify(InsertStatus="A entry is empty or invalid type"), 400
-
-        cdays = cdays.upper()
-        if cdays not in ["LWV", "MJ"]:
-            return jsonify(InsertStatus="Invalid cdays"), 400
-
-        starttime_dt = endtime_dt = None
-        try:
-            starttime_dt = datetime.strptime(starttime, "%H:%M:%S")
-        except ValueError:
-            return jsonify(InsertStatus="Invalid datetime format for starttime"), 400
+        error = check_meeting_fields(
+            {"ccode": ccode, "starttime": starttime, "endtime": endtime, "cdays": cdays}
+        )
+        if error is None:
+            return None, None
+        if error == "Missing required fields":
+            return jsonify(InsertStatus=error), 404
+        return jsonify(InsertStatus=error), 400
 
+    def getAllMeeting(self, args=None):
         try:
-            endtime_dt = datetime.strptime(endtime, "%H:%M:%S")
-        except ValueError:
-            return jsonify(InsertStatus="Invalid datetime format for endtime"), 400
-
-        if starttime_dt.second != 0 or endtime_dt.second != 0:
-            return jsonify(InsertStatus="Seconds should be 0"), 400
+            page = parsePageArgs(args, MEETING_FILTERS, len(MEETING_PAGE_KEY))
+        except ValueError as e:
+            return jsonify(GetStatus=str(e)), 400
 
-        if starttime_dt >= endtime_dt or starttime_dt == endtime_dt:
-            return (
-                jsonify(
-                    InsertStatus="Invalid time range, starttime is the same or more than endtime"
-                ),
-                400,
+        dao = MeetingDAO()
+        if page["limit"] is not None:
+            # One extra row tells whether there is a next page
+            rows = dao.getMeetingPage(page["filters"], page["after"], page["limit"] + 1)
+            return pageResponse(rows, page["limit"], lambda row: row[:1], self.mapToDict)
+
+        if wantsStream(args):
+            rows = dao.streamAllMeeting(
+                stream_config["fetch_size"], page["filters"], page["after"]
             )
+            return streamJSONArray(rows, self.mapToDict)
 
-        if cdays == "MJ" and (
-            starttime_dt < datetime.strptime("7:30", "%H:%M")
-            or endtime_dt > datetime.strptime("19:45", "%H:%M")
-        ):
-            return jsonify(InsertStatus="Invalid time range"), 400
-
-        if cdays == "MJ" and (
-            starttime_dt >= datetime.strptime("10:15", "%H:%M")
-            and endtime_dt <= datetime.strptime("12:30", "%H:%M")
-        ):
-            return (
-                jsonify(
-                    InsertStatus="Invalid time range for MJ meetings, 'Hora Universal'"
-                ),
-                400,
-            )
+        result = []
+        if isWholeTable(page):
+            temp = dao.getAllMeeting()
+        else:
+            temp = dao.getMeetingPage(page["filters"], page["after"])
+        for item in temp:
+            result.append(self.mapToDict(item))
+        return jsonify(result)
 
-        if cdays == "LWV" and not (
-            endtime_dt - starttime_dt == timedelta(hours=0, minutes=50, seconds=0)
-        ):
-            return jsonify(InsertStatus="Invalid time range for LMV meetings"), 400
+    def getMeetingConflicts(self, args):
+        # Meetings that collide with ?start=&end=&cdays=, as checked on insert/update
+        starttime = args.get("start")
+        endtime = args.get("end")
+        cdays = args.get("cdays")
+        if not starttime or not endtime or not cdays:
+            return jsonify(GetStatus="Missing required parameters start, end and cdays"), 400
 
-        if cdays == "MJ" and not (
-            endtime_dt - starttime_dt == timedelta(hours=1, minutes=15, seconds=0)
-        ):
-            return jsonify(InsertStatus="Invalid time range for MJ meetings"), 400
+        cdays = cdays.upper()
+        if cdays not in ["LWV", "MJ"]:
+            return jsonify(GetStatus="Invalid cdays"), 400
 
-        return None, None
+        times = []
+        for value in [starttime, endtime]:
+            try:
+                times.append(datetime.strptime(value, "%H:%M:%S" if value.count(":") == 2 else "%H:%M"))
+            except ValueError:
+                return jsonify(GetStatus="Invalid time format %s" % value), 400
+        if times[0] >= times[1]:
+            return jsonify(GetStatus="start must be before end"), 400
 
-    def getAllMeeting(self):
-        result = []
         dao = MeetingDAO()
-        temp = dao.getAllMeeting()
-        for item in temp:
+        result = []
+        for item in dao.checkMeetingConflict(times[0].time(), times[1].time(), cdays):
             result.append(self.mapToDict(item))
         return jsonify(result)
 
@@ -203,14 +202,17 @@ class MeetingHandler:
                 result.append(self.mapToDict(item))
             return jsonify(InsertStatus="Meeting conflict", conflict=result), 400
 
-        mid = dao.insertMeeting(
-            ccode,
-            starttime,
-            endtime,
-            cdays,
-            delta_time_to_left=delta_time_to_left_str,
-            delta_time_to_right=delta_time_to_right_str,
-        )
+        try:
+            mid = dao.insertMeeting(
+                ccode,
+                starttime,
+                endtime,
+                cdays,
+                delta_time_to_left=delta_time_to_left_str,
+                delta_time_to_right=delta_time_to_right_str,
+            )
+        except ExclusionViolation:
+            return jsonify(InsertStatus=ROOM_TIME_CONFLICT), 400
         mid_To_Delete = dao.deleteAllMeetingsWithInvalidTime()
         if mid_To_Delete is not None:
             return (
@@ -227,6 +229,19 @@ class MeetingHandler:
         else:
             return jsonify(InsertStatus="Error Inserting Meeting"), 400
 
+    def insertMeetingBulk(self, meetings_json):
+        return bulkInsert(
+            meetings_json,
+            validate_meeting_batch,
+            lambda rows: MeetingDAO().insertMeetings(
+                [
+                    (row["ccode"], row["starttime"], row["endtime"], row["cdays"].upper())
+                    for row in rows
+                ]
+            ),
+            self.mapToDict,
+        )
+
     def updateMeetingByMid(self, mid, meeting_json):
         if (
             "ccode" not in meeting_json
@@ -317,15 +332,18 @@ class MeetingHandler:
                 return jsonify(InsertStatus="Meeting conflict", conflict=result), 400
 
         # print("delta1:", delta_time_to_left, delta_time_to_right)
-        result = dao.updateMeetingByMid(
-            mid,
-            ccode,
-            starttime,
-            endtime,
-            cdays,
-            delta_time_to_left=delta_time_to_left_str,
-            delta_time_to_right=delta_time_to_right_str,
-        )
+        try:
+            result = dao.updateMeetingByMid(
+                mid,
+                ccode,
+                starttime,
+                endtime,
+                cdays,
+                delta_time_to_left=delta_time_to_left_str,
+                delta_time_to_right=delta_time_to_right_str,
+            )
+        except ExclusionViolation:
+            return jsonify(UpdateStatus=ROOM_TIME_CONFLICT), 400
 
         mid_To_Delete = dao.deleteAllMeetingsWithInvalidTime()
         if mid_To_Delete is not None:
@@ -0,0 +1,76 @@
+import base64
+import json
+
+from flask import jsonify
+
+from config.app_config import page_config
+
+
+def encodeCursor(key):
+    # Opaque token holding the key of the last row of the page
+    token = json.dumps(list(key), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(token).decode().rstrip("=")
+
+
+def decodeCursor(token, key_size):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if (
+        not isinstance(key, list)
+        or len(key) != key_size
+        or not all(isinstance(value, int) and not isinstance(value, bool) for value in key)
+    ):
+        raise ValueError("Invalid cursor")
+    return key
+
+
+def parsePageArgs(args, filter_types, key_size):
+    # Returns {"filters": {...}, "after": [...] or None, "limit": int or None}.
+    # Raises ValueError with the reason when a parameter is invalid.
+    filters = {}
+    if args is None:
+        return {"filters": filters, "after": None, "limit": None}
+
+    for name, cast in filter_types.items():
+        if name in args:
+            try:
+                filters[name] = cast(args.get(name))
+            except ValueError:
+                raise ValueError("Invalid value for %s" % name)
+
+    limit = None
+    if "limit" in args:
+        try:
+            limit = int(args.get("limit"))
+        except ValueError:
+            raise ValueError("Invalid limit")
+        if limit < 1 or limit > page_config["max_limit"]:
+            raise ValueError("limit must be between 1 and %s" % page_config["max_limit"])
+
+    after = None
+    if "after" in args:
+        after = decodeCursor(args.get("after"), key_size)
+
+    return {"filters": filters, "after": after, "limit": limit}
+
+
+def isWholeTable(page):
+    # No filter and no cursor: the request reads the whole table
+    return not page["filters"] and page["after"] is None
+
+
+def pageResponse(rows, limit, keyOf, mapToDict):
+    # The DAO is asked for limit + 1 rows, the extra one only tells whether
+    # there is a next page
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encodeCursor(keyOf(rows[-1]))
+
+    response = jsonify([mapToDict(row) for row in rows])
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
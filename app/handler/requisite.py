@@ -1,7 +1,12 @@
 from flask import jsonify
 from dao.course import ClassDAO
-from dao.requisite import RequisiteDAO
+from dao.requisite import REQUISITE_FILTERS, REQUISITE_PAGE_KEY, RequisiteDAO
+from config.app_config import validation_config
 from handler.data_validation import clean_data
+from handler.batch_validation import validate_requisite_batch
+from handler.bulk import bulkInsert
+from handler.incremental_validation import check_requisite_cycle, validate_requisite
+from handler.pagination import isWholeTable, pageResponse, parsePageArgs
 import pandas as pd
 
 
@@ -26,11 +31,47 @@ class RequisiteHandler:
 
         return duplicate_count == 1
 
-    def getAllRequisite(self):
-        result = []
+    def validateRequisite(self, requisite):
+        # Returns the reason the requisite is rejected, or None when it is valid
+        if validation_config["mode"] == "incremental":
+            return validate_requisite(requisite)
+
+        # Full mode: verify the classes exist, then run every rule over the whole database
+        dao = ClassDAO()
+        if not dao.classExists(requisite["classid"]):
+            return "Class ID not found"
+        if not dao.classExists(requisite["reqid"]):
+            return "Req ID not found"
+
+        df_to_insert = pd.DataFrame({key: [value] for key, value in requisite.items()})
+        df_list = clean_data(df_to_insert, "requisite")
+
+        df_requisite = []
+        for df, df_name in df_list:
+            if df_name == "requisite":
+                df_requisite = df
+
+        if len(df_requisite) == 0 or not self.confirmDataInDF(df_to_insert, df_requisite):
+            return "Duplicate Entry"
+        return check_requisite_cycle(requisite, RequisiteDAO().getRequisiteGraph())
+
+    def getAllRequisite(self, args=None):
+        try:
+            page = parsePageArgs(args, REQUISITE_FILTERS, len(REQUISITE_PAGE_KEY))
+        except ValueError as e:
+            return jsonify(GetStatus=str(e)), 400
+
         dao = RequisiteDAO()
-        temp = dao.getAllRequisite()
+        if page["limit"] is not None:
+            # One extra row tells whether there is a next page
+            rows = dao.getRequisitePage(page["filters"], page["after"], page["limit"] + 1)
+            return pageResponse(rows, page["limit"], lambda row: row[:2], self.mapToDict)
 
+        result = []
+        if isWholeTable(page):
+            temp = dao.getAllRequisite()
+        else:
+            temp = dao.getRequisitePage(page["filters"], page["after"])
         for row in temp:
             result.append(self.mapToDict(row))
         return jsonify(result)
@@ -63,56 +104,29 @@ class RequisiteHandler:
         if not isinstance(prereq, bool):
             return jsonify(UpdateStatus="Invalid datatype for prereq"), 400
 
-        dao = ClassDAO()
-        temp = dao.getAllClass()
-        df = pd.DataFrame(
-            temp,
-            columns=[
-                "classid",
-                "cname",
-                "ccode",
-                "cdesc",
-                "term",
-                "years",
-                "cred",
-                "csyllabus",
-            ],
-        )
-
-        class_exist = False
-        req_exist = False
-
-        for row in df.itertuples():
-            if row.classid == classid:
-                class_exist = True
-            if row.classid == reqid:
-                req_exist = True
-
-        if class_exist and req_exist:
-            data = {"classid": [classid], "reqid": [reqid], "prereq": [prereq]}
-            df_to_insert = pd.DataFrame(data)
-            df_list = clean_data(df_to_insert, "requisite")
+        requisite = {"classid": classid, "reqid": reqid, "prereq": prereq}
+        error = self.validateRequisite(requisite)
 
-            df_requisite = []
-            for df, df_name in df_list:
-                if df_name == "requisite":
-                    df_requisite = df
+        if error is None:
+            dao = RequisiteDAO()
+            ids = dao.insertRequisite(classid, reqid, prereq)
+            temp = (ids[0], ids[1], prereq)  # type: ignore
 
-            is_data_confirmed = self.confirmDataInDF(df_to_insert, df_requisite)
-
-            if is_data_confirmed:
-                dao = RequisiteDAO()
-                ids = dao.insertRequisite(classid, reqid, prereq)
-                temp = (ids[0], ids[1], prereq)  # type: ignore
-
-                return self.mapToDict(temp), 201
-            else:
-                return jsonify(InsertStatus="Duplicate Entry"), 400
+            return self.mapToDict(temp), 201
+        elif error in ["Class ID not found", "Req ID not found"]:
+            return jsonify(InsertStatus=error), 404
         else:
-            if not class_exist:
-                return jsonify(InsertStatus="Class ID not found"), 404
-            if not req_exist:
-                return jsonify(InsertStatus="Req ID not found"), 404
+            return jsonify(InsertStatus=error), 400
+
+    def insertRequisiteBulk(self, requisites_json):
+        return bulkInsert(
+            requisites_json,
+            validate_requisite_batch,
+            lambda rows: RequisiteDAO().insertRequisites(
+                [(row["classid"], row["reqid"], row["prereq"]) for row in rows]
+            ),
+            self.mapToDict,
+        )
 
     def deleteRequisiteByClassIdReqId(self, classid, reqid):
         dao = RequisiteDAO()
@@ -137,3 +151,43 @@ class RequisiteHandler:
             dao.updateRequisiteByClassIdReqId(classid, reqid, prereq)
             temp = (classid, reqid, prereq)
             return jsonify(self.mapToDict(temp)), 200
+
+    def GraphMapToDict(self, graph, cid):
+        result = {}
+        result["cid"] = cid
+        # Length of the longest requisite chain below the class
+        result["level"] = graph.level.get(cid, 0)
+        return result
+
+    def getPrerequisiteChain(self, cid):
+        # Every class cid requires, directly or not, in an order they can be taken
+        if not ClassDAO().classExists(cid):
+            return jsonify(GetStatus="Class Not Found"), 404
+
+        graph = RequisiteDAO().getRequisiteGraph()
+        result = self.GraphMapToDict(graph, cid)
+        result["prerequisites"] = [
+            self.GraphMapToDict(graph, node) for node in graph.prerequisitesOf(cid)
+        ]
+        return jsonify(result)
+
+    def getDependents(self, cid):
+        # Every class that requires cid, directly or not
+        if not ClassDAO().classExists(cid):
+            return jsonify(GetStatus="Class Not Found"), 404
+
+        graph = RequisiteDAO().getRequisiteGraph()
+        result = self.GraphMapToDict(graph, cid)
+        result["dependents"] = [
+            self.GraphMapToDict(graph, node) for node in graph.dependentsOf(cid)
+        ]
+        return jsonify(result)
+
+    def getLongestPath(self, cid=None):
+        # Longest requisite chain below cid, or in the whole catalog
+        if cid is not None and not ClassDAO().classExists(cid):
+            return jsonify(GetStatus="Class Not Found"), 404
+
+        graph = RequisiteDAO().getRequisiteGraph()
+        path = graph.longestPath(cid)
+        return jsonify(length=max(len(path) - 1, 0), path=path)
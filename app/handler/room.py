@@ -1,7 +1,12 @@
 import pandas as pd
 from flask import jsonify
-from dao.room import RoomDAO
+from dao.room import ROOM_FILTERS, ROOM_PAGE_KEY, RoomDAO
 from dao.section import SectionDAO
+from config.app_config import stream_config
+from handler.batch_validation import validate_room_batch
+from handler.bulk import bulkInsert
+from handler.pagination import isWholeTable, pageResponse, parsePageArgs
+from handler.streaming import streamJSONArray, wantsStream
 
 
 class RoomHandler:
@@ -24,10 +29,29 @@ class RoomHandler:
         }
         return result
 
-    def getAllRoom(self):
-        result = []
+    def getAllRoom(self, args=None):
+        try:
+            page = parsePageArgs(args, ROOM_FILTERS, len(ROOM_PAGE_KEY))
+        except ValueError as e:
+            return jsonify(GetStatus=str(e)), 400
+
         dao = RoomDAO()
-        temp = dao.getAllRoom()
+        if page["limit"] is not None:
+            # One extra row tells whether there is a next page
+            rows = dao.getRoomPage(page["filters"], page["after"], page["limit"] + 1)
+            return pageResponse(rows, page["limit"], lambda row: row[:1], self.mapToDict)
+
+        if wantsStream(args):
+            rows = dao.streamAllRoom(
+                stream_config["fetch_size"], page["filters"], page["after"]
+            )
+            return streamJSONArray(rows, self.mapToDict)
+
+        result = []
+        if isWholeTable(page):
+            temp = dao.getAllRoom()
+        else:
+            temp = dao.getRoomPage(page["filters"], page["after"])
         for item in temp:
             result.append(self.mapToDict(item))
         return jsonify(result)
@@ -69,6 +93,16 @@ class RoomHandler:
         else:
             return jsonify(InsertStatus="Duplicate Room"), 400
 
+    def insertRoomBulk(self, rooms_json):
+        return bulkInsert(
+            rooms_json,
+            validate_room_batch,
+            lambda rows: RoomDAO().insertRooms(
+                [(row["building"], row["room_number"], row["capacity"]) for row in rows]
+            ),
+            self.mapToDict,
+        )
+
     def deleteRoomByRid(self, rid):
         dao = RoomDAO()
         result = dao.deleteRoomByRid(rid)
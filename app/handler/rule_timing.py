@@ -0,0 +1,189 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+
+# Per-rule instrumentation of the validation pipeline, used by the API and
+# by the ETL (ETL/transform_data.py). A function decorated with @rule_run
+# opens a run (clean_data, validate_section, ...); every @timed_rule called
+# inside it records its wall time, rows in and out and, with
+# RULE_TIMING_MEMORY=1, the traced memory delta and peak. Finished runs are
+# logged as one JSON line and handed to the run listeners: the API keeps
+# them on flask.g for the Server-Timing header (app.py), the ETL prints them.
+settings = {
+    "enabled": os.environ.get("RULE_TIMING", "1") != "0",
+    "memory": os.environ.get("RULE_TIMING_MEMORY", "0") == "1",
+}
+
+logger = logging.getLogger("rule_timing")
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+_current_run = contextvars.ContextVar("rule_run", default=None)
+
+# Called with every finished RuleRun
+_listeners = []
+
+# rule -> [calls, seconds] since the process started, for /segmentation_fault/metrics
+_totals = {}
+_totals_lock = threading.Lock()
+
+
+def configure(enabled=None, memory=None):
+    if enabled is not None:
+        settings["enabled"] = enabled
+    if memory is not None:
+        settings["memory"] = memory
+
+
+def add_run_listener(listener):
+    _listeners.append(listener)
+
+
+def count_rows(value):
+    # Rows of the DataFrames in value: a DataFrame, a dict or a tuple of them
+    if isinstance(value, pd.DataFrame):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(count_rows(item) for item in value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(count_rows(item) for item in value)
+    return 0
+
+
+class RuleRun:
+    def __init__(self, name):
+        self.name = name
+        self.rules = []
+        self.seconds = 0.0
+        self.depth = 0
+
+    def record(self, rule, seconds, rows_in, rows_out, memory_delta, memory_peak):
+        self.rules.append(
+            {
+                "rule": rule,
+                "seconds": round(seconds, 6),
+                "rows_in": rows_in,
+                "rows_out": rows_out,
+                "memory_delta": memory_delta,
+                "memory_peak": memory_peak,
+            }
+        )
+        with _totals_lock:
+            totals = _totals.setdefault(rule, [0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+
+    def to_dict(self):
+        return {"run": self.name, "seconds": round(self.seconds, 6), "rules": self.rules}
+
+    def print_report(self):
+        print(f"{'rule':<36}{'seconds':>10}{'rows in':>10}{'rows out':>10}{'memory':>12}")
+        for rule in self.rules:
+            memory = "" if rule["memory_delta"] is None else f"{rule['memory_delta'] / 1e6:+.1f}MB"
+            print(
+                f"{rule['rule']:<36}{rule['seconds']:>10.3f}"
+                f"{rule['rows_in']:>10}{rule['rows_out']:>10}{memory:>12}"
+            )
+        print(f"{self.name:<36}{self.seconds:>10.3f}")
+
+
+def timed_rule(function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        run = _current_run.get()
+        # Rules called by another rule count towards the outer one
+        if run is None or run.depth > 0:
+            return function(*args, **kwargs)
+
+        rows_in = count_rows(args)
+        memory = settings["memory"] and tracemalloc.is_tracing()
+        if memory:
+            memory_before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        run.depth += 1
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            run.depth -= 1
+        seconds = time.perf_counter() - start
+
+        memory_delta = memory_peak = None
+        if memory:
+            current, peak = tracemalloc.get_traced_memory()
+            memory_delta = current - memory_before
+            memory_peak = peak - memory_before
+        run.record(function.__name__, seconds, rows_in, count_rows(result), memory_delta, memory_peak)
+        return result
+
+    return wrapper
+
+
+def rule_run(function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        # Disabled, or already inside a run: the rules join the outer run
+        if not settings["enabled"] or _current_run.get() is not None:
+            return function(*args, **kwargs)
+
+        run = RuleRun(function.__name__)
+        token = _current_run.set(run)
+        # tracemalloc is process wide: with concurrent requests the memory
+        # figures include the other threads' allocations
+        started_tracing = settings["memory"] and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            run.seconds = time.perf_counter() - start
+            if started_tracing:
+                tracemalloc.stop()
+            _current_run.reset(token)
+            logger.info(json.dumps(run.to_dict()))
+            for listener in _listeners:
+                listener(run)
+
+    return wrapper
+
+
+def serverTiming(runs):
+    # Server-Timing header value: one entry per rule, rows in the description
+    entries = []
+    for run in runs:
+        entries.append('%s;dur=%.3f' % (run.name, run.seconds * 1000))
+        for index, rule in enumerate(run.rules):
+            entries.append(
+                '%s.%s.%s;dur=%.3f;desc="rows %s->%s"'
+                % (
+                    run.name,
+                    index,
+                    rule["rule"],
+                    rule["seconds"] * 1000,
+                    rule["rows_in"],
+                    rule["rows_out"],
+                )
+            )
+    return ", ".join(entries)
+
+
+def getRuleStats():
+    with _totals_lock:
+        return {
+            rule: {"calls": calls, "seconds": round(seconds, 6)}
+            for rule, (calls, seconds) in _totals.items()
+        }
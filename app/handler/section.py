@@ -1,7 +1,18 @@
 from flask import jsonify
 import pandas as pd
+from psycopg2.errors import ExclusionViolation
+from config.app_config import page_config, stream_config, validation_config
+from handler.batch_validation import validate_section_batch
+from handler.bulk import bulkInsert
 from handler.data_validation import clean_data
-from dao.section import SectionDAO
+from handler.incremental_validation import validate_section
+from handler.pagination import isWholeTable, pageResponse, parsePageArgs
+from handler.streaming import streamJSONArray, wantsStream
+from dao.section import SECTION_FILTERS, SECTION_PAGE_KEY, SectionDAO
+from dao.section_cube import CUBE_DIMENSIONS, CUBE_METRICS
+
+# Reason given when section_room_time_excl refuses the write
+ROOM_TIME_CONFLICT = "Room already used at this time by another section"
 
 
 class SectionHandler:
@@ -35,11 +46,48 @@ class SectionHandler:
 
         return duplicate_count == 1
 
-    def getAllSection(self):
-        result = []
+    def validateSection(self, section, sid):
+        # Returns the reason the section is rejected, or None when it is valid
+        if validation_config["mode"] == "incremental":
+            return validate_section(section, sid)
+
+        # Full mode: run every rule over the whole database plus the new row
+        df_to_verify = pd.DataFrame({key: [value] for key, value in section.items()})
+        df_to_verify.insert(0, "sid", 1000)
+        df_list = clean_data(df_to_verify, "section")
+
+        df_section = []
+        for df, df_name in df_list:
+            if df_name == "section":
+                df_section = df
+
+        if len(df_section) == 0 or not self.confirmDataInDF(df_to_verify, df_section):
+            return "The section does not satisfy the data constraints"
+        return None
+
+    def getAllSection(self, args=None):
+        try:
+            page = parsePageArgs(args, SECTION_FILTERS, len(SECTION_PAGE_KEY))
+        except ValueError as e:
+            return jsonify(GetStatus=str(e)), 400
+
         dao = SectionDAO()
-        temp = dao.getAllSection()
+        if page["limit"] is not None:
+            # One extra row tells whether there is a next page
+            rows = dao.getSectionPage(page["filters"], page["after"], page["limit"] + 1)
+            return pageResponse(rows, page["limit"], lambda row: row[:1], self.mapToDict)
 
+        if wantsStream(args):
+            rows = dao.streamAllSection(
+                stream_config["fetch_size"], page["filters"], page["after"]
+            )
+            return streamJSONArray(rows, self.mapToDict)
+
+        result = []
+        if isWholeTable(page):
+            temp = dao.getAllSection()
+        else:
+            temp = dao.getSectionPage(page["filters"], page["after"])
         for row in temp:
             result.append(self.mapToDict(row))
         return jsonify(result)
@@ -93,44 +141,44 @@ class SectionHandler:
         if any(len(value.strip()) > 4 for value in [years]):
             return jsonify(UpdateStatus="Invalid years"), 400
 
-        data = {
-            "sid": 1000,
-            "roomid": [roomid],
-            "cid": [cid],
-            "mid": [mid],
-            "semester": [semester],
-            "years": [years],
-            "capacity": [capacity],
+        section = {
+            "roomid": roomid,
+            "cid": cid,
+            "mid": mid,
+            "semester": semester,
+            "years": years,
+            "capacity": capacity,
         }
-        df_to_insert = pd.DataFrame(data)
 
         dao = SectionDAO()
-        columns = ["sid", "roomid", "cid", "mid", "semester", "years", "capacity"]
-        df_section = pd.DataFrame(dao.getAllSection(), columns=columns)
-        df_section = pd.concat([df_section, df_to_insert], ignore_index=True)
-
-        not_duplicate = self.confirmDataInDF(df_to_insert, df_section)
-
-        if not not_duplicate:
+        if dao.sectionDuplicate(roomid, cid, mid, semester, years) is not None:
             return jsonify(InsertStatus="Duplicate Entry"), 400
 
-        df_list = clean_data(df_to_insert, "section")
+        error = self.validateSection(section, -1)
 
-        df_section = []
-        for df, df_name in df_list:
-            if df_name == "section":
-                df_section = df
-
-        is_data_confirmed = self.confirmDataInDF(df_to_insert, df_section)
-
-        if is_data_confirmed:
-            dao = SectionDAO()
-            sid = dao.insertSection(roomid, cid, mid, semester, years, capacity)
+        if error is None:
+            try:
+                sid = dao.insertSection(roomid, cid, mid, semester, years, capacity)
+            except ExclusionViolation:
+                return jsonify(InsertStatus="Invalid data", Reason=ROOM_TIME_CONFLICT), 400
             temp = (sid, roomid, cid, mid, semester, years, capacity)
 
             return self.mapToDict(temp), 201
         else:
-            return jsonify(InsertStatus="Invalid data"), 400
+            return jsonify(InsertStatus="Invalid data", Reason=error), 400
+
+    def insertSectionBulk(self, sections_json):
+        return bulkInsert(
+            sections_json,
+            validate_section_batch,
+            lambda rows: SectionDAO().insertSections(
+                [
+                    (row["roomid"], row["cid"], row["mid"], row["semester"], row["years"], row["capacity"])
+                    for row in rows
+                ]
+            ),
+            self.mapToDict,
+        )
 
     def deleteSectionBySid(self, sid):
         dao = SectionDAO()
@@ -179,47 +227,34 @@ class SectionHandler:
         if any(len(value.strip()) > 4 for value in [years]):
             return jsonify(UpdateStatus="Invalid years"), 400
 
-        data = {
-            "sid": 1000,
-            "roomid": [roomid],
-            "cid": [cid],
-            "mid": [mid],
-            "semester": [semester],
-            "years": [years],
-            "capacity": [capacity],
+        section = {
+            "roomid": roomid,
+            "cid": cid,
+            "mid": mid,
+            "semester": semester,
+            "years": years,
+            "capacity": capacity,
         }
-        df_to_update = pd.DataFrame(data)
 
         dao = SectionDAO()
-        columns = ["sid", "roomid", "cid", "mid", "semester", "years", "capacity"]
-        df_section = pd.DataFrame(dao.getAllSection(), columns=columns)
         # Exclude the current section from the duplicate check
-        df_section = df_section[df_section["sid"] != sid]
-
-        df_section = pd.concat([df_section, df_to_update], ignore_index=True)
-
-        not_duplicate = self.confirmDataInDF(df_to_update, df_section)
-
-        if not not_duplicate:
+        if dao.sectionDuplicate(roomid, cid, mid, semester, years, sid) is not None:
             return jsonify(InsertStatus="Duplicate Entry"), 400
 
-        df_list = clean_data(df_to_update, "section")
-
-        df_section = []
-        for df, df_name in df_list:
-            if df_name == "section":
-                df_section = df
-
-        is_data_confirmed = self.confirmDataInDF(df_to_update, df_section)
+        error = self.validateSection(section, sid)
 
-        if is_data_confirmed:
-            if dao.updateSectionBySid(sid, roomid, cid, mid, semester, years, capacity):
+        if error is None:
+            try:
+                updated = dao.updateSectionBySid(sid, roomid, cid, mid, semester, years, capacity)
+            except ExclusionViolation:
+                return jsonify(UpdateStatus="Invalid data", Reason=ROOM_TIME_CONFLICT), 400
+            if updated:
                 return jsonify(UpdateStatus="OK"), 200
             else:
                 return jsonify(UpdateStatus="NOT FOUND"), 404
 
         else:
-            return jsonify(UpdateStatus="Invalid data"), 400
+            return jsonify(UpdateStatus="Invalid data", Reason=error), 400
 
     def getSectionPerYear(self):
         result = []
@@ -232,3 +267,39 @@ class SectionHandler:
             return jsonify(result) 
         else:
             return jsonify(Error="NOT FOUND"), 404
+
+    def getSectionAnalytics(self, args):
+        # Top k groups of sections: ?group=building,semester&metric=ratio&k=3&order=desc,
+        # optionally restricted with <dimension>=<value> (?year=2024&building=Stefani)
+        group = [name.strip() for name in args.get("group", "").split(",") if name.strip()]
+        for name in group:
+            if name not in CUBE_DIMENSIONS:
+                return jsonify(GetStatus="Invalid group %s, expected one of %s" % (name, ", ".join(CUBE_DIMENSIONS))), 400
+        if len(set(group)) != len(group):
+            return jsonify(GetStatus="Repeated group dimension"), 400
+
+        metric = args.get("metric", "count")
+        if metric not in CUBE_METRICS:
+            return jsonify(GetStatus="Invalid metric, expected one of %s" % ", ".join(CUBE_METRICS)), 400
+
+        order = args.get("order", "desc")
+        if order not in ["asc", "desc"]:
+            return jsonify(GetStatus="Invalid order, expected asc or desc"), 400
+
+        try:
+            k = int(args.get("k", 5))
+        except ValueError:
+            return jsonify(GetStatus="Invalid k"), 400
+        if k < 1 or k > page_config["max_limit"]:
+            return jsonify(GetStatus="k must be between 1 and %s" % page_config["max_limit"]), 400
+
+        filters = {}
+        for name, (_, kind) in CUBE_DIMENSIONS.items():
+            if name in args:
+                try:
+                    filters[name] = kind(args[name])
+                except ValueError:
+                    return jsonify(GetStatus="Invalid value for %s" % name), 400
+
+        cube = SectionDAO().getSectionCube()
+        return jsonify(cube.topK(group, metric, k, order == "asc", filters))
@@ -0,0 +1,33 @@
+from flask import make_response
+
+from config.app_config import statistics_config
+from dao.statistics import (
+    getStatisticsState,
+    refreshStatistics,
+    scheduleStatisticsRefresh,
+)
+
+
+def statisticsResponse(handle, live=False):
+    # Runs a statistics handler and reports how fresh its data is in the
+    # X-Statistics-Stale / X-Statistics-Refreshed-At headers. live routes read
+    # the tables directly and are never stale.
+    if live:
+        response = make_response(handle())
+        response.headers["X-Statistics-Stale"] = "false"
+        return response
+
+    # Read the state before the views so a refresh in between is reported stale
+    stale, refreshed_at = getStatisticsState()
+    if stale:
+        if statistics_config["refresh"] == "read":
+            if refreshStatistics():
+                stale, refreshed_at = getStatisticsState()
+        else:
+            # A write from another process, or a refresh that failed
+            scheduleStatisticsRefresh()
+
+    response = make_response(handle())
+    response.headers["X-Statistics-Stale"] = "true" if stale else "false"
+    response.headers["X-Statistics-Refreshed-At"] = refreshed_at.isoformat()
+    return response
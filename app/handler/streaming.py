@@ -0,0 +1,32 @@
+from flask import Response, current_app, stream_with_context
+
+from config.app_config import stream_config
+
+
+def wantsStream(args):
+    # ?stream=true|false overrides the configured default
+    if args is None or "stream" not in args:
+        return stream_config["default"]
+    return str(args.get("stream")).lower() in ["1", "true", "yes"]
+
+
+def streamJSONArray(rows, mapToDict):
+    # Encode the rows as a JSON array while they are read, one batch of rows
+    # per chunk, so nothing holds the whole result in memory
+    batch_size = stream_config["fetch_size"]
+
+    def generate():
+        yield "["
+        batch = []
+        first = True
+        for row in rows:
+            batch.append(current_app.json.dumps(mapToDict(row)))
+            if len(batch) >= batch_size:
+                yield ("" if first else ",") + ",".join(batch)
+                first = False
+                batch = []
+        if batch:
+            yield ("" if first else ",") + ",".join(batch)
+        yield "]"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
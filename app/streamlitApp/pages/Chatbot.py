@@ -8,7 +8,7 @@ sys.path.append(
     os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
 )
 
-from app.vectorDB.chatBot.chat import chatbot
+from app.vectorDB.chatBot.chat import chatbot, embeddingStats, warmUpEmbeddings
 
 st.set_page_config(
     page_title="Segmentation Fault Chat",
@@ -19,6 +19,21 @@ st.set_page_config(
 
 st.title("Segmentation Fault Chat")
 
+
+# Once per server process: the model stays loaded across reruns and sessions
+@st.cache_resource(show_spinner="Loading the embedding model...")
+def loadEmbeddings():
+    return warmUpEmbeddings()
+
+
+loadEmbeddings()
+stats = embeddingStats()
+if stats["loaded"]:
+    st.sidebar.caption(
+        f"Embedding model loaded in {stats['load_seconds']}s, "
+        f"last encode {stats['last_ms']} ms (mean {stats['mean_ms']} ms over {stats['calls']} calls)"
+    )
+
 # Initialize chat history
 if "messages" not in st.session_state:
     st.session_state.messages = []
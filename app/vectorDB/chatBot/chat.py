@@ -1,6 +1,5 @@
 import sys
 import os
-import numpy as np
 import re
 import json
 
@@ -9,12 +8,28 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".
 
 from dao.syllabus import SyllabusDAO
 from dao.course import ClassDAO
-from vectorDB.chatBot.embedding import embeddingClass
+from dao.pool import releaseConnection
+from dao.syllabus_index import getSyllabusIndex
+from dao.vector import Vector
+from config.app_config import embedding_config, retrieval_config
+from vectorDB.chatBot.embedding import getEmbeddingService
 from langchain_ollama import ChatOllama
 from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
 
+def warmUpEmbeddings():
+    # Load the embedding model before the first question (EMBEDDING_WARMUP)
+    if embedding_config["warmup"]:
+        return getEmbeddingService().warmUp()
+    return getEmbeddingService().getStats()
+
+
+def embeddingStats():
+    # Load time and encode latencies of the shared model
+    return getEmbeddingService().getStats()
+
+
 def chatbot(question, memory):
     if memory:
         memory = json.loads(memory)
@@ -57,31 +72,31 @@ def chatbot(question, memory):
         )[0]
         # print(expected_course_id)
 
-    # Embedding of the first question
-    emb = embeddingClass()
-    emtText = emb.embed(question)
-
-    # Ensure the dimensions match
-    def normalizer(vector):
-        vector = np.array(vector)
-        padded_vector = np.pad(
-            vector, pad_width=(0, 500 - len(vector)), mode="constant"
-        )
-        return padded_vector
-
-    # Get all fragments
-    dao = SyllabusDAO()
-    if expected_course_id:
-        fragments = dao.getAllFragments(
-            str(normalizer(emtText).tolist()), expected_course_id
-        )
-    # Manage multiple coursesids
-    elif expected_course_ids:
-        fragments = dao.getAllFragments3(
-            str(normalizer(emtText).tolist()), expected_course_ids
-        )
+    # Embedding of the first question, with the model shared by every session
+    emtText = getEmbeddingService().embed(question)
+
+    # Get all fragments, the question's vector at the model's own dimension
+    if retrieval_config["backend"] == "local":
+        # Same limits as the pgvector queries below
+        index = getSyllabusIndex(lambda: SyllabusDAO().getEmbeddings())
+        if expected_course_id:
+            fragments = index.search(emtText, 6, [expected_course_id])
+        elif expected_course_ids:
+            fragments = index.search(emtText, 15, expected_course_ids)
+        else:
+            fragments = index.search(emtText, 10)
     else:
-        fragments = dao.getAllFragments2(str(normalizer(emtText).tolist()))
+        dao = SyllabusDAO()
+        if expected_course_id:
+            fragments = dao.getAllFragments(Vector(emtText), expected_course_id)
+        # Manage multiple coursesids
+        elif expected_course_ids:
+            fragments = dao.getAllFragments3(Vector(emtText), expected_course_ids)
+        else:
+            fragments = dao.getAllFragments2(Vector(emtText))
+
+    # The database work is done, free the connection before calling the LLM
+    releaseConnection()
 
     context = []
 
@@ -1,14 +1,205 @@
-from sentence_transformers import SentenceTransformer
+import logging
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+
+from config.app_config import embedding_config
+
+logger = logging.getLogger("embedding")
+
+
+class EmbeddingService:
+    # One SentenceTransformer per process, loaded on first use and shared by
+    # every caller (chat sessions, the syllabus loader)
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.model = None
+        self._load_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "load_seconds": None,
+            "calls": 0,
+            "sentences": 0,
+            "encode_seconds": 0.0,
+            "last_ms": None,
+            "max_ms": None,
+        }
+
+    def getModel(self):
+        if self.model is None:
+            with self._load_lock:
+                if self.model is None:
+                    # Imported here: torch alone takes seconds to import
+                    from sentence_transformers import SentenceTransformer
+
+                    start = time.perf_counter()
+                    model = SentenceTransformer(self.model_name)
+                    self._stats["load_seconds"] = round(time.perf_counter() - start, 3)
+                    logger.info(
+                        "Loaded %s in %.3fs", self.model_name, self._stats["load_seconds"]
+                    )
+                    self.model = model
+        return self.model
+
+    def warmUp(self):
+        # Load the model and run one encode, so the first question pays neither
+        self.embed("warm up")
+        return self.getStats()
+
+    def _record(self, sentences, milliseconds):
+        with self._stats_lock:
+            self._stats["calls"] += 1
+            self._stats["sentences"] += sentences
+            self._stats["encode_seconds"] += milliseconds / 1000
+            self._stats["last_ms"] = round(milliseconds, 3)
+            self._stats["max_ms"] = round(max(self._stats["max_ms"] or 0, milliseconds), 3)
+        logger.debug("Encoded %d sentence(s) in %.3fms", sentences, milliseconds)
+
+    def embed(self, sentence):
+        model = self.getModel()
+        start = time.perf_counter()
+        vector = model.encode(sentence)
+        self._record(1, (time.perf_counter() - start) * 1000)
+        return vector
+
+    def embedBatch(self, sentences, batch_size=32):
+        # One encode call for the whole list, batch_size sentences per forward pass
+        model = self.getModel()
+        start = time.perf_counter()
+        vectors = model.encode(list(sentences), batch_size=batch_size)
+        self._record(len(sentences), (time.perf_counter() - start) * 1000)
+        return vectors
+
+    def similarity(self, emb1, emb2):
+        return self.getModel().similarity(emb1, emb2)
+
+    def dimension(self):
+        # Length of the vectors the model produces
+        return self.getModel().get_sentence_embedding_dimension()
+
+    def getStats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["model"] = self.model_name
+        stats["loaded"] = self.model is not None
+        stats["encode_seconds"] = round(stats["encode_seconds"], 6)
+        stats["mean_ms"] = (
+            round(stats["encode_seconds"] * 1000 / stats["calls"], 3) if stats["calls"] else None
+        )
+        return stats
+
+
+class EmbeddingClient:
+    # Same interface as EmbeddingService, answered by embedding_server.py over
+    # a Unix socket. While the worker is down the calls go to a local model,
+    # and the worker is tried again every embedding_config["retry"] seconds.
+    def __init__(self, socket_path, authkey):
+        self.socket_path = socket_path
+        self.authkey = authkey.encode("utf-8")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._fallback = None
+        self._retry_at = 0
+
+    def _worker(self, request):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = Client(
+                self.socket_path, family="AF_UNIX", authkey=self.authkey
+            )
+        conn.send(request)
+        return conn.recv()
+
+    def _dropConnection(self):
+        # Close this thread's connection to a worker that went away
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def _call(self, *request):
+        fallback = self._fallback
+        if fallback is None or time.monotonic() >= self._retry_at:
+            try:
+                status, value = self._worker(request)
+            except (OSError, EOFError, AuthenticationError) as e:
+                self._dropConnection()
+                with self._lock:
+                    self._retry_at = time.monotonic() + embedding_config["retry"]
+                    if self._fallback is None:
+                        logger.warning(
+                            "Embedding worker at %s unavailable (%s), loading the model here",
+                            self.socket_path,
+                            e,
+                        )
+                        self._fallback = EmbeddingService(embedding_config["model"])
+                    fallback = self._fallback
+            else:
+                if fallback is not None:
+                    with self._lock:
+                        if self._fallback is not None:
+                            logger.info("Embedding worker at %s is back", self.socket_path)
+                            # Threads still encoding with it keep their reference
+                            self._fallback = None
+                if status == "error":
+                    raise RuntimeError(value)
+                return value
+        return getattr(fallback, request[0])(*request[1:])
+
+    def warmUp(self):
+        return self._call("warmUp")
+
+    def embed(self, sentence):
+        return self._call("embed", sentence)
+
+    def embedBatch(self, sentences, batch_size=32):
+        return self._call("embedBatch", list(sentences), batch_size)
+
+    def similarity(self, emb1, emb2):
+        return self._call("similarity", emb1, emb2)
+
+    def dimension(self):
+        return self._call("dimension")
+
+    def getStats(self):
+        stats = self._call("getStats")
+        stats["socket"] = None if self._fallback is not None else self.socket_path
+        return stats
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def getEmbeddingService():
+    # Process-wide: the local model, or a client of the shared worker when
+    # EMBEDDING_SOCKET is set
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                if embedding_config["socket"] and embedding_config["authkey"]:
+                    _service = EmbeddingClient(embedding_config["socket"], embedding_config["authkey"])
+                elif embedding_config["socket"]:
+                    logger.warning("EMBEDDING_SOCKET is set without EMBEDDING_AUTHKEY, loading the model here")
+                    _service = EmbeddingService(embedding_config["model"])
+                else:
+                    _service = EmbeddingService(embedding_config["model"])
+    return _service
+
 
 class embeddingClass:
-   def __init__(self):
-     self.model = SentenceTransformer('all-MiniLM-L6-v2')
-     
-   def embed(self, sentence):
-        return self.model.encode(sentence)
-   
-   def similarity(self, emb1, emb2):
-        return self.model.similarity(emb1, emb2)
-
-        
-        
+    # Kept for the callers that build one per use; every instance shares the
+    # process-wide service instead of loading its own model
+    def __init__(self):
+        self.service = getEmbeddingService()
+
+    def embed(self, sentence):
+        return self.service.embed(sentence)
+
+    def similarity(self, emb1, emb2):
+        return self.service.similarity(emb1, emb2)
@@ -0,0 +1,77 @@
+import argparse
+import logging
+import os
+import sys
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from config.app_config import embedding_config
+from vectorDB.chatBot.embedding import EmbeddingService
+
+# Shared embedding worker: loads the model once and answers every process
+# started with EMBEDDING_SOCKET pointing at its socket.
+#
+#   EMBEDDING_AUTHKEY=... python app/vectorDB/chatBot/embedding_server.py --socket /tmp/embedding.sock
+#   EMBEDDING_AUTHKEY=... EMBEDDING_SOCKET=/tmp/embedding.sock streamlit run app/streamlitApp/main.py
+
+METHODS = ("warmUp", "embed", "embedBatch", "similarity", "dimension", "getStats")
+
+
+def serve(conn, service):
+    # One thread per client connection, requests are (method, *args)
+    with conn:
+        while True:
+            try:
+                method, *args = conn.recv()
+            except EOFError:
+                return
+            try:
+                if method not in METHODS:
+                    raise ValueError("Unknown method %s" % method)
+                conn.send(("ok", getattr(service, method)(*args)))
+            except Exception as e:
+                conn.send(("error", "%s: %s" % (type(e).__name__, e)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve sentence embeddings over a Unix socket")
+    parser.add_argument("--socket", default=embedding_config["socket"] or "/tmp/embedding.sock")
+    parser.add_argument("--model", default=embedding_config["model"])
+    args = parser.parse_args()
+    # Requests are unpickled, so only clients that know the key may connect
+    if not embedding_config["authkey"]:
+        raise SystemExit("Set EMBEDDING_AUTHKEY, the secret shared with the worker's clients")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    service = EmbeddingService(args.model)
+    print(service.warmUp())
+
+    # A socket left behind by a previous worker would make the bind fail
+    if os.path.exists(args.socket):
+        os.remove(args.socket)
+    # Owner only from the moment the socket exists
+    umask = os.umask(0o177)
+    try:
+        listener = Listener(
+            args.socket, family="AF_UNIX", authkey=embedding_config["authkey"].encode("utf-8")
+        )
+    finally:
+        os.umask(umask)
+    os.chmod(args.socket, 0o600)
+    with listener:
+        print("Serving %s on %s" % (args.model, args.socket))
+        while True:
+            try:
+                conn = listener.accept()
+            except (AuthenticationError, EOFError, ConnectionError) as e:
+                # A wrong key, or a client gone during the handshake
+                print("Refused a client: %s" % e)
+                continue
+            threading.Thread(target=serve, args=(conn, service), daemon=True).start()
+
+
+if __name__ == "__main__":
+    main()
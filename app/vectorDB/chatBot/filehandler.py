@@ -1,16 +1,20 @@
 import sys
 import os
-import numpy as np
-import gc
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import argparse
+import hashlib
+import time
+from collections import Counter
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
+from config.app_config import retrieval_config
 from dao.course import ClassDAO
 from dao.syllabus import SyllabusDAO
+from dao.syllabus_index import rebuildSyllabusIndex
+from dao.vector import Vector
 from tokenize_class import Tokenize
-from embedding import embeddingClass
-from extract import Extract
+from embedding import getEmbeddingService
+from extract import pdf_text_extractor
 
 # Use a relative path for the syllabus directory
 input_directory = os.path.abspath(
@@ -20,62 +24,203 @@ output_directory = os.path.abspath(
     os.path.join(os.path.dirname(__file__), "../../../extracted_syllabuses")
 )
 
-# Extract the Syllabus pdf into .txt files
-extract_pdf = Extract()
-extract_pdf.extract_directory(input_directory, output_directory)
+# Chunks encoded together by the model
+DEFAULT_BATCH_SIZE = 64
 
-# Initialize the DAOs and folder path
-syllabusDao = SyllabusDAO()
-tokenize = Tokenize()
-emb = embeddingClass()
-class_Dao = ClassDAO()
-folder_path = output_directory
 
+def content_hash(content):
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
 
-def normalizer(vector):
-    vector = np.array(vector)
-    padded_vector = np.pad(vector, pad_width=(0, 500 - len(vector)), mode="constant")
-    return padded_vector
 
+def file_hash(path):
+    with open(path, "rb") as file:
+        return content_hash(file.read())
 
-def process_file(f):
-    file_path = os.path.join(folder_path, f)
-    with open(file_path, "r") as file:
+
+def list_sources(skip_extract):
+    # (source, pdf path or None) of every syllabus; the source is the file
+    # name without extension, shared by the PDF and its extracted text
+    if skip_extract:
+        names = [f for f in os.listdir(output_directory) if f.endswith(".txt")]
+        return [(os.path.splitext(f)[0], None) for f in sorted(names)]
+    names = [f for f in os.listdir(input_directory) if f.endswith(".pdf")]
+    return [(os.path.splitext(f)[0], os.path.join(input_directory, f)) for f in sorted(names)]
+
+
+def plan_source(source, pdf_path, syllabusDao, class_Dao, tokenize, stats):
+    # What has to change in syllabus for one file, None when nothing does:
+    # (source, courseid, pdf_hash, text_hash, chunkids to delete,
+    #  [(text to embed, chunk to store, chunk_hash)] to insert)
+    course_tags = source.split("-")
+    course = class_Dao.getClassByCname_Ccode(course_tags[0], course_tags[1])
+    if course is None:
+        print(f"File {source} skipped: no class {course_tags[0]} {course_tags[1]}")
+        return None
+    manifest = syllabusDao.getSource(source)
+
+    pdf_hash = None
+    if pdf_path is not None:
+        pdf_hash = file_hash(pdf_path)
+        if manifest is not None and manifest[2] == pdf_hash:
+            stats["unchanged"] += 1
+            return None
+        pdf_text_extractor(pdf_path, output_directory)
+
+    with open(os.path.join(output_directory, source + ".txt"), "r") as file:
         text = file.read()
-        text = tokenize.tokenize_text(text, f)
-
-        for actual_chunk in text:
-            embText = normalizer(emb.embed(actual_chunk)).tolist()
-            # Insert syllabus into the database
-            course_tags = f.split("-")
-            cid = class_Dao.getClassByCname_Ccode(course_tags[0], course_tags[1])[0]
-            chunk_with_tag = (
-                f"From {course_tags[0]} {course_tags[1]} Syllabus:\n{actual_chunk}"
+    text_hash = content_hash(text)
+    if manifest is not None and manifest[3] == text_hash and manifest[1] == course[0]:
+        # A new PDF with the same text, e.g. re-exported
+        if pdf_hash is not None:
+            syllabusDao.updateSourceHashes(source, pdf_hash, text_hash)
+        stats["unchanged"] += 1
+        return None
+
+    chunks = []
+    for actual_chunk in tokenize.tokenize_text(text, source + ".txt"):
+        chunk_with_tag = (
+            f"From {course_tags[0]} {course_tags[1]} Syllabus:\n{actual_chunk}"
+        )
+        chunks.append((actual_chunk, chunk_with_tag, content_hash(chunk_with_tag)))
+
+    # Keep the stored chunks whose hash is still in the file, once per copy
+    wanted = Counter(chunk_hash for _, _, chunk_hash in chunks)
+    removed = []
+    for chunkid, chunk_hash in syllabusDao.getChunkHashes(source, course[0]):
+        if wanted[chunk_hash] > 0:
+            wanted[chunk_hash] -= 1
+        else:
+            removed.append(chunkid)
+    added = []
+    for chunk in chunks:
+        if wanted[chunk[2]] > 0:
+            wanted[chunk[2]] -= 1
+            added.append(chunk)
+
+    stats["changed"] += 1
+    stats["kept"] += len(chunks) - len(added)
+    stats["removed"] += len(removed)
+    return source, course[0], pdf_hash, text_hash, removed, added
+
+
+def migrate_dimension(syllabusDao, emb):
+    # Retype the column for the configured model; everything is re-embedded
+    column = syllabusDao.getEmbeddingDimension()
+    if column == emb.dimension():
+        return False
+    syllabusDao.setEmbeddingDimension(emb.dimension())
+    print(f"syllabus.embedding_text changed from {column} to {emb.dimension()} dimensions, chunks cleared")
+    return True
+
+
+def ingest(skip_extract=False, batch_size=DEFAULT_BATCH_SIZE, prune=False, migrate=False):
+    # Re-embed only the chunks of the syllabuses that changed since the last
+    # run. Each file is written in its own transaction once all its new chunks
+    # are encoded; the encoding is batched across files.
+    syllabusDao = SyllabusDAO()
+    class_Dao = ClassDAO()
+    tokenize = Tokenize()
+    stats = Counter()
+
+    emb = getEmbeddingService()
+    migrated = migrate and migrate_dimension(syllabusDao, emb)
+
+    sources = list_sources(skip_extract)
+    plans = []
+    for source, pdf_path in sources:
+        plan = plan_source(source, pdf_path, syllabusDao, class_Dao, tokenize, stats)
+        if plan is not None:
+            plans.append(plan)
+
+    if prune:
+        present = {source for source, _ in sources}
+        for source in syllabusDao.getSources():
+            if source not in present:
+                syllabusDao.deleteSource(source)
+                stats["pruned"] += 1
+
+    # (plan index, text to embed) of every new chunk
+    queue = [(index, added[0]) for index, plan in enumerate(plans) for added in plan[5]]
+    vectors = [[] for _ in plans]
+    written = 0
+
+    def flush():
+        # Write, in order, the files whose new chunks are all encoded
+        nonlocal written
+        while written < len(plans) and len(vectors[written]) == len(plans[written][5]):
+            source, courseid, pdf_hash, text_hash, removed, added = plans[written]
+            syllabusDao.replaceSourceChunks(
+                source,
+                courseid,
+                pdf_hash,
+                text_hash,
+                removed,
+                [(vector, chunk, chunk_hash) for vector, (_, chunk, chunk_hash) in zip(vectors[written], added)],
             )
-            syllabusDao.insertSyllabus(cid, embText, chunk_with_tag)
-            del embText
-            del actual_chunk
-            del chunk_with_tag
-            del cid
-            gc.collect()
-
-    return f
-
-
-# Iterate over the extracted syllabus files (.txt) using multithreading
-folder = os.listdir(folder_path)
-count = 0
-
-with ThreadPoolExecutor() as executor:
-    futures = {executor.submit(process_file, f): f for f in folder}
-    for future in as_completed(futures):
-        count += 1
-        f = futures[future]
-        try:
-            result = future.result()
-            print("File: " "%s/%s" % (count, len(folder)))
-            print(f"\033[34m{result} chunks insertion:\033[92m done \n\033[0m")
-        except Exception as e:
-            print(f"File {f} generated an exception: {e}")
-
-folder.clear()
+            print(f"\033[34m{source}:\033[92m {len(added)} chunks added, {len(removed)} removed\033[0m")
+            vectors[written] = None
+            written += 1
+
+    if queue:
+        # Load the model first so its load time is not counted as encoding
+        print(f"Embedding model ready: {emb.warmUp()['load_seconds']}s to load")
+        # The vectors are stored at the model's dimension, no padding
+        column = syllabusDao.getEmbeddingDimension()
+        if column is not None and column != emb.dimension():
+            raise SystemExit(
+                f"syllabus.embedding_text holds {column} dimensions but the model "
+                f"produces {emb.dimension()}; rerun with --migrate-dimension to retype it"
+            )
+    start = time.perf_counter()
+    flush()
+    for position in range(0, len(queue), batch_size):
+        batch = queue[position:position + batch_size]
+        encoded = emb.embedBatch([text for _, text in batch], batch_size)
+        for (index, _), vector in zip(batch, encoded):
+            vectors[index].append(Vector(vector))
+        flush()
+    seconds = time.perf_counter() - start
+
+    print(
+        f"{len(sources)} syllabuses: {stats['unchanged']} unchanged, {stats['changed']} changed, "
+        f"{stats['pruned']} pruned; chunks: {stats['kept']} kept, {len(queue)} added, "
+        f"{stats['removed']} removed"
+    )
+    if queue:
+        print(f"{len(queue)} chunks embedded and written in {seconds:.1f}s: {len(queue) / seconds:.1f} chunks/s")
+    return stats["changed"] + stats["pruned"] + migrated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embed the syllabuses into the syllabus table")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument(
+        "--skip-extract", action="store_true", help="reuse the .txt files already extracted"
+    )
+    parser.add_argument(
+        "--prune", action="store_true", help="delete the chunks of syllabuses no longer present"
+    )
+    parser.add_argument(
+        "--rebuild-index",
+        action="store_true",
+        help="rebuild the local retrieval index even when no syllabus changed",
+    )
+    parser.add_argument(
+        "--migrate-dimension",
+        action="store_true",
+        help="retype syllabus.embedding_text to the model's dimension and re-embed every syllabus",
+    )
+    args = parser.parse_args()
+
+    changed = ingest(args.skip_extract, args.batch_size, args.prune, args.migrate_dimension)
+
+    # The chatbot's local index is a copy of the syllabus table
+    if args.rebuild_index or (changed and retrieval_config["backend"] == "local"):
+        manifest = rebuildSyllabusIndex(lambda: SyllabusDAO().getEmbeddings())
+        print(f"Retrieval index rebuilt: {manifest['count']} chunks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""Replay the Postman collection against the API and report throughput and
+p50/p95/p99 latency per route.
+
+    PGHOST=localhost PGDATABASE=rumad PGUSER=postgres PGPASSWORD=postgres \\
+        python benchmarks/endpoint_benchmark.py --seed --scale 10 --concurrency 8 \\
+        --output benchmarks/results/run.json --baseline benchmarks/results/baseline.json
+
+Without --url the app is served in process (Flask test client, one per
+thread) against the database named by the PG* variables; with --url the
+requests go to a running server. --seed reloads that database from data/
+(or --data, e.g. a folder made by synthetic_data.py) with the ETL first and
+--scale N copies every section N - 1 times into later years, so the dataset
+grows without new room/time conflicts.
+"""
+import argparse
+import datetime
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+COLLECTION = os.path.join(ROOT, "Collection", "Segmentation Fault Routes.postman_collection.json")
+PREFIX = "/segmentation_fault"
+
+# Years added to the copies made by --scale, per copy
+SCALE_YEAR_STEP = 100
+
+
+def load_collection(path):
+    # (folder, name, method, path, body) for every request of the collection
+    with open(path) as file:
+        collection = json.load(file)
+
+    requests = []
+
+    def walk(items, folder):
+        for item in items:
+            if "item" in item:
+                walk(item["item"], item["name"])
+                continue
+            request = item["request"]
+            url = request["url"]["raw"] if isinstance(request["url"], dict) else request["url"]
+            path = url[url.index(PREFIX):]
+            body = (request.get("body") or {}).get("raw") or None
+            requests.append((folder, item["name"], request["method"], path, body))
+
+    walk(collection["item"], None)
+    return requests
+
+
+def is_read_only(method, body):
+    # GETs and the statistics routes (POSTs without a body) leave the data as it is
+    return method == "GET" or (method == "POST" and body is None)
+
+
+def seed_database(scale, data=None):
+    # Full reload from data/ (or a synthetic_data.py folder), the same as a deploy
+    command = [sys.executable, os.path.join("ETL", "main.py")]
+    if data:
+        command += ["--data", os.path.abspath(data)]
+    subprocess.run(command, cwd=ROOT, check=True)
+    if scale <= 1:
+        return
+
+    import psycopg2
+
+    # Connection parameters come from the PG* variables, as for the app
+    conn = psycopg2.connect("")
+    with conn, conn.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO "section" ("roomid", "cid", "mid", "semester", "years", "capacity")
+            SELECT s."roomid", s."cid", s."mid", s."semester",
+                   (s."years"::int + %s * copy)::text, s."capacity"
+            FROM "section" AS s, generate_series(1, %s) AS copy
+            WHERE s."years" ~ '^[0-9]{4}$';
+            """,
+            (SCALE_YEAR_STEP, scale - 1),
+        )
+        print(f"{cursor.rowcount} sections added for --scale {scale}")
+        cursor.execute("SELECT matviewname FROM pg_matviews WHERE matviewname LIKE 'stats\\_%';")
+        for (view,) in cursor.fetchall():
+            cursor.execute('REFRESH MATERIALIZED VIEW "%s";' % view)
+        cursor.execute('DELETE FROM "statistics_changes";')
+        cursor.execute('UPDATE "statistics_state" SET "refreshed_at" = now() WHERE "id" = 1;')
+    conn.autocommit = True
+    conn.cursor().execute("ANALYZE;")
+    conn.close()
+
+
+class InProcessClient:
+    def __init__(self):
+        sys.path.insert(0, os.path.join(ROOT, "app"))
+        from app import app
+
+        self.app = app
+        self.local = threading.local()
+
+    def request(self, method, path, body):
+        client = getattr(self.local, "client", None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.open(
+            path, method=method, data=body, content_type="application/json" if body else None
+        )
+        response.get_data()
+        return response.status_code
+
+
+class HttpClient:
+    def __init__(self, url):
+        import requests
+
+        self.requests = requests
+        self.url = url.rstrip("/")
+        self.local = threading.local()
+
+    def request(self, method, path, body):
+        session = getattr(self.local, "session", None)
+        if session is None:
+            session = self.local.session = self.requests.Session()
+        headers = {"Content-Type": "application/json"} if body else None
+        response = session.request(method, self.url + path, data=body, headers=headers)
+        return response.status_code
+
+
+def run_route(client, method, path, body, count, concurrency):
+    # count requests at the given concurrency; latencies in seconds
+    latencies = [None] * count
+    statuses = [None] * count
+
+    def one(index):
+        start = time.perf_counter()
+        try:
+            statuses[index] = client.request(method, path, body)
+        except Exception as e:
+            statuses[index] = type(e).__name__
+        latencies[index] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(count)))
+    return latencies, statuses, time.perf_counter() - start
+
+
+def summarize(latencies, statuses, seconds):
+    milliseconds = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(milliseconds, [50, 95, 99])
+    status_counts = {}
+    for status in statuses:
+        status_counts[str(status)] = status_counts.get(str(status), 0) + 1
+    return {
+        "requests": len(latencies),
+        "errors": sum(1 for status in statuses if not isinstance(status, int) or status >= 500),
+        "statuses": status_counts,
+        "throughput": round(len(latencies) / seconds, 2),
+        "mean_ms": round(float(milliseconds.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+    }
+
+
+def compare(results, baseline, tolerance):
+    # Routes whose p95 grew, or throughput fell, by more than tolerance
+    print(f"\n{'route':<52}{'p95 ms':>18}{'req/s':>20}")
+    regressions = []
+    for route, current in results["routes"].items():
+        previous = baseline["routes"].get(route)
+        if previous is None:
+            continue
+        p95_change = current["p95_ms"] / previous["p95_ms"] - 1 if previous["p95_ms"] else 0.0
+        throughput_change = (
+            current["throughput"] / previous["throughput"] - 1 if previous["throughput"] else 0.0
+        )
+        regressed = p95_change > tolerance or throughput_change < -tolerance
+        if regressed:
+            regressions.append(route)
+        print(
+            f"{route:<52}{previous['p95_ms']:>8.1f} {p95_change:+7.0%}  "
+            f"{previous['throughput']:>9.1f} {throughput_change:+7.0%}"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="base URL of a running server (default: in process)")
+    parser.add_argument("--collection", default=COLLECTION)
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--warmup", type=int, default=10, help="untimed requests per route")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--seed", action="store_true", help="reload the database from data/ first")
+    parser.add_argument("--data", help="with --seed, load this folder instead of data/")
+    parser.add_argument("--scale", type=int, default=1, help="copies of every section with --seed")
+    parser.add_argument(
+        "--writes",
+        action="store_true",
+        help="also replay the requests that change data (after the reads; "
+        "repeated deletes and inserts mostly measure their error paths)",
+    )
+    parser.add_argument("--routes", help="only the routes containing this text")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="allowed p95/throughput change (0.2 = 20%%)"
+    )
+    args = parser.parse_args()
+
+    if args.seed:
+        seed_database(args.scale, args.data)
+
+    client = HttpClient(args.url) if args.url else InProcessClient()
+
+    requests = load_collection(args.collection)
+    # Reads first: the writes would change what they measure
+    reads = [request for request in requests if is_read_only(request[2], request[4])]
+    writes = [request for request in requests if not is_read_only(request[2], request[4])]
+    selected = reads + (writes if args.writes else [])
+    if args.routes:
+        selected = [request for request in selected if args.routes in request[3]]
+
+    results = {
+        "meta": {
+            "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "target": args.url or "in-process",
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "scale": args.scale if args.seed else None,
+            "data": args.data if args.seed else None,
+            "writes": args.writes,
+        },
+        "routes": {},
+    }
+
+    print(f"{'route':<52}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for folder, name, method, path, body in selected:
+        if args.warmup:
+            run_route(client, method, path, body, args.warmup, args.concurrency)
+        summary = summarize(*run_route(client, method, path, body, args.requests, args.concurrency))
+        summary["folder"] = folder
+        summary["name"] = name
+        route = f"{method} {path}"
+        results["routes"][route] = summary
+        print(
+            f"{route:<52}{summary['throughput']:>9.1f}{summary['p50_ms']:>9.2f}"
+            f"{summary['p95_ms']:>9.2f}{summary['p99_ms']:>9.2f}{summary['errors']:>8}"
+        )
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} route(s) regressed beyond {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
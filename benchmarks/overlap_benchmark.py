@@ -0,0 +1,146 @@
+"""Compare the vectorized check_for_overlapping_section with the previous
+groupby/iloc loop on a synthetic dataset.
+
+    python benchmarks/overlap_benchmark.py --sections 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ETL"))
+from transform_data import check_for_overlapping_section, find_overlapping_sections  # noqa: E402
+
+
+def legacy_check_for_overlapping_section(df_section, df_meeting):
+    # Implementation replaced in ETL/transform_data.py, kept here as the baseline
+    df_section = df_section.drop_duplicates(subset=["sid"], keep=False)
+    df_section_meeting = df_section.merge(df_meeting, on="mid")
+    df_section_meeting = df_section_meeting.sort_values(
+        ["roomid", "semester", "starttime", "sid"]
+    )
+
+    overlaps = []
+    for _, group in df_section_meeting.groupby(
+        ["roomid", "semester", "starttime", "cdays"]
+    ):
+        for i in range(1, len(group)):
+            previous = group.iloc[i - 1]
+            current = group.iloc[i]
+            if (
+                current["starttime"] == previous["starttime"]
+                and current["roomid"] == previous["roomid"]
+                and current["semester"] == previous["semester"]
+                and current["years"] == previous["years"]
+                and current["cdays"] == previous["cdays"]
+            ):
+                if current["sid"] > previous["sid"]:
+                    overlaps.append(current["sid"])
+                else:
+                    overlaps.append(previous["sid"])
+
+    df_section = df_section[~df_section["sid"].isin(overlaps)]
+    return df_section, df_meeting
+
+
+def synthetic_data(sections, rooms, seed):
+    rng = np.random.default_rng(seed)
+
+    # LWV meetings every hour and MJ meetings every 90 minutes, plus a few
+    # shifted by 15 minutes so partial overlaps exist
+    meetings = []
+    for start in range(7 * 60 + 30, 19 * 60 + 45, 60):
+        meetings.append(("LWV", start, start + 50))
+        meetings.append(("LWV", start + 15, start + 65))
+    for start in range(7 * 60 + 30, 19 * 60 + 45, 90):
+        meetings.append(("MJ", start, start + 75))
+        meetings.append(("MJ", start + 15, start + 90))
+    df_meeting = pd.DataFrame(
+        [
+            (
+                mid,
+                "CIIC",
+                "%02d:%02d:00" % divmod(start, 60),
+                "%02d:%02d:00" % divmod(end, 60),
+                cdays,
+            )
+            for mid, (cdays, start, end) in enumerate(meetings, start=1)
+        ],
+        columns=["mid", "ccode", "starttime", "endtime", "cdays"],
+    )
+
+    df_section = pd.DataFrame(
+        {
+            "sid": np.arange(1, sections + 1),
+            "roomid": rng.integers(1, rooms + 1, sections),
+            "cid": rng.integers(2, 500, sections),
+            "mid": rng.integers(1, len(df_meeting) + 1, sections),
+            "semester": rng.choice(["Fall", "Spring", "V1", "V2"], sections),
+            "years": rng.choice(["2021", "2022", "2023", "2024"], sections).astype(object),
+            "capacity": rng.integers(10, 60, sections),
+        }
+    )
+    return df_section, df_meeting
+
+
+def check_chained_overlaps():
+    # 1 and 2 overlap, 2 and 3 overlap, 1 and 3 do not: dropping 2 leaves no
+    # conflict for 3, so only 2 goes
+    df_section_meeting = pd.DataFrame(
+        {
+            "sid": [3, 1, 2],
+            "roomid": [1, 1, 1],
+            "semester": ["Fall"] * 3,
+            "years": ["2024"] * 3,
+            "cdays": ["LWV"] * 3,
+            "starttime": ["09:10:00", "08:00:00", "08:30:00"],
+            "endtime": ["10:00:00", "09:00:00", "09:30:00"],
+        }
+    )
+    dropped = find_overlapping_sections(df_section_meeting)
+    assert dropped == [2], "chained overlaps dropped %s, expected [2]" % dropped
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, default=100000)
+    parser.add_argument("--rooms", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--skip-legacy", action="store_true", help="only time the new implementation"
+    )
+    args = parser.parse_args()
+
+    check_chained_overlaps()
+    df_section, df_meeting = synthetic_data(args.sections, args.rooms, args.seed)
+    print(f"{len(df_section)} sections, {len(df_meeting)} meetings, {args.rooms} rooms")
+
+    (kept, _), seconds = timed(check_for_overlapping_section, df_section, df_meeting)
+    print(f"vectorized: {seconds:8.3f}s, {len(df_section) - len(kept)} sections dropped")
+
+    if not args.skip_legacy:
+        (legacy_kept, _), legacy_seconds = timed(
+            legacy_check_for_overlapping_section, df_section, df_meeting
+        )
+        print(
+            f"legacy:     {legacy_seconds:8.3f}s, "
+            f"{len(df_section) - len(legacy_kept)} sections dropped (same start time only)"
+        )
+        print(f"speedup:    {legacy_seconds / seconds:8.1f}x")
+
+        # Every same-start conflict the old loop caught must still be caught
+        missed = set(kept["sid"]) - set(legacy_kept["sid"])
+        print(f"legacy drops kept by the new version: {len(missed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""Generate a synthetic data/ folder at a multiple of the real dataset's size.
+
+    python benchmarks/synthetic_data.py --scale 100 --output /tmp/data-100x
+    python ETL/main.py --data /tmp/data-100x
+
+The files have the layout of data/ (courses.xml, meeting.csv, requisites.db,
+rooms.json, sections.csv), so the ETL and the benchmarks read them as they
+are. Every row follows the rules of clean_data: LWV meetings last 50 minutes
+and MJ meetings 75 and stay clear of the 'Hora Universal', sections fit their
+room and are taught in a semester and year their class allows, and no two
+sections share a room at overlapping times. --invalid-fraction adds sections
+that break one of those rules, for the validation benchmarks.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import time
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+# Size of data/ at --scale 1
+BASE_CLASSES = 36
+BASE_ROOMS = 25
+BASE_SECTIONS = 1333
+REQUISITES_PER_CLASS = 1.6
+
+SEMESTERS = ["Fall", "Spring", "V1", "V2"]
+YEARS = list(range(2017, 2026))
+DEPARTMENTS = ["CIIC", "INSO", "INEL", "ICOM", "MATE"]
+BUILDINGS_PER_SCALE = 3
+
+# Terms a class is offered in -> semesters it can have sections in
+TERMS = {
+    "First Semester": ["Fall"],
+    "Second Semester": ["Spring"],
+    "First Semester, Second Semester": ["Fall", "Spring"],
+    "According to Demand": SEMESTERS,
+}
+# Years a class is offered in -> parities (year % 2) it can have sections in
+YEAR_RULES = {
+    "Every Year": [0, 1],
+    "Even Years": [0],
+    "Odd Years": [1],
+    "According to Demand": [0, 1],
+}
+
+
+def time_slots():
+    # Non-overlapping (cdays, start, end) slots in minutes: LWV every hour from
+    # 7:30, MJ every 90 minutes around the 'Hora Universal' (10:15-12:30) so
+    # the ETL does not move them. Nothing starts after 19:45.
+    slots = [("LWV", start, start + 50) for start in range(7 * 60 + 30, 19 * 60 + 46, 60)]
+    slots += [("MJ", start, start + 75) for start in range(7 * 60 + 30, 10 * 60 + 15 - 75 + 1, 90)]
+    slots += [("MJ", start, start + 75) for start in range(12 * 60 + 30, 19 * 60 + 46, 90)]
+    return slots
+
+
+def hhmmss(minutes):
+    return "%02d:%02d:00" % divmod(int(minutes), 60)
+
+
+def generate_classes(count, rng):
+    cid = np.arange(2, count + 2)
+    # Mostly yearly classes, like data/courses.xml
+    term = rng.choice(list(TERMS), count, p=[0.35, 0.3, 0.2, 0.15])
+    years = rng.choice(list(YEAR_RULES), count, p=[0.5, 0.15, 0.15, 0.2])
+    # The first classes cover every term/year combination
+    for index, (term_name, year_rule) in enumerate(
+        (t, y) for t in TERMS for y in YEAR_RULES
+    ):
+        if index < count:
+            term[index], years[index] = term_name, year_rule
+    return pd.DataFrame(
+        {
+            "cid": cid,
+            "cname": rng.choice(DEPARTMENTS, count),
+            "ccode": ["%04d" % (3000 + value % 7000) for value in cid],
+            "cdesc": ["Synthetic Course %d" % value for value in cid],
+            "term": term,
+            "years": years,
+            "cred": rng.choice([3, 4], count, p=[0.85, 0.15]),
+        }
+    )
+
+
+def generate_rooms(count, rng):
+    buildings = max(1, count // (BASE_ROOMS // BUILDINGS_PER_SCALE))
+    return pd.DataFrame(
+        {
+            "rid": np.arange(1, count + 1),
+            "building": ["Bldg%04d" % value for value in rng.integers(1, buildings + 1, count)],
+            "room_number": ["%03d" % (100 + index % 900) for index in range(count)],
+            "capacity": rng.choice([25, 28, 30, 40, 60, 70, 120], count),
+        }
+    )
+
+
+def generate_meetings(copies):
+    # Every slot once per copy; the copies only differ by mid and ccode
+    rows = []
+    for copy in range(copies):
+        for cdays, start, end in time_slots():
+            rows.append((len(rows) + 1, "%03d" % (len(rows) % 1000), hhmmss(start), hhmmss(end), cdays))
+    return pd.DataFrame(rows, columns=["mid", "ccode", "starttime", "endtime", "cdays"])
+
+
+def generate_requisites(df_class, rng):
+    # Each class requires a few classes with a lower cid, so the graph is a DAG
+    cids = df_class["cid"].to_numpy()
+    count = int(len(cids) * REQUISITES_PER_CLASS)
+    position = rng.integers(1, len(cids), count) if len(cids) > 1 else np.zeros(0, dtype=int)
+    # Requisites are mostly a few levels down, like a curriculum
+    offset = np.minimum(position, rng.geometric(0.15, len(position)))
+    pairs = pd.DataFrame({"classid": cids[position], "reqid": cids[position - offset]})
+    pairs = pairs.drop_duplicates(ignore_index=True)
+    pairs["prereq"] = rng.choice([1, 0], len(pairs), p=[0.85, 0.15])
+    return pairs
+
+
+def generate_sections(count, df_class, df_room, df_meeting, rng):
+    slots = time_slots()
+    copies = len(df_meeting) // len(slots)
+
+    # Distinct (room, semester, year, slot) cells, so no two sections overlap
+    sizes = (len(df_room), len(SEMESTERS), len(YEARS), len(slots))
+    total = int(np.prod(sizes))
+    if count > total:
+        raise ValueError("%d sections do not fit in %d room/time cells" % (count, total))
+    cells = np.zeros(0, dtype=np.int64)
+    while len(cells) < count:
+        cells = np.unique(np.concatenate([cells, rng.integers(0, total, count)]))
+    cells = rng.permutation(cells)[:count]
+    room, semester, year, slot = np.unravel_index(cells, sizes)
+
+    # Classes allowed in each (semester, year parity)
+    cid = np.zeros(count, dtype=np.int64)
+    for semester_index, semester_name in enumerate(SEMESTERS):
+        for parity in (0, 1):
+            allowed = df_class[
+                df_class["term"].map(lambda term: semester_name in TERMS[term])
+                & df_class["years"].map(lambda years: parity in YEAR_RULES[years])
+            ]["cid"].to_numpy()
+            rows = (semester == semester_index) & (np.array(YEARS)[year] % 2 == parity)
+            cid[rows] = rng.choice(allowed, int(rows.sum()))
+
+    # generate_meetings lays the slots out copy after copy
+    mid = df_meeting["mid"].to_numpy()[rng.integers(0, copies, count) * len(slots) + slot]
+    room_capacity = df_room["capacity"].to_numpy()[room]
+    return pd.DataFrame(
+        {
+            "sid": np.arange(count),
+            "room_id": df_room["rid"].to_numpy()[room],
+            "meeting_id": mid,
+            "class_id": cid,
+            "semester": np.array(SEMESTERS)[semester],
+            "year": np.array(YEARS)[year],
+            # Between 15 students and the room's capacity
+            "capacity": rng.integers(np.minimum(15, room_capacity), room_capacity + 1),
+        }
+    )
+
+
+def add_invalid_sections(df_section, df_class, df_room, fraction, rng):
+    # Copies of valid sections, with higher sids, broken in one of three ways:
+    # over the room's capacity, in a semester the class is not offered in, or
+    # left as an exact copy that overlaps the original
+    count = int(len(df_section) * fraction)
+    if count == 0:
+        return df_section
+    invalid = df_section.sample(count, random_state=rng.integers(2**31)).reset_index(drop=True)
+    invalid["sid"] = np.arange(len(df_section), len(df_section) + count)
+    kind = rng.integers(0, 3, count)
+
+    room_capacity = df_room.set_index("rid")["capacity"]
+    over = kind == 0
+    invalid.loc[over, "capacity"] = invalid.loc[over, "room_id"].map(room_capacity) + 1
+
+    offered = df_class.set_index("cid")["term"].map(TERMS)
+    wrong = kind == 1
+    for index in np.flatnonzero(wrong):
+        allowed = offered[invalid.at[index, "class_id"]]
+        others = [semester for semester in SEMESTERS if semester not in allowed]
+        if others:
+            invalid.at[index, "semester"] = rng.choice(others)
+
+    return pd.concat([df_section, invalid], ignore_index=True)
+
+
+def generate(scale, seed=7, invalid_fraction=0.0):
+    # DataFrames shaped like the files of data/, by table name
+    rng = np.random.default_rng(seed)
+    df_class = generate_classes(max(16, round(BASE_CLASSES * scale)), rng)
+    df_room = generate_rooms(max(1, round(BASE_ROOMS * scale)), rng)
+    df_meeting = generate_meetings(max(1, round(scale)))
+    df_requisite = generate_requisites(df_class, rng)
+    df_section = generate_sections(round(BASE_SECTIONS * scale), df_class, df_room, df_meeting, rng)
+    df_section = add_invalid_sections(df_section, df_class, df_room, invalid_fraction, rng)
+    return {
+        "class": df_class,
+        "room": df_room,
+        "meeting": df_meeting,
+        "requisite": df_requisite,
+        "section": df_section,
+    }
+
+
+def write_courses(df_class, path):
+    # Same shape as data/courses.xml: <Courses> blocks without a root element
+    with open(path, "w") as file:
+        for row in df_class.itertuples(index=False):
+            file.write(
+                "<Courses>\n"
+                f"  <classes>\n    <code>{row.ccode}</code>\n    <name>{escape(row.cname)}</name>\n  </classes>\n"
+                f"  <classid>{row.cid:04d}</classid>\n"
+                f"  <cred>{row.cred}</cred>\n"
+                f"  <description>{escape(row.cdesc)}</description>\n"
+                "  <syllabus>None</syllabus>\n"
+                f"  <term>{escape(row.term)}</term>\n"
+                f"  <years>{escape(row.years)}</years>\n"
+                "</Courses>\n"
+            )
+
+
+def write_rooms(df_room, path):
+    buildings = {}
+    for row in df_room.itertuples(index=False):
+        buildings.setdefault(row.building, []).append(
+            {"id": int(row.rid), "number": row.room_number, "capacity": int(row.capacity)}
+        )
+    with open(path, "w") as file:
+        json.dump(buildings, file)
+
+
+def write_requisites(df_requisite, path):
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE requisites(cid int, requisiteid int, preReq int, primary key (cid, requisiteid));"
+    )
+    conn.executemany(
+        "INSERT INTO requisites VALUES (?, ?, ?);",
+        df_requisite[["classid", "reqid", "prereq"]].itertuples(index=False, name=None),
+    )
+    conn.commit()
+    conn.close()
+
+
+def write_data(tables, folder):
+    os.makedirs(folder, exist_ok=True)
+    write_courses(tables["class"], os.path.join(folder, "courses.xml"))
+    write_rooms(tables["room"], os.path.join(folder, "rooms.json"))
+    write_requisites(tables["requisite"], os.path.join(folder, "requisites.db"))
+    meeting = tables["meeting"].rename(columns={"starttime": "start", "endtime": "end", "cdays": "day"})
+    meeting.to_csv(os.path.join(folder, "meeting.csv"), index=False)
+    tables["section"].to_csv(os.path.join(folder, "sections.csv"), index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=10, help="multiple of the size of data/")
+    parser.add_argument("--output", required=True, help="folder to write the files to")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--invalid-fraction",
+        type=float,
+        default=0.0,
+        help="extra sections, as a fraction of the valid ones, that clean_data must drop",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    tables = generate(args.scale, args.seed, args.invalid_fraction)
+    write_data(tables, args.output)
+    sizes = ", ".join(f"{len(df)} {name}" for name, df in tables.items())
+    print(f"{sizes} written to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
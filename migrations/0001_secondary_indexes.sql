@@ -0,0 +1,26 @@
+-- migrate: no-transaction
+-- Secondary indexes for the lookups done by the API. Built CONCURRENTLY so
+-- they can be added to a live database without blocking writes.
+
+-- CLASS: duplicate probes on every class insert/update
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS "class_cname_ccode_key" ON "class" ("cname", "ccode");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "class_cdesc_idx" ON "class" ("cdesc");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "class_csyllabus_idx" ON "class" ("csyllabus");
+
+-- SECTION: foreign keys and the room/term lookup of the write validation
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "section_cid_idx" ON "section" ("cid");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "section_roomid_idx" ON "section" ("roomid");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "section_mid_idx" ON "section" ("mid");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "section_room_term_idx" ON "section" ("roomid", "semester", "years");
+
+-- REQUISITE: the primary key covers classid, reqid needs its own index
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "requisite_reqid_idx" ON "requisite" ("reqid");
+
+-- SYLLABUS: fragments filtered by course
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "syllabus_courseid_idx" ON "syllabus" ("courseid");
+
+-- ROOM: duplicate check on insert/update and per building statistics
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "room_building_number_idx" ON "room" ("building", "room_number");
+
+-- MEETING: duplicate and conflict checks
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "meeting_cdays_starttime_idx" ON "meeting" ("cdays", "starttime");
@@ -0,0 +1,5 @@
+-- migrate: no-transaction
+-- Approximate nearest neighbour index for the cosine distance (<=>) searches
+-- done by SyllabusDAO.getAllFragments*. Requires pgvector 0.5.0 or newer.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "syllabus_embedding_hnsw_idx"
+    ON "syllabus" USING hnsw ("embedding_text" vector_cosine_ops);
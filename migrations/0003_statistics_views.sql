@@ -0,0 +1,86 @@
+-- Precomputed results for the local and global statistics routes. The views
+-- are refreshed by the API after writes (see app/dao/statistics.py); the
+-- triggers below count every write so readers can tell when they are stale.
+
+-- Sections of each class per room: ClassDAO.getMostPerRoom
+CREATE MATERIALIZED VIEW "stats_class_per_room" AS
+    SELECT "roomid", "cid", COUNT(*) AS "class_count"
+    FROM "section"
+    GROUP BY "roomid", "cid";
+CREATE UNIQUE INDEX "stats_class_per_room_key" ON "stats_class_per_room" ("roomid", "cid");
+CREATE INDEX "stats_class_per_room_count_idx" ON "stats_class_per_room" ("roomid", "class_count" DESC);
+
+-- Sections of each class per term: ClassDAO.getMostPerSemester
+CREATE MATERIALIZED VIEW "stats_class_per_term" AS
+    SELECT "years", "semester", "cid", COUNT(*) AS "class_count"
+    FROM "section"
+    GROUP BY "years", "semester", "cid";
+CREATE UNIQUE INDEX "stats_class_per_term_key" ON "stats_class_per_term" ("years", "semester", "cid");
+CREATE INDEX "stats_class_per_term_count_idx" ON "stats_class_per_term" ("years", "semester", "class_count" DESC);
+
+-- Sections of each class: ClassDAO.getLeastClass
+CREATE MATERIALIZED VIEW "stats_class_sections" AS
+    SELECT "cid", COUNT(*) AS "class_count"
+    FROM "section"
+    GROUP BY "cid";
+CREATE UNIQUE INDEX "stats_class_sections_key" ON "stats_class_sections" ("cid");
+CREATE INDEX "stats_class_sections_count_idx" ON "stats_class_sections" ("class_count");
+
+-- Classes that require each class: ClassDAO.getMostPrerequisite
+CREATE MATERIALIZED VIEW "stats_prerequisite_count" AS
+    SELECT "reqid" AS "cid", COUNT("classid") AS "prerequisite_classes"
+    FROM "requisite"
+    WHERE "prereq" = TRUE
+    GROUP BY "reqid";
+CREATE UNIQUE INDEX "stats_prerequisite_count_key" ON "stats_prerequisite_count" ("cid");
+CREATE INDEX "stats_prerequisite_count_idx" ON "stats_prerequisite_count" ("prerequisite_classes" DESC);
+
+-- Sections of each meeting: MeetingDAO.getMostMeeting
+CREATE MATERIALIZED VIEW "stats_meeting_sections" AS
+    SELECT "mid", COUNT("sid") AS "section_count"
+    FROM "section"
+    GROUP BY "mid";
+CREATE UNIQUE INDEX "stats_meeting_sections_key" ON "stats_meeting_sections" ("mid");
+CREATE INDEX "stats_meeting_sections_count_idx" ON "stats_meeting_sections" ("section_count" DESC);
+
+-- Student-to-capacity ratio of each section: RoomDAO.getRatioByBuilding
+CREATE MATERIALIZED VIEW "stats_section_ratio" AS
+    SELECT s."sid", r."rid", r."building",
+        (CAST(s."capacity" AS FLOAT) / CAST(r."capacity" AS FLOAT)) AS "ratio"
+    FROM "section" AS s
+    INNER JOIN "room" AS r ON s."roomid" = r."rid";
+CREATE UNIQUE INDEX "stats_section_ratio_key" ON "stats_section_ratio" ("sid");
+CREATE INDEX "stats_section_ratio_building_idx" ON "stats_section_ratio" ("building", "ratio" DESC);
+
+-- Sections per year: SectionDAO.getSectionPerYear
+CREATE MATERIALIZED VIEW "stats_sections_per_year" AS
+    SELECT "years", COUNT("sid") AS "sections"
+    FROM "section"
+    GROUP BY "years";
+CREATE UNIQUE INDEX "stats_sections_per_year_key" ON "stats_sections_per_year" ("years");
+
+-- Write counter: the views are stale while "changes" is ahead of "refreshed_changes"
+CREATE TABLE "statistics_state" (
+    "id" INTEGER PRIMARY KEY CHECK ("id" = 1),
+    "changes" BIGINT NOT NULL DEFAULT 0,
+    "refreshed_changes" BIGINT NOT NULL DEFAULT 0,
+    "refreshed_at" TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+INSERT INTO "statistics_state" ("id") VALUES (1);
+
+CREATE OR REPLACE FUNCTION mark_statistics_stale() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE "statistics_state" SET "changes" = "changes" + 1 WHERE "id" = 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Once per statement, so bulk loads bump the counter once. Deleting a class,
+-- room or meeting cascades to "section" and fires its trigger; the other
+-- class and meeting columns are joined live and never go stale.
+CREATE TRIGGER "section_statistics_stale" AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "section"
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_statistics_stale();
+CREATE TRIGGER "requisite_statistics_stale" AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "requisite"
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_statistics_stale();
+CREATE TRIGGER "room_statistics_stale" AFTER UPDATE OF "building", "capacity" ON "room"
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_statistics_stale();
@@ -0,0 +1,4 @@
+-- migrate: no-transaction
+-- Top rooms by capacity per building (RoomDAO.getMaxCapacity) read straight
+-- from the index instead of sorting the building's rooms.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "room_building_capacity_idx" ON "room" ("building", "capacity" DESC);
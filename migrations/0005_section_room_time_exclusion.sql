@@ -0,0 +1,64 @@
+-- The database refuses two sections in the same room, term and days at
+-- overlapping times, so concurrent writers cannot double-book a room.
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+-- Half-open [starttime, endtime) ranges: back-to-back meetings do not overlap
+CREATE TYPE "timerange" AS RANGE (subtype = time);
+
+ALTER TABLE "meeting"
+    ADD COLUMN "time_range" "timerange"
+    GENERATED ALWAYS AS (timerange("starttime", "endtime")) STORED;
+
+-- Copy of the meeting's days and range, kept in sync by the triggers below,
+-- because an exclusion constraint only sees the columns of its own table
+ALTER TABLE "section"
+    ADD COLUMN "meeting_days" VARCHAR(5),
+    ADD COLUMN "meeting_time" "timerange";
+
+UPDATE "section" AS s
+SET "meeting_days" = m."cdays", "meeting_time" = m."time_range"
+FROM "meeting" AS m
+WHERE s."mid" = m."mid";
+
+CREATE OR REPLACE FUNCTION section_meeting_time() RETURNS trigger AS $$
+BEGIN
+    SELECT "cdays", "time_range" INTO NEW."meeting_days", NEW."meeting_time"
+    FROM "meeting" WHERE "mid" = NEW."mid";
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER "section_meeting_time"
+    BEFORE INSERT OR UPDATE OF "mid" ON "section"
+    FOR EACH ROW EXECUTE FUNCTION section_meeting_time();
+
+-- One UPDATE per statement on meeting, so shifting every MJ meeting at once
+-- (MeetingDAO.updateAllMeetingTime) moves their sections in a single pass
+CREATE OR REPLACE FUNCTION meeting_time_to_sections() RETURNS trigger AS $$
+BEGIN
+    UPDATE "section" AS s
+    SET "meeting_days" = m."cdays", "meeting_time" = m."time_range"
+    FROM new_meetings AS m
+    WHERE s."mid" = m."mid"
+      AND (s."meeting_days", s."meeting_time") IS DISTINCT FROM (m."cdays", m."time_range");
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER "meeting_time_to_sections"
+    AFTER UPDATE ON "meeting"
+    REFERENCING NEW TABLE AS new_meetings
+    FOR EACH STATEMENT EXECUTE FUNCTION meeting_time_to_sections();
+
+-- Checked at commit: a shift can pass through overlapping states on its way
+-- to a valid schedule
+ALTER TABLE "section"
+    ADD CONSTRAINT "section_room_time_excl"
+    EXCLUDE USING gist (
+        "roomid" WITH =,
+        "semester" WITH =,
+        "years" WITH =,
+        "meeting_days" WITH =,
+        "meeting_time" WITH &&
+    )
+    DEFERRABLE INITIALLY DEFERRED;
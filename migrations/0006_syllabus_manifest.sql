@@ -0,0 +1,18 @@
+-- Ingestion manifest of the syllabus chunks (vectorDB/chatBot/filehandler.py):
+-- one row per syllabus file with the hashes of the PDF and of its extracted
+-- text, and the hash of every chunk, so a rerun only re-embeds what changed.
+CREATE TABLE "syllabus_source" (
+    "source" VARCHAR PRIMARY KEY,
+    "courseid" INTEGER NOT NULL REFERENCES "class"("cid") ON DELETE CASCADE,
+    "pdf_hash" VARCHAR(64),
+    "text_hash" VARCHAR(64) NOT NULL,
+    "ingested_at" TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Chunks loaded before the manifest have no source and are replaced the
+-- first time their course is ingested again
+ALTER TABLE "syllabus"
+    ADD COLUMN "source" VARCHAR REFERENCES "syllabus_source"("source") ON DELETE CASCADE,
+    ADD COLUMN "chunk_hash" VARCHAR(64);
+
+CREATE INDEX "syllabus_source_idx" ON "syllabus" ("source");
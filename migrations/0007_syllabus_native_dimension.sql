@@ -0,0 +1,6 @@
+-- Store the syllabus embeddings at the 384 dimensions of all-MiniLM-L6-v2
+-- instead of zero padded to 500. The padding is trailing zeros, so the first
+-- 384 values are the embedding itself. The HNSW index is rebuilt with the column.
+ALTER TABLE "syllabus"
+    ALTER COLUMN "embedding_text" TYPE vector(384)
+    USING (("embedding_text"::real[])[1:384])::vector(384);
@@ -0,0 +1,26 @@
+-- Replaces the write counter of 0003: bumping the single statistics_state row
+-- locked it until commit, so every writer of section, requisite or room
+-- waited for the others. Writers now only append to a log, which takes no
+-- lock another writer waits on. The refresher deletes the entries it can see
+-- before rebuilding the views; entries of transactions still open stay behind
+-- and keep the views marked stale.
+CREATE TABLE "statistics_changes" (
+    "id" BIGSERIAL PRIMARY KEY,
+    "changed_at" TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Writes counted but not refreshed yet
+INSERT INTO "statistics_changes" ("changed_at")
+SELECT now() FROM "statistics_state" WHERE "changes" > "refreshed_changes";
+
+ALTER TABLE "statistics_state"
+    DROP COLUMN "changes",
+    DROP COLUMN "refreshed_changes";
+
+-- Same triggers, same function name
+CREATE OR REPLACE FUNCTION mark_statistics_stale() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO "statistics_changes" DEFAULT VALUES;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
@@ -5,12 +5,19 @@ DROP TABLE IF EXISTS "room" CASCADE;
 DROP TABLE IF EXISTS "meeting" CASCADE;
 
 DROP TABLE IF EXISTS "syllabus" CASCADE;
+DROP TABLE IF EXISTS "syllabus_source" CASCADE;
 
 DROP TABLE IF EXISTS "class" CASCADE;
 
 DROP TABLE IF EXISTS "requisite" CASCADE;
 DROP TABLE IF EXISTS "user" CASCADE;
 
+-- Migrations are re-applied after a full reload (see migrations/)
+DROP TABLE IF EXISTS "schema_migrations" CASCADE;
+DROP TABLE IF EXISTS "statistics_state" CASCADE;
+DROP TABLE IF EXISTS "statistics_changes" CASCADE;
+DROP TYPE IF EXISTS "timerange" CASCADE;
+
 CREATE SEQUENCE IF NOT EXISTS class_seq;
 
 CREATE SEQUENCE IF NOT EXISTS room_seq;
@@ -73,7 +80,9 @@ CREATE EXTENSION IF NOT EXISTS vector;
 CREATE TABLE IF NOT EXISTS "syllabus" (
   "chunkid" INTEGER PRIMARY KEY DEFAULT nextval('syllabus_seq'),
   "courseid" INTEGER,
-  "embedding_text" vector(500),
+  -- Dimension of all-MiniLM-L6-v2 (migrations/0007); another model is
+  -- switched to with filehandler.py --migrate-dimension
+  "embedding_text" vector(384),
   "chunk" VARCHAR,
 
 
@@ -1,7 +1,8 @@
 
--- Set exact number for each sequence
-SELECT setval('class_seq', 37, true);
-SELECT setval('room_seq', 25, true);
-SELECT setval('meeting_seq', 20, true);
-SELECT setval('section_seq', 1332, true);
-SELECT setval('syllabus_seq', 1, true);
\ No newline at end of file
+-- Set exact number for each sequence, or past the highest id loaded from a
+-- larger (synthetic) dataset
+SELECT setval('class_seq', GREATEST(37, (SELECT MAX("cid") FROM "class")), true);
+SELECT setval('room_seq', GREATEST(25, (SELECT MAX("rid") FROM "room")), true);
+SELECT setval('meeting_seq', GREATEST(20, (SELECT MAX("mid") FROM "meeting")), true);
+SELECT setval('section_seq', GREATEST(1332, (SELECT MAX("sid") FROM "section")), true);
+SELECT setval('syllabus_seq', 1, true);
@@ -0,0 +1,66 @@
+import datetime
+import os
+import sys
+
+import pytest
+
+from handler import data_validation
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+import synthetic_data  # noqa: E402
+
+
+def database_tables(invalid_fraction):
+    # synthetic_data's tables shaped like getDataFromDB's result: times as
+    # datetime.time, section columns named as in the database
+    tables = synthetic_data.generate(0.2, seed=3, invalid_fraction=invalid_fraction)
+    df_class = tables["class"].assign(csyllabus="")
+    df_meeting = tables["meeting"].copy()
+    for column in ("starttime", "endtime"):
+        df_meeting[column] = [datetime.time.fromisoformat(value) for value in df_meeting[column]]
+    df_section = tables["section"].rename(
+        columns={"room_id": "roomid", "meeting_id": "mid", "class_id": "cid", "year": "years"}
+    )
+    df_section["sid"] += 1
+    df_section["years"] = df_section["years"].astype(str)
+    return {
+        "df_class": df_class,
+        "df_meeting": df_meeting,
+        "df_room": tables["room"],
+        "df_requisite": tables["requisite"],
+        "df_section": df_section,
+    }
+
+
+@pytest.fixture
+def full_mode(monkeypatch):
+    def run(invalid_fraction=0.0):
+        tables = database_tables(invalid_fraction)
+        monkeypatch.setattr(
+            data_validation, "getDataFromDB", lambda: {name: df.copy() for name, df in tables.items()}
+        )
+        result = data_validation.clean_data(tables["df_section"].iloc[:0], "section")
+        return tables, {name: df for df, name in result}
+
+    return run
+
+
+def test_meeting_minutes_survive(full_mode):
+    tables, result = full_mode()
+    expected = {
+        row.mid: (row.starttime.hour * 60 + row.starttime.minute, row.endtime.hour * 60 + row.endtime.minute)
+        for row in tables["df_meeting"].itertuples()
+    }
+    meetings = result["meeting"]
+    assert len(meetings) == len(expected)
+    for row in meetings.itertuples():
+        assert (row.starttime, row.endtime) == expected[row.mid]
+    # Every generated section follows the rules
+    assert len(result["section"]) == len(tables["df_section"])
+
+
+def test_only_invalid_sections_are_dropped(full_mode):
+    valid = set(database_tables(0.0)["df_section"]["sid"])
+    tables, result = full_mode(invalid_fraction=0.2)
+    assert len(tables["df_section"]) > len(valid)
+    assert set(result["section"]["sid"]) == valid
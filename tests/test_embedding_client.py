@@ -0,0 +1,103 @@
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+
+import pytest
+
+from vectorDB.chatBot import embedding
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+
+# embedding_server.serve in front of a fake model, so no model is loaded
+WORKER = textwrap.dedent(
+    """
+    import os, sys, threading
+    sys.path.insert(0, sys.argv[1])
+    from multiprocessing.connection import Listener
+    from vectorDB.chatBot.embedding_server import serve
+
+    class Service:
+        def embed(self, sentence):
+            return [float(len(sentence)), float(os.getpid())]
+
+    with Listener(sys.argv[2], family="AF_UNIX", authkey=b"secret") as listener:
+        print("ready", flush=True)
+        while True:
+            conn = listener.accept()
+            threading.Thread(target=serve, args=(conn, Service()), daemon=True).start()
+    """
+)
+
+
+class LocalService:
+    # Stands in for the in-process model while the worker is down
+    def __init__(self, model_name):
+        pass
+
+    def embed(self, sentence):
+        return [float(len(sentence)), -1.0]
+
+
+def start_worker(socket_path):
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    worker = subprocess.Popen(
+        [sys.executable, "-c", WORKER, APP, socket_path], stdout=subprocess.PIPE, text=True
+    )
+    assert worker.stdout.readline().strip() == "ready"
+    return worker
+
+
+def open_sockets():
+    count = 0
+    for fd in os.listdir("/proc/self/fd"):
+        try:
+            count += os.readlink(os.path.join("/proc/self/fd", fd)).startswith("socket:")
+        except FileNotFoundError:
+            # The descriptor listdir itself used
+            pass
+    return count
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc")
+def test_client_recovers_from_worker_restarts_without_leaking(monkeypatch):
+    monkeypatch.setattr(embedding, "EmbeddingService", LocalService)
+    monkeypatch.setitem(embedding.embedding_config, "retry", 0)
+    socket_path = os.path.join(tempfile.mkdtemp(), "embedding.sock")
+
+    worker = start_worker(socket_path)
+    client = embedding.EmbeddingClient(socket_path, "secret")
+    try:
+        assert client.embed("abc") == [3.0, float(worker.pid)]
+        baseline = open_sockets()
+
+        for _ in range(5):
+            worker.kill()
+            worker.wait()
+            # The broken connection is closed and the local model answers
+            assert client.embed("abcd") == [4.0, -1.0]
+            assert client._fallback is not None
+
+            worker = start_worker(socket_path)
+            # Tried again right away (retry 0), back on the worker
+            assert client.embed("ab") == [2.0, float(worker.pid)]
+            assert client._fallback is None
+            assert open_sockets() == baseline
+    finally:
+        worker.kill()
+        worker.wait()
+
+
+def test_wrong_key_falls_back(monkeypatch):
+    monkeypatch.setattr(embedding, "EmbeddingService", LocalService)
+    socket_path = os.path.join(tempfile.mkdtemp(), "embedding.sock")
+    worker = start_worker(socket_path)
+    try:
+        client = embedding.EmbeddingClient(socket_path, "wrong")
+        assert client.embed("abc") == [3.0, -1.0]
+    finally:
+        worker.kill()
+        worker.wait()
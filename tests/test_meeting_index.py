@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from dao.meeting_index import MeetingIndex
+
+
+def random_meetings(rng, count):
+    rows = []
+    for mid in range(1, count + 1):
+        start = rng.randrange(7 * 60, 20 * 60, 5)
+        end = start + rng.choice([50, 75, 90, 5])
+        rows.append(
+            (
+                mid,
+                rng.choice(["CIIC", "INSO", "MATE"]),
+                "%02d:%02d:00" % divmod(start, 60),
+                "%02d:%02d:00" % divmod(end, 60),
+                rng.choice(["LWV", "MJ"]),
+            )
+        )
+    return rows
+
+
+def minutes(value):
+    hours, minutes = value.split(":")[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+def brute_force_conflicts(rows, starttime, endtime, cdays):
+    # MeetingDAO.checkMeetingConflict's SQL over every row
+    start, end = minutes(starttime), minutes(endtime)
+    return sorted(
+        row[0]
+        for row in rows
+        if row[4] == cdays
+        and (
+            (minutes(row[2]) < start and minutes(row[3]) >= start)
+            or (minutes(row[2]) <= end and minutes(row[3]) > end)
+        )
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_conflicts_match_brute_force(seed):
+    rng = random.Random(seed)
+    rows = random_meetings(rng, 300)
+    index = MeetingIndex(rows)
+
+    for _ in range(300):
+        start = rng.randrange(6 * 60, 21 * 60)
+        end = start + rng.randrange(0, 180)
+        starttime = "%02d:%02d:00" % divmod(start, 60)
+        endtime = "%02d:%02d:00" % divmod(end, 60)
+        cdays = rng.choice(["LWV", "MJ", "S"])
+        found = sorted(row[0] for row in index.findConflicts(starttime, endtime, cdays))
+        assert found == brute_force_conflicts(rows, starttime, endtime, cdays)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_duplicate_is_the_lowest_mid(seed):
+    rng = random.Random(seed)
+    rows = random_meetings(rng, 400)
+    index = MeetingIndex(rows)
+
+    for mid, ccode, starttime, endtime, cdays in rows:
+        same = [
+            row[0]
+            for row in rows
+            if (row[1], minutes(row[2]), minutes(row[3]), row[4])
+            == (ccode, minutes(starttime), minutes(endtime), cdays)
+        ]
+        assert index.findDuplicate(ccode, starttime, endtime, cdays) == min(same)
+    assert index.findDuplicate("NONE", "08:00:00", "08:50:00", "LWV") is None
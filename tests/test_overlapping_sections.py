@@ -0,0 +1,80 @@
+import os
+import random
+import sys
+
+import pandas as pd
+import pytest
+
+from handler import data_validation
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ETL"))
+import transform_data  # noqa: E402
+
+# The ETL and the API keep identical copies of the rule
+IMPLEMENTATIONS = [transform_data.find_overlapping_sections, data_validation.find_overlapping_sections]
+
+
+def sections(rows):
+    # rows: (sid, roomid, starttime, endtime) in one semester, year and days
+    return pd.DataFrame(
+        {
+            "sid": [row[0] for row in rows],
+            "roomid": [row[1] for row in rows],
+            "semester": ["Fall"] * len(rows),
+            "years": ["2024"] * len(rows),
+            "cdays": ["LWV"] * len(rows),
+            "starttime": [row[2] for row in rows],
+            "endtime": [row[3] for row in rows],
+        }
+    )
+
+
+def keep_lowest_sid(df):
+    # Reference: take the sections in sid order, keep the ones that overlap
+    # no section kept before them in the same room, term and days
+    kept = {}
+    dropped = []
+    for row in df.sort_values("sid").itertuples():
+        key = (row.roomid, row.semester, row.years, row.cdays)
+        start = int(row.starttime[:2]) * 60 + int(row.starttime[3:5])
+        end = int(row.endtime[:2]) * 60 + int(row.endtime[3:5])
+        if any(start < other_end and other_start < end for other_start, other_end in kept.get(key, [])):
+            dropped.append(row.sid)
+        else:
+            kept.setdefault(key, []).append((start, end))
+    return sorted(dropped)
+
+
+@pytest.mark.parametrize("find", IMPLEMENTATIONS)
+def test_lower_sid_wins_when_the_higher_starts_first(find):
+    df = sections([(1, 7, "09:30:00", "10:45:00"), (2, 7, "09:00:00", "10:15:00")])
+    assert find(df) == [2]
+
+
+@pytest.mark.parametrize("find", IMPLEMENTATIONS)
+def test_dropped_section_does_not_drop_others(find):
+    # 2 overlaps 1 and 3, 1 and 3 do not overlap: only 2 goes
+    df = sections([(3, 7, "09:10:00", "10:00:00"), (1, 7, "08:00:00", "09:00:00"), (2, 7, "08:30:00", "09:30:00")])
+    assert find(df) == [2]
+
+
+@pytest.mark.parametrize("find", IMPLEMENTATIONS)
+def test_back_to_back_and_other_rooms_do_not_conflict(find):
+    df = sections([(1, 7, "08:00:00", "08:50:00"), (2, 7, "08:50:00", "09:40:00"), (3, 8, "08:00:00", "08:50:00")])
+    assert find(df) == []
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_keep_lowest_sid(seed):
+    rng = random.Random(seed)
+    rows = []
+    for sid in rng.sample(range(1, 2000), 300):
+        start = rng.randrange(7 * 60, 19 * 60, 5)
+        end = start + rng.choice([50, 75, 120])
+        rows.append((sid, rng.randint(1, 6), "%02d:%02d:00" % divmod(start, 60), "%02d:%02d:00" % divmod(end, 60)))
+    df = sections(rows)
+    df["cdays"] = [rng.choice(["LWV", "MJ"]) for _ in rows]
+
+    expected = keep_lowest_sid(df)
+    for find in IMPLEMENTATIONS:
+        assert sorted(find(df)) == expected
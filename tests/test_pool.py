@@ -0,0 +1,132 @@
+import threading
+import time
+
+import psycopg2.extensions
+import psycopg2.pool
+import pytest
+
+from dao import pool as pool_module
+from dao.pool import ConnectionPool
+
+
+class FakeInfo:
+    def __init__(self):
+        self.transaction_status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query):
+        if self.conn.broken:
+            raise psycopg2.OperationalError("server closed the connection")
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    # Just enough of a psycopg2 connection for the pool
+    def __init__(self, url):
+        self.url = url
+        self.closed = 0
+        self.broken = False
+        self.rollbacks = 0
+        self.info = FakeInfo()
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture(autouse=True)
+def fake_connect(monkeypatch):
+    monkeypatch.setattr(pool_module.pg, "connect", FakeConnection)
+
+
+def test_connections_are_reused():
+    pool = ConnectionPool(1, 3, 1, 60, "fake")
+    conn = pool.getConnection()
+    pool.putConnection(conn)
+    assert pool.getConnection() is conn
+    stats = pool.getStats()
+    assert stats["created"] == 1 and stats["borrowed"] == 2 and stats["in_use"] == 1
+
+
+def test_invalid_sizes():
+    with pytest.raises(ValueError):
+        ConnectionPool(3, 2, 1, 60, "fake")
+
+
+def test_timeout_when_exhausted():
+    pool = ConnectionPool(0, 2, 0.05, 60, "fake")
+    pool.getConnection()
+    pool.getConnection()
+    with pytest.raises(psycopg2.pool.PoolError):
+        pool.getConnection()
+    assert pool.getStats()["timeouts"] == 1
+
+
+def test_waiter_gets_the_returned_connection():
+    pool = ConnectionPool(0, 1, 2, 60, "fake")
+    conn = pool.getConnection()
+    threading.Timer(0.05, pool.putConnection, args=(conn,)).start()
+    assert pool.getConnection() is conn
+    assert pool.getStats()["waits"] >= 1
+
+
+def test_open_transaction_is_rolled_back():
+    pool = ConnectionPool(0, 1, 1, 60, "fake")
+    conn = pool.getConnection()
+    conn.info.transaction_status = psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+    pool.putConnection(conn)
+    assert conn.rollbacks == 1
+    assert pool.getConnection() is conn
+
+
+def test_closed_and_broken_connections_are_replaced():
+    pool = ConnectionPool(0, 1, 1, 0, "fake")
+    conn = pool.getConnection()
+    conn.close()
+    pool.putConnection(conn)
+    second = pool.getConnection()
+    assert second is not conn
+
+    # Idle past ping_after (0) and the ping fails
+    second.broken = True
+    pool.putConnection(second)
+    third = pool.getConnection()
+    assert third is not second and second.closed
+    assert pool.getStats()["discarded"] == 2
+
+
+def test_never_more_than_maxconn():
+    pool = ConnectionPool(0, 4, 5, 60, "fake")
+    peak = [0]
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(50):
+            conn = pool.getConnection()
+            with lock:
+                peak[0] = max(peak[0], pool.getStats()["in_use"])
+            time.sleep(0.0005)
+            pool.putConnection(conn)
+
+    threads = [threading.Thread(target=worker) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = pool.getStats()
+    assert peak[0] <= 4
+    assert stats["created"] <= 4
+    assert stats["in_use"] == 0 and stats["borrowed"] == stats["returned"] == 600
@@ -0,0 +1,130 @@
+import random
+
+import pytest
+
+from dao.requisite_graph import RequisiteGraph
+
+
+def random_dag(rng, nodes, edges):
+    # classid requires reqid only when classid > reqid, so there is no cycle
+    rows = {}
+    while len(rows) < edges:
+        classid, reqid = rng.sample(range(1, nodes + 1), 2)
+        if classid < reqid:
+            classid, reqid = reqid, classid
+        rows[(classid, reqid)] = rng.random() < 0.7
+    return [(classid, reqid, prereq) for (classid, reqid), prereq in rows.items()]
+
+
+def closure(rows):
+    direct = {}
+    for classid, reqid, _ in rows:
+        direct.setdefault(classid, set()).add(reqid)
+        direct.setdefault(reqid, set())
+    requires = {}
+    for node in direct:
+        seen = set()
+        stack = list(direct[node])
+        while stack:
+            current = stack.pop()
+            if current not in seen:
+                seen.add(current)
+                stack.extend(direct[current])
+        requires[node] = seen
+    return direct, requires
+
+
+def levels(direct):
+    level = {}
+
+    def visit(node):
+        if node not in level:
+            level[node] = max((visit(reqid) + 1 for reqid in direct[node]), default=0)
+        return level[node]
+
+    for node in direct:
+        visit(node)
+    return level
+
+
+def assert_same_graph(graph, rows):
+    # The graph against a brute-force closure of rows
+    direct, requires = closure(rows)
+    nodes = {node for node in direct if direct[node] or any(node in r for r in direct.values())}
+    assert {node for node in graph.direct if graph.requires[node] or graph.required_by[node]} == nodes
+    level = levels(direct)
+    for node in nodes:
+        assert graph.requires[node] == requires[node]
+        assert graph.required_by[node] == {other for other in direct if node in requires[other]}
+        assert graph.level[node] == level[node]
+        path = graph.longestPath(node)
+        assert len(path) == level[node] + 1
+        assert all(b in direct[a] for a, b in zip(path, path[1:]))
+
+    rebuilt = RequisiteGraph(rows)
+    for node in nodes:
+        assert graph.direct[node] == rebuilt.direct[node]
+        assert graph.longest_next[node] == rebuilt.longest_next[node]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_build_matches_brute_force(seed):
+    rng = random.Random(seed)
+    rows = random_dag(rng, 40, 120)
+    assert_same_graph(RequisiteGraph(rows), rows)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_changes_match_a_rebuild(seed):
+    rng = random.Random(seed)
+    rows = random_dag(rng, 30, 150)
+    start, rest = rows[:60], rows[60:]
+    graph = RequisiteGraph(start)
+    current = list(start)
+
+    for classid, reqid, prereq in rest:
+        graph.addEdge(classid, reqid, prereq)
+        current.append((classid, reqid, prereq))
+        if rng.random() < 0.4:
+            removed = current.pop(rng.randrange(len(current)))
+            graph.removeEdge(removed[0], removed[1])
+        assert_same_graph(graph, current)
+
+    cid = rng.choice([row[0] for row in current])
+    graph.removeClass(cid)
+    current = [row for row in current if cid not in row[:2]]
+    assert cid not in graph.direct
+    assert_same_graph(graph, current)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_cycle_detection(seed):
+    rng = random.Random(seed)
+    rows = random_dag(rng, 25, 60)
+    graph = RequisiteGraph(rows)
+    _, requires = closure(rows)
+
+    for _ in range(200):
+        classid, reqid = rng.randint(1, 25), rng.randint(1, 25)
+        expected = classid == reqid or classid in requires.get(reqid, set())
+        assert graph.wouldCreateCycle(classid, reqid) == expected
+        if expected:
+            with pytest.raises(ValueError):
+                graph.addEdge(classid, reqid, True)
+
+
+def test_cycle_through_pending_batch_edges():
+    graph = RequisiteGraph([(2, 1, True)])
+    # 1 -> 3 and 3 -> 2 are in the same batch: 2 -> 1 -> 3 -> 2
+    assert graph.wouldCreateCycle(1, 3, extra_edges=[(3, 2)])
+    assert not graph.wouldCreateCycle(1, 3)
+
+
+def test_stored_cycle_has_no_level():
+    graph = RequisiteGraph([(1, 2, True), (2, 3, True), (3, 1, True), (4, 1, True), (5, 6, True)])
+    assert graph.cyclic == {1, 2, 3, 4}
+    assert graph.level[4] is None
+    assert graph.level[5] == 1
+    assert graph.requires[4] == {1, 2, 3}
+    with pytest.raises(ValueError):
+        graph.removeEdge(5, 6)
@@ -0,0 +1,84 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dao.section_cube import CUBE_DIMENSIONS, SectionCube
+
+COLUMNS = ["sid", "roomid", "building", "room_capacity", "cid", "mid", "semester", "years", "capacity"]
+
+
+def random_sections(rng, count):
+    # Room capacities are powers of two so every ratio sum is exact and the
+    # means of the cube and of pandas tie exactly where they should
+    rooms = {rid: (rng.choice(["Stefani", "Chardon", "Fisica"]), rng.choice([0, 16, 32, 64])) for rid in range(1, 15)}
+    rows = []
+    for sid in range(1, count + 1):
+        rid = rng.randrange(1, 15)
+        rows.append(
+            (
+                sid,
+                rid,
+                rooms[rid][0],
+                rooms[rid][1],
+                rng.randrange(1, 20),
+                rng.randrange(1, 8),
+                rng.choice(["Fall", "Spring", "V1", "V2"]),
+                rng.choice(["2022", "2023", "2024"]),
+                rng.randrange(5, 60),
+            )
+        )
+    return rows
+
+
+def pandas_top_k(rows, group, metric, k, ascending, filters):
+    # The same question asked with a pandas groupby
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    df = df.rename(columns={"roomid": "room", "cid": "class", "mid": "meeting", "years": "year"})
+    for name, value in filters.items():
+        df = df[df[name] == value]
+    df["ratio"] = np.where(df["room_capacity"] > 0, df["capacity"] / df["room_capacity"].where(df["room_capacity"] > 0), np.nan)
+    result = df.groupby(group, sort=True).agg(
+        count=("sid", "size"), capacity=("capacity", "sum"), ratio=("ratio", "mean")
+    )
+    result = result.sort_values(metric, ascending=ascending, kind="stable", na_position="last")
+    return [
+        dict(zip(group, index if isinstance(index, tuple) else (index,)), **values)
+        for index, values in result.head(k).iterrows()
+    ]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_top_k_matches_pandas(seed):
+    rng = random.Random(seed)
+    rows = random_sections(rng, 500)
+    cube = SectionCube(rows)
+    dimensions = list(CUBE_DIMENSIONS)
+
+    for _ in range(40):
+        group = rng.sample(dimensions, rng.randint(1, 2))
+        metric = rng.choice(["count", "capacity", "ratio"])
+        ascending = rng.random() < 0.5
+        k = rng.randint(1, 15)
+        filters = {}
+        if rng.random() < 0.5:
+            filters["year"] = rng.choice(["2022", "2023", "2024"])
+
+        got = cube.topK(group, metric, k, ascending, filters)
+        expected = pandas_top_k(rows, group, metric, k, ascending, filters)
+        assert len(got) == len(expected)
+        for row, other in zip(got, expected):
+            for name in group:
+                assert row[name] == other[name]
+            assert row["count"] == other["count"]
+            assert row["capacity"] == other["capacity"]
+            if np.isnan(other["ratio"]):
+                assert row["ratio"] is None
+            else:
+                assert row["ratio"] == pytest.approx(other["ratio"])
+
+
+def test_unknown_filter_value_is_empty():
+    cube = SectionCube(random_sections(random.Random(0), 50))
+    assert cube.topK(["room"], "count", 5, filters={"year": "1999"}) == []